@@ -5,7 +5,7 @@ from typing import Dict
 
 from shared.config import get_config, get_rt_mp_config
 from shared.bigquery_client import query_custom_bq_event_count
-from shared.slack_client import send_rt_alert
+from shared.slack_client import send_rt_alert, SlackDeliveryQueue
 from shared.sheets_client import get_config_from_sheets
 
 
@@ -21,6 +21,7 @@ def rt_mp_collector(request):
     Queries BigQuery tables for event counts and sends Slack alerts
     when thresholds are exceeded.
     """
+    delivery_queue = None
     try:
         config = get_config()
         
@@ -62,6 +63,9 @@ def rt_mp_collector(request):
         alerts_sent = 0
         events_checked = 0
         
+        # Alerts are delivered in the background and merged per channel
+        delivery_queue = SlackDeliveryQueue()
+        
         for event_config in enabled_events:
             event_name = event_config["name"]
             aggregation_type = event_config.get("aggregation_type", "count distinct users")
@@ -133,7 +137,8 @@ def rt_mp_collector(request):
                                 end_time=window_end,
                                 aggregation_type=aggregation_type,
                                 total_active_users=None,
-                                percentage=None
+                                percentage=None,
+                                delivery_queue=delivery_queue
                             )
                             
                             _last_alert_cache[cache_key] = datetime.utcnow()
@@ -151,12 +156,16 @@ def rt_mp_collector(request):
                 traceback.print_exc()
                 continue
         
-        print(f"\nCompleted: {events_checked} events checked, {alerts_sent} alerts sent")
+        # Wait for queued alerts to be delivered before the function returns
+        delivery_stats = delivery_queue.close()
+        
+        print(f"\nCompleted: {events_checked} events checked, {alerts_sent} alerts sent, {delivery_stats['failed']} failed to deliver")
         
         return {
             "status": "success",
             "events_checked": events_checked,
             "alerts_sent": alerts_sent,
+            "alerts_failed": delivery_stats["failed"],
             "timestamp": datetime.utcnow().isoformat()
         }
         
@@ -165,6 +174,10 @@ def rt_mp_collector(request):
         import traceback
         traceback.print_exc()
         raise
+    finally:
+        # Deliver alerts queued before a failure as well (close() is a no-op when already closed)
+        if delivery_queue is not None:
+            delivery_queue.close()
 
 
 # Cloud Run Flask app wrapper
@@ -0,0 +1,273 @@
+"""
+Backtest an alert's SQL over historical hours or days.
+
+The alert SQL is run once per point in time with CURRENT_DATE / CURRENT_DATETIME /
+CURRENT_TIME / CURRENT_TIMESTAMP replaced by the @as_of query parameter (alerts can also use
+@as_of directly). Runs go through BigQueryJobRunner with bounded concurrency, and
+the result is a fire/no-fire timeline per channel with the cost of each run.
+Nothing is sent to Slack and nothing is written to the execution history.
+
+Usage:
+    python backtest.py ALERT_ID [--days N | --hours N] [--end YYYY-MM-DDTHH:MM] [--workers N] [--test] [--json]
+
+Examples:
+    python backtest.py 42 --days 14             # Daily points for the last 14 days
+    python backtest.py 42 --hours 48 --workers 8
+    python backtest.py 42 --days 7 --test --json
+"""
+import argparse
+import json
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+from google.cloud import bigquery
+
+from job_runner import BigQueryJobRunner
+from main import (
+    ALERT_QUERY_TIMEOUT_SECONDS,
+    BASE_QUERY_PLACEHOLDER_PATTERN,
+    CompiledAlert,
+    get_base_queries_table_name,
+    get_referenced_base_queries,
+    load_alerts_from_bigquery,
+    setup_credentials,
+    setup_logging,
+)
+
+# CURRENT_DATE / CURRENT_DATETIME / CURRENT_TIME / CURRENT_TIMESTAMP, with or without parentheses and a time zone argument
+CURRENT_TIME_FUNCTION_PATTERN = re.compile(
+    r'\bCURRENT_(DATE|DATETIME|TIME|TIMESTAMP)\b(?:\s*\(\s*([^()]*?)\s*\))?', re.IGNORECASE
+)
+
+
+def get_price_per_tib() -> float:
+    """On-demand price per TiB billed, used for the cost column (BACKTEST_PRICE_PER_TIB)"""
+    try:
+        return float(os.getenv('BACKTEST_PRICE_PER_TIB', '6.25'))
+    except ValueError:
+        return 6.25
+
+
+def substitute_as_of(sql: str) -> str:
+    """Replace current date/time functions with the @as_of timestamp parameter"""
+    def replace(match):
+        function, time_zone = match.group(1).upper(), match.group(2)
+        if function == 'TIMESTAMP':
+            return 'TIMESTAMP(@as_of)'
+        if time_zone:
+            return f'{function}(@as_of, {time_zone})'
+        return f'{function}(@as_of)'
+
+    return CURRENT_TIME_FUNCTION_PATTERN.sub(replace, sql)
+
+
+def inline_base_queries(client, sql: str, test_mode: bool) -> str:
+    """Inline {{base:<name>}} placeholders as subqueries (base queries are not materialized in a backtest)"""
+    names = get_referenced_base_queries(sql)
+    if not names:
+        return sql
+
+    job_config = bigquery.QueryJobConfig(
+        query_parameters=[bigquery.ArrayQueryParameter("names", "STRING", sorted(names))]
+    )
+    rows = client.query(
+        f"SELECT name, sql FROM `{get_base_queries_table_name(test_mode)}` WHERE name IN UNNEST(@names)",
+        job_config=job_config
+    ).result(timeout=60)
+    base_queries = {row.name: row.sql.strip().rstrip(';') for row in rows}
+
+    def replace(match):
+        name = match.group(1)
+        if name not in base_queries:
+            raise ValueError(f"Base query '{name}' is not defined")
+        return f"({base_queries[name]})"
+
+    return BASE_QUERY_PLACEHOLDER_PATTERN.sub(replace, sql)
+
+
+def build_time_points(end: datetime, resolution: str, count: int) -> List[datetime]:
+    """count points ending at `end`, one hour (H) or one day (D) apart, oldest first"""
+    step = timedelta(hours=1) if resolution == 'H' else timedelta(days=1)
+    return [end - step * i for i in range(count - 1, -1, -1)]
+
+
+def run_point(runner: BigQueryJobRunner, alert, sql: str, as_of: datetime) -> Dict[str, Any]:
+    """Run the alert SQL as of one point in time and return row count, first row and cost"""
+    job_config = bigquery.QueryJobConfig(
+        query_parameters=[bigquery.ScalarQueryParameter("as_of", "TIMESTAMP", as_of)]
+    )
+    if alert.max_bytes_billed:
+        job_config.maximum_bytes_billed = alert.max_bytes_billed
+
+    handle = runner.run(f"backtest:{alert.alert_id}:{as_of.isoformat()}", sql, job_config=job_config,
+                        timeout_seconds=ALERT_QUERY_TIMEOUT_SECONDS)
+    point = {
+        'as_of': as_of.isoformat(),
+        'row_count': None,
+        'first_row': None,
+        'bytes_billed': handle.bytes_billed,
+        'latency_seconds': round(handle.latency_seconds, 2) if handle.latency_seconds is not None else None,
+        'error': None
+    }
+    try:
+        result = handle.result(max_results=1, timeout=60)
+        row = next(iter(result), None)
+        point['row_count'] = result.total_rows or 0
+        point['first_row'] = dict(row) if row is not None else None
+    except Exception as e:
+        point['error'] = f"{type(e).__name__}: {str(e)}"
+    return point
+
+
+def evaluate_timeline(compiled: CompiledAlert, points: List[Dict[str, Any]]) -> None:
+    """
+    Add fired/suppressed channels to each point, in time order.
+
+    Uses the same rules as process_alert: no rows or all-zero count columns never fire, and
+    hourly alerts stop firing on a channel once its max_hourly limit for that day is reached.
+    """
+    sent_per_day = {}
+    for point in points:
+        point['fired'], point['suppressed'] = [], []
+        row_count, first_row = point['row_count'], point['first_row']
+        if point['error'] or not row_count or first_row is None:
+            continue
+        count_columns = [col for col in first_row if 'count' in col.lower()]
+        if count_columns and all(first_row[col] == 0 for col in count_columns):
+            continue
+
+        day = point['as_of'][:10]
+        for tier in compiled.firing_tiers(row_count):
+            key = (day, tier.channel)
+            if tier.max_hourly is not None and sent_per_day.get(key, 0) >= tier.max_hourly:
+                point['suppressed'].append(tier.channel)
+                continue
+            sent_per_day[key] = sent_per_day.get(key, 0) + 1
+            point['fired'].append(tier.channel)
+
+
+def backtest_alert(alert_id: str, count: int, end: datetime = None, resolution: str = None,
+                   max_workers: int = 4, test_mode: bool = False) -> Dict[str, Any]:
+    """
+    Backtest one alert over `count` historical points.
+
+    Args:
+        alert_id: alert_id of the alert in the settings table
+        count: Number of points (hours for hourly alerts, days for daily alerts unless resolution is given)
+        end: Last point in time (defaults to now, truncated to the hour)
+        resolution: 'H' or 'D' to override the alert's own resolution for the step size
+        max_workers: Number of points run concurrently
+        test_mode: Use the stage settings and base query tables
+
+    Returns:
+        Dict with the alert, per-point timeline and a summary (fires per channel, bytes billed, cost)
+    """
+    logger = setup_logging()
+    client = setup_credentials()
+    settings_table = (
+        'yotam-395120.peerplay.bigquery_alerts_to_slack_settings_stage' if test_mode
+        else 'yotam-395120.peerplay.bigquery_alerts_to_slack_settings'
+    )
+    alerts = load_alerts_from_bigquery(client, None, settings_table, apply_daily_window=False)
+    alert = next((a for a in alerts if str(a.alert_id) == str(alert_id)), None)
+    if alert is None:
+        raise ValueError(f"Active alert with alert_id {alert_id} not found in {settings_table}")
+
+    sql = substitute_as_of(inline_base_queries(client, alert.sql, test_mode))
+    if '@as_of' not in sql:
+        logger.warning(f"Alert '{alert.name}' SQL has no date/time function to substitute - every point returns the same result")
+
+    resolution = resolution or alert.resolution
+    end = end or datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    points_in_time = build_time_points(end, resolution, count)
+    logger.info(f"Backtesting alert '{alert.name}' over {count} {'hours' if resolution == 'H' else 'days'} with {max_workers} workers")
+
+    runner = BigQueryJobRunner(client, logger)
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='backtest') as executor:
+        points = list(executor.map(lambda as_of: run_point(runner, alert, sql, as_of), points_in_time))
+
+    compiled = CompiledAlert(alert)
+    evaluate_timeline(compiled, points)
+
+    total_bytes_billed = sum(point['bytes_billed'] or 0 for point in points)
+    fires_per_channel = {tier.channel: sum(tier.channel in point['fired'] for point in points) for tier in compiled.tiers}
+    suppressed_per_channel = {tier.channel: sum(tier.channel in point['suppressed'] for point in points) for tier in compiled.tiers}
+    return {
+        'alert_id': alert.alert_id,
+        'alert_name': alert.name,
+        'resolution': resolution,
+        'tiers': [tier._asdict() for tier in compiled.tiers],
+        'points': points,
+        'summary': {
+            'points': len(points),
+            'errors': sum(1 for point in points if point['error']),
+            'fires_per_channel': fires_per_channel,
+            'suppressed_per_channel': suppressed_per_channel,
+            'total_bytes_billed': total_bytes_billed,
+            'estimated_cost_usd': round(total_bytes_billed / 2 ** 40 * get_price_per_tib(), 4)
+        }
+    }
+
+
+def print_timeline(report: Dict[str, Any]) -> None:
+    print(f"Backtest of alert '{report['alert_name']}' (ID: {report['alert_id']})")
+    print("Tiers: " + ', '.join(
+        f"{tier['channel']} >= {tier['threshold']}"
+        + (f" (max {tier['max_hourly']}/day)" if tier['max_hourly'] is not None else "")
+        for tier in report['tiers']
+    ))
+    print()
+    print(f"{'as_of':<26} {'rows':>10} {'fired':<45} {'bytes billed':>14} {'secs':>6}")
+    for point in report['points']:
+        if point['error']:
+            outcome = f"ERROR {point['error'][:60]}"
+        else:
+            outcome = ', '.join(point['fired']) or '-'
+            if point['suppressed']:
+                outcome += f" (cooldown: {', '.join(point['suppressed'])})"
+        rows = point['row_count'] if point['row_count'] is not None else '-'
+        print(f"{point['as_of']:<26} {rows:>10} {outcome:<45} {point['bytes_billed'] or 0:>14} {point['latency_seconds'] or 0:>6}")
+
+    summary = report['summary']
+    print()
+    print(f"Points: {summary['points']}, errors: {summary['errors']}")
+    for channel, fires in summary['fires_per_channel'].items():
+        print(f"  {channel}: fired {fires}, suppressed by cooldown {summary['suppressed_per_channel'][channel]}")
+    print(f"Total bytes billed: {summary['total_bytes_billed']} (~${summary['estimated_cost_usd']})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backtest an alert's SQL over historical hours or days")
+    parser.add_argument('alert_id', help="alert_id of the alert to backtest")
+    span = parser.add_mutually_exclusive_group()
+    span.add_argument('--days', type=int, help="Number of daily points")
+    span.add_argument('--hours', type=int, help="Number of hourly points")
+    parser.add_argument('--end', help="Last point in time (UTC, YYYY-MM-DDTHH:MM), defaults to the current hour")
+    parser.add_argument('--workers', type=int, default=4, help="Points run concurrently (default 4)")
+    parser.add_argument('--test', '--test-mode', action='store_true', dest='test_mode', help="Use stage tables")
+    parser.add_argument('--json', action='store_true', help="Print the full report as JSON")
+    args = parser.parse_args()
+
+    if args.days:
+        count, resolution = args.days, 'D'
+    elif args.hours:
+        count, resolution = args.hours, 'H'
+    else:
+        count, resolution = 24, None
+    end = datetime.fromisoformat(args.end).replace(tzinfo=timezone.utc) if args.end else None
+
+    try:
+        report = backtest_alert(args.alert_id, count, end=end, resolution=resolution,
+                                max_workers=max(1, args.workers), test_mode=args.test_mode)
+    except Exception as e:
+        print(f"Backtest failed: {str(e)}")
+        sys.exit(1)
+
+    if args.json:
+        print(json.dumps(report, indent=2, default=str))
+    else:
+        print_timeline(report)
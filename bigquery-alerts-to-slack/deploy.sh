@@ -25,15 +25,22 @@ gcloud run deploy $SERVICE_NAME \
   --memory 2Gi \
   --cpu 2 \
   --timeout 3600 \
-  --max-instances 1 \
+  --max-instances 5 \
   --platform managed
 
+# /coordinate calls its shards on SERVICE_URL, so the service needs its own URL
+SERVICE_URL=$(gcloud run services describe $SERVICE_NAME \
+  --region $REGION \
+  --project $PROJECT_ID \
+  --format="value(status.url)")
+gcloud run services update $SERVICE_NAME \
+  --region $REGION \
+  --project $PROJECT_ID \
+  --update-env-vars SERVICE_URL=$SERVICE_URL
+
 echo ""
 echo "✅ Deployment complete!"
 echo ""
 echo "Service URL:"
-gcloud run services describe $SERVICE_NAME \
-  --region $REGION \
-  --project $PROJECT_ID \
-  --format="value(status.url)"
+echo "$SERVICE_URL"
 
@@ -0,0 +1,195 @@
+"""
+Buffered execution-history logging for the alert processor.
+
+Rows are collected in memory during a run and written to the history table
+with a single load job at the end, instead of one DML INSERT per alert and
+channel. Every row is also appended to a local spill file as it is buffered,
+so rows from a run that crashes before flushing are loaded by a later run.
+The same buffer is used for other append-only tables (e.g. alert metrics)
+by passing their schema and a distinct spill file prefix.
+"""
+import json
+import logging
+import os
+import tempfile
+import threading
+from datetime import datetime, date
+from pathlib import Path
+from time import time as now
+from typing import Any, Dict, List
+
+from google.cloud import bigquery
+
+
+EXECUTION_HISTORY_SCHEMA = [
+    bigquery.SchemaField("alert_id", "INT64"),
+    bigquery.SchemaField("alert_name", "STRING"),
+    bigquery.SchemaField("execution_timestamp", "TIMESTAMP"),
+    bigquery.SchemaField("execution_date", "DATE"),
+    bigquery.SchemaField("alert_generated", "BOOL"),
+    bigquery.SchemaField("row_count", "INT64"),
+    bigquery.SchemaField("threshold_value", "INT64"),
+    bigquery.SchemaField("slack_channel", "STRING"),
+    bigquery.SchemaField("resolution", "STRING"),
+    bigquery.SchemaField("success", "BOOL"),
+    bigquery.SchemaField("error_message", "STRING"),
+    # Pre-flight and cost fields, added to the table automatically on the first load
+    bigquery.SchemaField("run_id", "STRING"),
+    bigquery.SchemaField("sql_hash", "STRING"),
+    bigquery.SchemaField("source_last_modified", "TIMESTAMP"),
+    bigquery.SchemaField("estimated_bytes", "INT64"),
+    bigquery.SchemaField("bytes_processed", "INT64"),
+    bigquery.SchemaField("bytes_billed", "INT64"),
+]
+
+
+def get_spill_dir() -> Path:
+    """Directory for spill files (EXECUTION_LOG_SPILL_DIR, defaults to the system temp dir)"""
+    return Path(os.getenv('EXECUTION_LOG_SPILL_DIR', os.path.join(tempfile.gettempdir(), 'bigquery-alerts-execution-log')))
+
+
+def get_spill_max_age_seconds() -> float:
+    """Spill files older than this belong to a run that did not flush (above the 600s Gunicorn timeout)"""
+    try:
+        return float(os.getenv('EXECUTION_LOG_SPILL_MAX_AGE_SECONDS', '900'))
+    except ValueError:
+        return 900.0
+
+
+def _json_default(obj):
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class ExecutionLogBuffer:
+    def __init__(self, client, table: str, logger: logging.Logger = None, spill_dir: Path = None,
+                 load_timeout: float = 120, schema: List[bigquery.SchemaField] = None,
+                 spill_prefix: str = 'execution_log'):
+        self.client = client
+        self.table = table
+        self.schema = schema or EXECUTION_HISTORY_SCHEMA
+        self.spill_prefix = spill_prefix
+        self.logger = logger or logging.getLogger('BigQueryAlerts')
+        self.spill_dir = Path(spill_dir) if spill_dir else get_spill_dir()
+        self.load_timeout = load_timeout
+
+        self._rows: List[Dict[str, Any]] = []
+        self._spill_path = None
+        self._spill_file = None
+        # Spill files of earlier runs claimed by this buffer; deleted once their rows are loaded
+        self._recovered_paths: List[Path] = []
+        self._lock = threading.Lock()
+
+    def append(self, row: Dict[str, Any]):
+        """Buffer one history row and write it to the spill file."""
+        line = json.dumps(row, default=_json_default)
+        with self._lock:
+            self._rows.append(json.loads(line))
+            try:
+                if self._spill_file is None:
+                    self._open_spill_file()
+                self._spill_file.write(line + '\n')
+                self._spill_file.flush()
+            except OSError as e:
+                self.logger.warning(f"Failed to write execution log spill file: {str(e)}")
+
+    def __len__(self):
+        with self._lock:
+            return len(self._rows)
+
+    def recover_spilled_rows(self) -> int:
+        """
+        Buffer rows left in spill files by earlier runs that never flushed.
+
+        Only files older than EXECUTION_LOG_SPILL_MAX_AGE_SECONDS are claimed, so
+        files of runs still in progress in the same instance are left alone.
+        Returns the number of rows recovered.
+        """
+        if not self.spill_dir.is_dir():
+            return 0
+
+        recovered = 0
+        cutoff = now() - get_spill_max_age_seconds()
+        for path in sorted(self.spill_dir.glob(f'{self.spill_prefix}_*.jsonl')):
+            try:
+                if path.stat().st_mtime > cutoff:
+                    continue
+                # Claim the file atomically so two runs never load the same rows
+                claimed = path.with_suffix(f'.claimed-{os.getpid()}')
+                os.replace(path, claimed)
+            except OSError:
+                continue
+
+            rows = []
+            with open(claimed, 'r') as f:
+                for line in f:
+                    try:
+                        rows.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        # Last line may be truncated if the process died mid-write
+                        continue
+
+            with self._lock:
+                self._rows.extend(rows)
+                self._recovered_paths.append(claimed)
+            recovered += len(rows)
+
+        if recovered:
+            self.logger.info(f"Recovered {recovered} unflushed {self.spill_prefix} rows from earlier runs")
+        return recovered
+
+    def flush(self) -> bool:
+        """
+        Load all buffered rows into the history table with a single load job.
+
+        Rows appended while the load runs are kept for the next flush. On failure
+        the spill files are kept so a later run can load the rows.
+        """
+        with self._lock:
+            rows, self._rows = self._rows, []
+            spill_path, spill_file = self._spill_path, self._spill_file
+            self._spill_path, self._spill_file = None, None
+            recovered_paths, self._recovered_paths = self._recovered_paths, []
+
+        if spill_file is not None:
+            spill_file.close()
+        if not rows:
+            return True
+
+        job_config = bigquery.LoadJobConfig(
+            schema=self.schema,
+            write_disposition=bigquery.WriteDisposition.WRITE_APPEND,
+            schema_update_options=[bigquery.SchemaUpdateOption.ALLOW_FIELD_ADDITION],
+            source_format=bigquery.SourceFormat.NEWLINE_DELIMITED_JSON
+        )
+        try:
+            load_job = self.client.load_table_from_json(rows, self.table, job_config=job_config)
+            load_job.result(timeout=self.load_timeout)
+        except Exception as e:
+            self.logger.error(
+                f"❌ Failed to load {len(rows)} {self.spill_prefix} rows into {self.table}: {str(e)}. "
+                f"Rows are kept in {self.spill_dir} for the next run"
+            )
+            # Make claimed files eligible for recovery again
+            for path in recovered_paths:
+                try:
+                    os.replace(path, path.with_suffix('.jsonl'))
+                except OSError:
+                    pass
+            return False
+
+        for path in [spill_path] + recovered_paths:
+            if path is None:
+                continue
+            try:
+                path.unlink()
+            except OSError:
+                pass
+        self.logger.info(f"✅ Loaded {len(rows)} {self.spill_prefix} rows into {self.table} (job_id: {load_job.job_id})")
+        return True
+
+    def _open_spill_file(self):
+        self.spill_dir.mkdir(parents=True, exist_ok=True)
+        self._spill_path = self.spill_dir / f"{self.spill_prefix}_{os.getpid()}_{threading.get_ident()}_{int(now() * 1000)}.jsonl"
+        self._spill_file = open(self._spill_path, 'a')
@@ -0,0 +1,243 @@
+"""
+Non-blocking BigQuery job runner for the alert processor.
+
+Jobs are submitted with a server-side timeout (job_timeout_ms) and an HTTP
+request timeout, then tracked by a single polling thread instead of one
+helper thread per call. Jobs that outlive their deadline (or the run
+deadline) are cancelled. Every finished job records its latency and the
+bytes it processed.
+"""
+import logging
+import threading
+from dataclasses import dataclass, field
+from time import monotonic
+from typing import Any, Dict, List, Optional
+
+from google.cloud import bigquery
+
+
+@dataclass(eq=False)
+class QueryJobHandle:
+    name: str
+    timeout_seconds: float
+    submitted_at: float
+    deadline: float
+    job: Any = None
+    job_id: str = None
+    error: Exception = None
+    cancelled: bool = False
+    submit_seconds: float = None
+    latency_seconds: float = None
+    queue_seconds: float = None
+    execution_seconds: float = None
+    bytes_processed: int = None
+    bytes_billed: int = None
+    slot_millis: int = None
+    cache_hit: bool = None
+    _done: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def result(self, max_results: Optional[int] = None, timeout: float = 60):
+        """Fetch the rows of a finished job (raises if the job failed)."""
+        if self.error is not None:
+            raise self.error
+        return self.job.result(max_results=max_results, timeout=timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'job_id': self.job_id,
+            'success': self.error is None,
+            'cancelled': self.cancelled,
+            'latency_seconds': round(self.latency_seconds, 3) if self.latency_seconds is not None else None,
+            'bytes_processed': self.bytes_processed,
+            'bytes_billed': self.bytes_billed,
+            'error': str(self.error) if self.error is not None else None,
+        }
+
+
+class BigQueryJobRunner:
+    def __init__(self, client, logger: logging.Logger = None, poll_interval: float = 0.5, api_timeout: float = 15):
+        self.client = client
+        self.logger = logger or logging.getLogger('BigQueryAlerts')
+        self.poll_interval = poll_interval
+        self.api_timeout = api_timeout
+
+        self._pending = set()
+        self._completed: List[QueryJobHandle] = []
+        self._closed_reason = None
+        self._condition = threading.Condition()
+        self._poller = None
+
+    def submit(self, name: str, sql: str, job_config: bigquery.QueryJobConfig = None,
+               timeout_seconds: float = 60, client=None) -> QueryJobHandle:
+        """
+        Submit a query without waiting for it to finish.
+
+        The job gets a server-side timeout of timeout_seconds; the poller also
+        cancels it locally once that deadline has passed.
+        """
+        job_config = job_config or bigquery.QueryJobConfig()
+        job_config.job_timeout_ms = int(timeout_seconds * 1000)
+
+        submitted_at = monotonic()
+        handle = QueryJobHandle(
+            name=name,
+            timeout_seconds=timeout_seconds,
+            submitted_at=submitted_at,
+            deadline=submitted_at + timeout_seconds
+        )
+
+        if self._closed_reason is not None:
+            # Closed runner: fail the job without submitting it
+            handle.cancelled = True
+            self._finish(handle, error=TimeoutError(self._closed_reason))
+            return handle
+
+        try:
+            handle.job = (client or self.client).query(sql, job_config=job_config, timeout=self.api_timeout)
+            handle.job_id = handle.job.job_id
+        except Exception as e:
+            self._finish(handle, error=e)
+            return handle
+        handle.submit_seconds = monotonic() - submitted_at
+
+        with self._condition:
+            closed_reason = self._closed_reason
+            if closed_reason is None:
+                self._pending.add(handle)
+                if self._poller is None or not self._poller.is_alive():
+                    self._poller = threading.Thread(target=self._poll_loop, name='bq-job-poller', daemon=True)
+                    self._poller.start()
+                self._condition.notify_all()
+
+        if closed_reason is not None:
+            # Closed while the job was being submitted
+            self._cancel(handle, closed_reason)
+        return handle
+
+    def wait(self, handle: QueryJobHandle, timeout: float = None) -> QueryJobHandle:
+        """Block until the poller marks the job finished, failed or cancelled."""
+        handle._done.wait(timeout)
+        return handle
+
+    def run(self, name: str, sql: str, job_config: bigquery.QueryJobConfig = None,
+            timeout_seconds: float = 60, client=None) -> QueryJobHandle:
+        """Submit a query and wait for it to finish."""
+        return self.wait(self.submit(name, sql, job_config=job_config, timeout_seconds=timeout_seconds, client=client))
+
+    def dry_run(self, sql: str, job_config: bigquery.QueryJobConfig = None, client=None):
+        """
+        Dry-run a query: validates it and returns the job with total_bytes_processed
+        and referenced_tables filled in, without running it or billing bytes.
+        """
+        job_config = job_config or bigquery.QueryJobConfig()
+        job_config.dry_run = True
+        job_config.use_query_cache = False
+        return (client or self.client).query(sql, job_config=job_config, timeout=self.api_timeout)
+
+    def cancel_all(self, reason: str = "Cancelled") -> int:
+        """Cancel every job still running. Returns the number of jobs cancelled."""
+        with self._condition:
+            handles = list(self._pending)
+            self._pending.clear()
+
+        for handle in handles:
+            self._cancel(handle, reason)
+        return len(handles)
+
+    def close(self, reason: str = "Cancelled") -> int:
+        """
+        Cancel every job still running and fail every later submit with reason.
+        Returns the number of jobs cancelled.
+        """
+        with self._condition:
+            self._closed_reason = reason
+        return self.cancel_all(reason)
+
+    def job_stats(self) -> List[Dict[str, Any]]:
+        """Latency and bytes processed for every job finished so far."""
+        with self._condition:
+            return [handle.stats() for handle in self._completed]
+
+    def _cancel(self, handle: QueryJobHandle, reason: str):
+        try:
+            handle.job.cancel(timeout=self.api_timeout)
+            self.logger.info(f"Cancelled BigQuery job '{handle.name}' (job_id: {handle.job_id})")
+        except Exception as cancel_error:
+            self.logger.warning(f"Failed to cancel BigQuery job '{handle.name}' (job_id: {handle.job_id}): {str(cancel_error)}")
+        handle.cancelled = True
+        self._finish(handle, error=TimeoutError(reason))
+
+    def _finish(self, handle: QueryJobHandle, error: Exception = None):
+        if handle.done:
+            return
+        handle.error = error
+        handle.latency_seconds = monotonic() - handle.submitted_at
+
+        job = handle.job
+        if job is not None:
+            handle.bytes_processed = getattr(job, 'total_bytes_processed', None)
+            handle.bytes_billed = getattr(job, 'total_bytes_billed', None)
+            handle.slot_millis = getattr(job, 'slot_millis', None)
+            handle.cache_hit = getattr(job, 'cache_hit', None)
+            created, started, ended = getattr(job, 'created', None), getattr(job, 'started', None), getattr(job, 'ended', None)
+            if created and started:
+                handle.queue_seconds = (started - created).total_seconds()
+            if started and ended:
+                handle.execution_seconds = (ended - started).total_seconds()
+
+        if error is None:
+            self.logger.info(
+                f"BigQuery job '{handle.name}' (job_id: {handle.job_id}) finished in {handle.latency_seconds:.2f}s, "
+                f"{handle.bytes_processed or 0} bytes processed"
+            )
+        else:
+            self.logger.warning(
+                f"BigQuery job '{handle.name}' (job_id: {handle.job_id or 'N/A'}) failed after {handle.latency_seconds:.2f}s: "
+                f"{type(error).__name__}: {str(error)}"
+            )
+
+        with self._condition:
+            self._completed.append(handle)
+        handle._done.set()
+
+    def _poll_loop(self):
+        while True:
+            with self._condition:
+                if not self._pending:
+                    # Exit when idle; submit() starts a new poller on demand
+                    self._poller = None
+                    return
+                handles = list(self._pending)
+
+            for handle in handles:
+                if monotonic() >= handle.deadline:
+                    with self._condition:
+                        if handle not in self._pending:
+                            continue
+                        self._pending.discard(handle)
+                    self._cancel(handle, f"Query exceeded its {handle.timeout_seconds:.0f}s timeout")
+                    continue
+
+                try:
+                    is_done = handle.job.done(timeout=self.api_timeout)
+                    error = None
+                    if is_done and handle.job.error_result:
+                        error = RuntimeError(handle.job.error_result.get('message', str(handle.job.error_result)))
+                except Exception as e:
+                    is_done, error = True, e
+
+                if is_done:
+                    with self._condition:
+                        if handle not in self._pending:
+                            continue
+                        self._pending.discard(handle)
+                    self._finish(handle, error=error)
+
+            with self._condition:
+                if self._pending:
+                    self._condition.wait(self.poll_interval)
@@ -6,14 +6,24 @@ from google.auth.transport.requests import Request
 import functions_framework
 from datetime import datetime, time, date
 import logging
+import threading
+import tempfile
 from pathlib import Path
 import json
-from typing import Dict, Any
+import re
+import hashlib
+import uuid
+from typing import Dict, Any, NamedTuple, Optional, Tuple
 import requests
-from dataclasses import dataclass
+from requests.adapters import HTTPAdapter
+from dataclasses import dataclass, asdict
 from flask import Flask, jsonify, request as flask_request
 import google.cloud.logging
-from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from job_runner import BigQueryJobRunner
+from execution_log import ExecutionLogBuffer
+from metrics import ALERT_METRICS_SCHEMA, get_metrics_table_name, query_alert_percentiles
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from time import sleep, monotonic
 
 def setup_logging():
     # Get logger first (singleton pattern - same instance returned)
@@ -96,6 +106,48 @@ class AlertConfig:
     max_hourly_alerts_sandbox: int = None
     max_hourly_alerts_non_critical: int = None
     max_hourly_alerts_critical: int = None
+    max_bytes_billed: int = None
+
+class AlertTier(NamedTuple):
+    """One Slack channel an alert can fire to"""
+    channel: str
+    threshold: int
+    max_hourly: Optional[int]
+
+class CompiledAlert:
+    """
+    An AlertConfig compiled once into its tier table.
+    
+    tiers holds a (channel, threshold, max_hourly) entry for every channel with a threshold,
+    in sandbox, non-critical, critical order. max_hourly is None for daily alerts (no cooldown).
+    """
+    __slots__ = ('alert', 'tiers', 'min_threshold')
+    
+    def __init__(self, alert: AlertConfig):
+        hourly = alert.resolution == 'H'
+        self.alert = alert
+        self.tiers = tuple(
+            AlertTier(channel, threshold, max_hourly if hourly else None)
+            for channel, threshold, max_hourly in (
+                ('data-alerts-sandbox', alert.threshold_sandbox, alert.max_hourly_alerts_sandbox),
+                ('data-alerts-non-critical', alert.threshold_non_critical, alert.max_hourly_alerts_non_critical),
+                ('data-alerts-critical', alert.threshold_critical, alert.max_hourly_alerts_critical),
+            )
+            if threshold is not None
+        )
+        self.min_threshold = min((tier.threshold for tier in self.tiers), default=None)
+    
+    def firing_tiers(self, row_count: int) -> Tuple[AlertTier, ...]:
+        """Tiers whose threshold is met by row_count"""
+        if self.min_threshold is None or row_count < self.min_threshold:
+            return ()
+        return tuple(tier for tier in self.tiers if row_count >= tier.threshold)
+    
+    def max_hourly_for(self, channel: str) -> Optional[int]:
+        for tier in self.tiers:
+            if tier.channel == channel:
+                return tier.max_hourly
+        return None
 
 def is_test_mode():
     """Check if running in test mode based on environment variable or command line"""
@@ -119,6 +171,121 @@ def get_history_table_name():
         return 'yotam-395120.peerplay.bigquery_alerts_execution_history_stage'
     return 'yotam-395120.peerplay.bigquery_alerts_execution_history'
 
+def get_base_queries_table_name(test_mode=None):
+    """Get the shared base queries table name based on test mode"""
+    if test_mode if test_mode is not None else is_test_mode():
+        return 'yotam-395120.peerplay.bigquery_alerts_base_queries_stage'
+    return 'yotam-395120.peerplay.bigquery_alerts_base_queries'
+
+# Alerts reference a shared base query in their SQL as {{base:<name>}}
+BASE_QUERY_PLACEHOLDER_PATTERN = re.compile(r'\{\{\s*base:([A-Za-z0-9_\-]+)\s*\}\}')
+
+def get_referenced_base_queries(sql: str) -> set:
+    """Names of the shared base queries an alert's SQL depends on"""
+    return set(BASE_QUERY_PLACEHOLDER_PATTERN.findall(sql or ''))
+
+def get_num_shards():
+    """Default number of shards the /coordinate endpoint fans a run out to"""
+    try:
+        return max(1, int(os.getenv('ALERT_NUM_SHARDS', '4')))
+    except ValueError:
+        return 4
+
+def get_max_shards():
+    """Upper bound on num_shards, so one request cannot fan out to an arbitrary number of shard calls"""
+    try:
+        return max(1, int(os.getenv('ALERT_MAX_SHARDS', '16')))
+    except ValueError:
+        return 16
+
+def validate_num_shards(num_shards) -> Optional[str]:
+    """Error message if num_shards is not between 1 and ALERT_MAX_SHARDS, None if it is valid"""
+    max_shards = get_max_shards()
+    if num_shards is None or not 1 <= num_shards <= max_shards:
+        return f"num_shards must be an integer between 1 and {max_shards}"
+    return None
+
+def get_alert_shard(alert, num_shards: int) -> int:
+    """
+    Shard an alert belongs to: a consistent hash of its alert_id (name if it has none),
+    so alerts keep their shard as the catalog grows and across processes.
+    """
+    key = str(alert.alert_id if alert.alert_id is not None else alert.name)
+    return int(hashlib.md5(key.encode('utf-8')).hexdigest(), 16) % num_shards
+
+def get_max_workers():
+    """Number of alerts processed concurrently (1 = serial execution)"""
+    try:
+        return max(1, int(os.getenv('ALERT_MAX_WORKERS', '4')))
+    except ValueError:
+        return 4
+
+def get_run_deadline_seconds():
+    """Global time budget for one run, kept below the Gunicorn timeout (600s in Procfile)"""
+    try:
+        return float(os.getenv('ALERT_RUN_DEADLINE_SECONDS', '540'))
+    except ValueError:
+        return 540.0
+
+def get_alert_eval_mode():
+    """
+    How alert results are fetched for threshold evaluation:
+    'first_row' (default) reads total_rows from job metadata and fetches only the first row,
+    'count' wraps the alert SQL to return COUNT(*) and one sample row
+    """
+    mode = os.getenv('ALERT_EVAL_MODE', 'first_row').lower()
+    return mode if mode in ('first_row', 'count') else 'first_row'
+
+def build_count_query(sql: str) -> str:
+    """
+    Wrap an alert query so it returns only its row count and one sample row.
+    Both come from one aggregate over a single scan of the alert SQL, so BigQuery counts in
+    parallel instead of evaluating a window over the whole result in one worker.
+    """
+    inner_sql = sql.strip().rstrip(';')
+    return f"""
+    SELECT
+      COUNT(*) AS alert_row_count,
+      ANY_VALUE(alert_result) AS alert_first_row
+    FROM (
+    {inner_sql}
+    ) AS alert_result
+    """
+
+# The wrapped count query does not keep the alert's ordering, so ordered alerts use 'first_row'
+ORDER_BY_SQL_PATTERN = re.compile(r'\bORDER\s+BY\b', re.IGNORECASE)
+
+def get_default_max_bytes_billed():
+    """Default maximum_bytes_billed for alert queries (ALERT_MAX_BYTES_BILLED, unset = no limit)"""
+    try:
+        value = int(os.getenv('ALERT_MAX_BYTES_BILLED', '0'))
+    except ValueError:
+        return None
+    return value if value > 0 else None
+
+def is_skip_unchanged_sources_enabled():
+    """Skip alerts whose source tables have not changed since their last evaluation"""
+    return os.getenv('ALERT_SKIP_UNCHANGED_SOURCES', 'true').lower() in ['true', '1', 'yes']
+
+# Alerts using these functions can change result without any source table changing, so they are never skipped
+TIME_DEPENDENT_SQL_PATTERN = re.compile(
+    r'\b(CURRENT_DATE|CURRENT_DATETIME|CURRENT_TIME|CURRENT_TIMESTAMP|NOW|RAND|GENERATE_UUID)\b', re.IGNORECASE
+)
+
+def get_sql_hash(sql: str) -> str:
+    """Short hash of an alert's SQL, stored in execution history to detect SQL changes"""
+    return hashlib.sha256(sql.strip().encode('utf-8')).hexdigest()[:16]
+
+# Per-job BigQuery timeouts, enforced server-side via job_timeout_ms and by the job runner
+ALERT_QUERY_TIMEOUT_SECONDS = 90
+COOLDOWN_QUERY_TIMEOUT_SECONDS = 30
+# Execution history rows are buffered during the run and written with one load job at the end
+EXECUTION_LOG_LOAD_TIMEOUT_SECONDS = 120
+# After the run deadline, unfinished alerts get this long to record their failure before the logs are flushed
+RUN_DEADLINE_GRACE_SECONDS = 15
+# Shared base queries scan the heavy sources once per run, so they get a longer timeout than alert queries
+BASE_QUERY_TIMEOUT_SECONDS = 180
+
 def is_execution_time_for_daily_alerts():
     """Check if current time is between 4:50AM and 5:49AM"""
     current_time = datetime.now().time()
@@ -127,29 +294,24 @@ def is_execution_time_for_daily_alerts():
     
     return start_time <= current_time <= end_time
 
-def load_alerts_from_bigquery(client, resolution=None, settings_table=None):
+def _parse_positive_int(value):
+    """int(value) if it is a positive integer, None otherwise (including NULL)"""
+    if value is None:
+        return None
+    try:
+        value = int(value)
+    except (ValueError, TypeError):
+        return None
+    return value if value > 0 else None
+
+def load_alerts_from_bigquery(client, resolution=None, settings_table=None, apply_daily_window=True):
     if settings_table is None:
         settings_table = get_settings_table_name()
     
     # Both production and stage tables now use the new schema
+    # Optional columns (e.g. max_bytes_billed) are read with getattr, so select all columns
     query = f"""
-    SELECT 
-        name, 
-        description, 
-        sql, 
-        resolution, 
-        owner, 
-        is_active, 
-        alert_id,
-        jira_id,
-        data_query_link,
-        notion_doc_link,
-        threshold_sandbox,
-        threshold_non_critical,
-        threshold_critical,
-        max_hourly_alerts_sandbox,
-        max_hourly_alerts_non_critical,
-        max_hourly_alerts_critical
+    SELECT *
     FROM `{settings_table}`
     WHERE is_active = 'T'
     """
@@ -169,85 +331,46 @@ def load_alerts_from_bigquery(client, resolution=None, settings_table=None):
             continue
             
         # For Daily alerts, check if we're in the execution window
-        if row.resolution == 'D' and not is_execution_time_for_daily_alerts():
+        if apply_daily_window and row.resolution == 'D' and not is_execution_time_for_daily_alerts():
             logger.info(f"Skipping daily alert '{row.name}' as current time is not between 4:50AM and 5:49AM")
             continue
         
-        # Get threshold and max_hourly_alerts values
-        threshold_sandbox = getattr(row, 'threshold_sandbox', None)
-        threshold_non_critical = getattr(row, 'threshold_non_critical', None)
-        threshold_critical = getattr(row, 'threshold_critical', None)
-        max_hourly_alerts_sandbox = getattr(row, 'max_hourly_alerts_sandbox', None)
-        max_hourly_alerts_non_critical = getattr(row, 'max_hourly_alerts_non_critical', None)
-        max_hourly_alerts_critical = getattr(row, 'max_hourly_alerts_critical', None)
-        
-        # Validate thresholds - must be positive integers if not NULL
-        if threshold_sandbox is not None:
-            try:
-                threshold_sandbox = int(threshold_sandbox)
-                if threshold_sandbox <= 0:
-                    logger.error(f"Invalid threshold_sandbox value for alert '{row.name}': {threshold_sandbox}. Must be a positive integer. This alert will be skipped.")
-                    continue
-            except (ValueError, TypeError):
-                logger.error(f"Invalid threshold_sandbox value for alert '{row.name}': {threshold_sandbox}. Must be a valid integer. This alert will be skipped.")
-                continue
-        
-        if threshold_non_critical is not None:
-            try:
-                threshold_non_critical = int(threshold_non_critical)
-                if threshold_non_critical <= 0:
-                    logger.error(f"Invalid threshold_non_critical value for alert '{row.name}': {threshold_non_critical}. Must be a positive integer. This alert will be skipped.")
-                    continue
-            except (ValueError, TypeError):
-                logger.error(f"Invalid threshold_non_critical value for alert '{row.name}': {threshold_non_critical}. Must be a valid integer. This alert will be skipped.")
-                continue
-        
-        if threshold_critical is not None:
-            try:
-                threshold_critical = int(threshold_critical)
-                if threshold_critical <= 0:
-                    logger.error(f"Invalid threshold_critical value for alert '{row.name}': {threshold_critical}. Must be a positive integer. This alert will be skipped.")
-                    continue
-            except (ValueError, TypeError):
-                logger.error(f"Invalid threshold_critical value for alert '{row.name}': {threshold_critical}. Must be a valid integer. This alert will be skipped.")
-                continue
+        # Thresholds must be positive integers if not NULL; an invalid threshold skips the alert
+        thresholds = {}
+        invalid_threshold = False
+        for field_name in ('threshold_sandbox', 'threshold_non_critical', 'threshold_critical'):
+            value = getattr(row, field_name, None)
+            thresholds[field_name] = _parse_positive_int(value)
+            if value is not None and thresholds[field_name] is None:
+                logger.error(f"Invalid {field_name} value for alert '{row.name}': {value}. Must be a positive integer. This alert will be skipped.")
+                invalid_threshold = True
+                break
+        if invalid_threshold:
+            continue
         
         # Ensure at least one threshold is defined
-        if threshold_sandbox is None and threshold_non_critical is None and threshold_critical is None:
+        if all(value is None for value in thresholds.values()):
             logger.error(f"Alert '{row.name}' has no thresholds defined. At least one threshold (sandbox, non-critical, or critical) must be defined. This alert will be skipped.")
             continue
         
-        # Validate max_hourly_alerts for hourly alerts only
-        if row.resolution == 'H':
-            if max_hourly_alerts_sandbox is not None:
-                try:
-                    max_hourly_alerts_sandbox = int(max_hourly_alerts_sandbox)
-                    if max_hourly_alerts_sandbox <= 0:
-                        logger.warning(f"Invalid max_hourly_alerts_sandbox value for alert '{row.name}': {max_hourly_alerts_sandbox}. Must be a positive integer. Setting to unlimited.")
-                        max_hourly_alerts_sandbox = None
-                except (ValueError, TypeError):
-                    logger.warning(f"Invalid max_hourly_alerts_sandbox value for alert '{row.name}': {max_hourly_alerts_sandbox}. Must be a valid integer. Setting to unlimited.")
-                    max_hourly_alerts_sandbox = None
-            
-            if max_hourly_alerts_non_critical is not None:
-                try:
-                    max_hourly_alerts_non_critical = int(max_hourly_alerts_non_critical)
-                    if max_hourly_alerts_non_critical <= 0:
-                        logger.warning(f"Invalid max_hourly_alerts_non_critical value for alert '{row.name}': {max_hourly_alerts_non_critical}. Must be a positive integer. Setting to unlimited.")
-                        max_hourly_alerts_non_critical = None
-                except (ValueError, TypeError):
-                    logger.warning(f"Invalid max_hourly_alerts_non_critical value for alert '{row.name}': {max_hourly_alerts_non_critical}. Must be a valid integer. Setting to unlimited.")
-                    max_hourly_alerts_non_critical = None
-            
-            if max_hourly_alerts_critical is not None:
-                try:
-                    max_hourly_alerts_critical = int(max_hourly_alerts_critical)
-                    if max_hourly_alerts_critical <= 0:
-                        logger.warning(f"Invalid max_hourly_alerts_critical value for alert '{row.name}': {max_hourly_alerts_critical}. Must be a positive integer. Setting to unlimited.")
-                        max_hourly_alerts_critical = None
-                except (ValueError, TypeError):
-                    logger.warning(f"Invalid max_hourly_alerts_critical value for alert '{row.name}': {max_hourly_alerts_critical}. Must be a valid integer. Setting to unlimited.")
-                    max_hourly_alerts_critical = None
+        # Validate max_hourly_alerts for hourly alerts only; invalid values mean unlimited
+        max_hourly = {}
+        for field_name in ('max_hourly_alerts_sandbox', 'max_hourly_alerts_non_critical', 'max_hourly_alerts_critical'):
+            value = getattr(row, field_name, None)
+            if row.resolution != 'H':
+                max_hourly[field_name] = value
+                continue
+            max_hourly[field_name] = _parse_positive_int(value)
+            if value is not None and max_hourly[field_name] is None:
+                logger.warning(f"Invalid {field_name} value for alert '{row.name}': {value}. Must be a positive integer. Setting to unlimited.")
+        
+        # Optional per-alert scan limit, falls back to ALERT_MAX_BYTES_BILLED
+        value = getattr(row, 'max_bytes_billed', None)
+        max_bytes_billed = _parse_positive_int(value)
+        if value is not None and max_bytes_billed is None:
+            logger.warning(f"Invalid max_bytes_billed value for alert '{row.name}': {value}. Using default.")
+        if max_bytes_billed is None:
+            max_bytes_billed = get_default_max_bytes_billed()
                 
         alert = AlertConfig(
             name=row.name,
@@ -260,17 +383,103 @@ def load_alerts_from_bigquery(client, resolution=None, settings_table=None):
             jira_id=row.jira_id if hasattr(row, 'jira_id') else None,
             data_query_link=row.data_query_link if hasattr(row, 'data_query_link') else None,
             notion_doc_link=row.notion_doc_link if hasattr(row, 'notion_doc_link') else None,
-            threshold_sandbox=threshold_sandbox,
-            threshold_non_critical=threshold_non_critical,
-            threshold_critical=threshold_critical,
-            max_hourly_alerts_sandbox=max_hourly_alerts_sandbox,
-            max_hourly_alerts_non_critical=max_hourly_alerts_non_critical,
-            max_hourly_alerts_critical=max_hourly_alerts_critical
+            max_bytes_billed=max_bytes_billed,
+            **thresholds,
+            **max_hourly
         )
         alerts.append(alert)
     
     return alerts
 
+# Parsed settings snapshots keyed by (settings_table, resolution): (table last_modified, alerts)
+_settings_snapshots = {}
+_settings_snapshots_lock = threading.Lock()
+# History tables already verified by this process
+_verified_history_tables = set()
+
+def get_settings_cache_dir() -> Path:
+    """Directory for the local settings snapshot files (SETTINGS_CACHE_DIR, defaults to the system temp dir)"""
+    return Path(os.getenv('SETTINGS_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'bigquery-alerts-settings')))
+
+def _settings_snapshot_path(settings_table, resolution) -> Path:
+    return get_settings_cache_dir() / f"{settings_table}.{resolution or 'all'}.json"
+
+def _load_settings_snapshot_file(settings_table, resolution, last_modified):
+    """Read the local snapshot file if it was written for this last_modified time"""
+    path = _settings_snapshot_path(settings_table, resolution)
+    try:
+        with open(path, 'r') as f:
+            snapshot = json.load(f)
+        if snapshot.get('last_modified') != last_modified.isoformat():
+            return None
+        return [AlertConfig(**alert) for alert in snapshot['alerts']]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+def _save_settings_snapshot_file(settings_table, resolution, last_modified, alerts):
+    path = _settings_snapshot_path(settings_table, resolution)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump({'last_modified': last_modified.isoformat(), 'alerts': [asdict(alert) for alert in alerts]}, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logging.getLogger('BigQueryAlerts').warning(f"Failed to write settings snapshot {path}: {str(e)}")
+
+def load_alerts_cached(client, resolution=None, settings_table=None):
+    """
+    Load alerts through a snapshot cache keyed by the settings table's last-modified time.
+    
+    The parsed AlertConfig list is kept in process and in a local file, and the settings
+    table is only queried again when its last_modified_time changes. Tables whose
+    modification time does not track their content (e.g. Google Sheets external tables)
+    are always queried. The daily execution window is applied on every call.
+    """
+    if settings_table is None:
+        settings_table = get_settings_table_name()
+    logger = logging.getLogger('BigQueryAlerts')
+    key = (settings_table, resolution)
+    
+    last_modified = None
+    try:
+        table = client.get_table(settings_table, timeout=15)
+        if table.table_type == 'TABLE':
+            last_modified = table.modified
+    except Exception as e:
+        logger.warning(f"Failed to get last modified time of settings table {settings_table}: {str(e)}")
+    
+    alerts = None
+    if last_modified is not None:
+        with _settings_snapshots_lock:
+            snapshot = _settings_snapshots.get(key)
+        if snapshot and snapshot[0] == last_modified:
+            alerts = snapshot[1]
+            logger.info(f"Using in-process settings snapshot ({len(alerts)} alerts, table modified {last_modified})")
+        else:
+            alerts = _load_settings_snapshot_file(settings_table, resolution, last_modified)
+            if alerts is not None:
+                logger.info(f"Using local settings snapshot ({len(alerts)} alerts, table modified {last_modified})")
+    
+    if alerts is None:
+        alerts = load_alerts_from_bigquery(client, resolution, settings_table, apply_daily_window=False)
+        if last_modified is not None:
+            _save_settings_snapshot_file(settings_table, resolution, last_modified, alerts)
+    
+    if last_modified is not None:
+        with _settings_snapshots_lock:
+            _settings_snapshots[key] = (last_modified, alerts)
+    
+    # For Daily alerts, check if we're in the execution window
+    in_daily_window = is_execution_time_for_daily_alerts()
+    active_alerts = []
+    for alert in alerts:
+        if alert.resolution == 'D' and not in_daily_window:
+            logger.info(f"Skipping daily alert '{alert.name}' as current time is not between 4:50AM and 5:49AM")
+            continue
+        active_alerts.append(alert)
+    return active_alerts
+
 def setup_credentials():
     logger = logging.getLogger('BigQueryAlerts')
     
@@ -346,7 +555,7 @@ def setup_credentials():
         return bigquery.Client()
 
 class AlertProcessor:
-    def __init__(self, resolution=None, test_mode=None):
+    def __init__(self, resolution=None, test_mode=None, shard=None, num_shards=None):
         self.logger = setup_logging()
         self.test_mode = test_mode if test_mode is not None else is_test_mode()
         
@@ -361,21 +570,94 @@ class AlertProcessor:
         
         try:
             self.client = setup_credentials()
+            # All BigQuery jobs go through one runner: non-blocking submit, one polling loop, cancel on deadline
+            self.job_runner = BigQueryJobRunner(self.client, self.logger)
             # Use stage table in test mode, production table otherwise
             if self.test_mode:
                 settings_table = 'yotam-395120.peerplay.bigquery_alerts_to_slack_settings_stage'
             else:
                 settings_table = 'yotam-395120.peerplay.bigquery_alerts_to_slack_settings'
-            self.alerts = load_alerts_from_bigquery(self.client, resolution, settings_table)
+            self.alerts = load_alerts_cached(self.client, resolution, settings_table)
             self.logger.info(f"Loaded {len(self.alerts)} active alerts from BigQuery table: {settings_table} for resolution {resolution}")
             
+            # Sharded mode: only this invocation's slice of the alerts is processed
+            if num_shards and num_shards > 1:
+                if shard is None or not 0 <= shard < num_shards:
+                    raise ValueError(f"Invalid shard {shard} for num_shards {num_shards}")
+                self.alerts = [alert for alert in self.alerts if get_alert_shard(alert, num_shards) == shard]
+                self.logger.info(f"Processing shard {shard}/{num_shards}: {len(self.alerts)} alerts")
+            
+            # Each alert's (channel, threshold, max_hourly) tier table, compiled once
+            self._compiled_alerts = {id(alert): CompiledAlert(alert) for alert in self.alerts}
+            
             # Test the history table exists and is accessible
             self.verify_history_table()
             
+            # Execution history is buffered and loaded in one batch at the end of the run
+            if self.test_mode:
+                history_table = 'yotam-395120.peerplay.bigquery_alerts_execution_history_stage'
+            else:
+                history_table = 'yotam-395120.peerplay.bigquery_alerts_execution_history'
+            self.execution_log = ExecutionLogBuffer(
+                self.client, history_table, self.logger, load_timeout=EXECUTION_LOG_LOAD_TIMEOUT_SECONDS
+            )
+            # Load rows of earlier runs that crashed before flushing, so cooldown counts include them
+            if self.execution_log.recover_spilled_rows():
+                self.execution_log.flush()
+            
+            # Per-alert latency and cost telemetry, loaded into the metrics table at the end of the run
+            self.metrics_log = ExecutionLogBuffer(
+                self.client, get_metrics_table_name(self.test_mode), self.logger,
+                load_timeout=EXECUTION_LOG_LOAD_TIMEOUT_SECONDS, schema=ALERT_METRICS_SCHEMA, spill_prefix='alert_metrics'
+            )
+            self.metrics_log.recover_spilled_rows()
+            
+            # Today's sent-alert counts for all hourly alerts, loaded once and updated locally
+            self._cooldown_lock = threading.Lock()
+            self.cooldown_counts = None
+            self.cooldown_date = None
+            self.preload_cooldown_counts()
+            
+            # Pre-flight state: last evaluation of each alert, source table modification times,
+            # and per-alert cost fields added to the execution history rows
+            self.run_id = uuid.uuid4().hex
+            self.alert_evaluations = {}
+            self._table_modified_cache = {}
+            self._table_modified_lock = threading.Lock()
+            self.last_evaluations = self.preload_last_evaluations()
+            
+            # Shared base queries used by the loaded alerts, materialized once per run on first use
+            self.base_queries = self.load_base_queries()
+            self._materialized_base_queries = {}
+            self._base_query_locks = {name: threading.Lock() for name in self.base_queries}
+            
+            # Set at the run deadline: unfinished alerts stop before sending to Slack. Once the logs are
+            # closed (just before they are flushed) no more execution or metrics rows are buffered
+            self._run_cancelled = threading.Event()
+            self._log_lock = threading.Lock()
+            self._logs_closed = False
+            
+            # Reuse one HTTPS connection pool for all Slack webhook posts in this run
+            self.slack_session = requests.Session()
+            self.slack_session.mount("https://", HTTPAdapter(pool_connections=3, pool_maxsize=10))
+            
         except Exception as e:
             self.logger.error(f"Failed to initialize: {str(e)}")
             raise
 
+    def cancel_outstanding_jobs(self) -> int:
+        """
+        Stop the run at its deadline: cancel every BigQuery job still running, fail any job submitted
+        later and stop unfinished alerts before they send to Slack. Returns the number of jobs cancelled.
+        """
+        self._run_cancelled.set()
+        return self.job_runner.close("Run deadline exceeded")
+
+    def close_logs(self):
+        """Stop buffering execution and metrics rows, so alerts still running add nothing after the flush."""
+        with self._log_lock:
+            self._logs_closed = True
+
     def verify_history_table(self):
         """Verify that the history table exists and is accessible"""
         try:
@@ -383,18 +665,325 @@ class AlertProcessor:
                 history_table = 'yotam-395120.peerplay.bigquery_alerts_execution_history_stage'
             else:
                 history_table = 'yotam-395120.peerplay.bigquery_alerts_execution_history'
+            # Verified once per process; later runs in the same instance skip the probe query
+            if history_table in _verified_history_tables:
+                return
             test_query = f"""
             SELECT COUNT(*) as count 
             FROM `{history_table}` 
             WHERE 1=0
             """
-            query_job = self.client.query(test_query)
-            query_job.result()
+            handle = self.job_runner.run("verify_history_table", test_query, timeout_seconds=30)
+            if handle.error:
+                raise handle.error
+            _verified_history_tables.add(history_table)
             self.logger.info(f"History table verified and accessible: {history_table}")
         except Exception as e:
             self.logger.error(f"History table verification failed: {str(e)}")
             self.logger.error("This will prevent cooldown functionality from working properly")
 
+    def preload_cooldown_counts(self):
+        """
+        Load today's sent-alert counts for every hourly alert and channel with a single grouped query.
+        
+        The counts are kept in self.cooldown_counts keyed by (alert_id, channel) and updated locally
+        by record_alert_sent, so cooldown checks need no query of their own. If the preload fails,
+        cooldown checks fall back to querying the history table per alert and channel.
+        """
+        alert_ids = sorted({
+            int(alert.alert_id) for alert in self.alerts
+            if alert.resolution == 'H' and alert.alert_id and str(alert.alert_id).isdigit()
+        })
+        current_date = date.today()
+        if not alert_ids:
+            with self._cooldown_lock:
+                self.cooldown_counts = {}
+                self.cooldown_date = current_date
+            return
+        
+        if self.test_mode:
+            history_table = 'yotam-395120.peerplay.bigquery_alerts_execution_history_stage'
+        else:
+            history_table = 'yotam-395120.peerplay.bigquery_alerts_execution_history'
+        counts_query = f"""
+        SELECT alert_id, slack_channel, COUNT(*) as alerts_sent_today
+        FROM `{history_table}`
+        WHERE alert_id IN UNNEST(@alert_ids)
+          AND execution_date = @current_date
+          AND alert_generated = TRUE
+          AND success = TRUE
+        GROUP BY alert_id, slack_channel
+        """
+        
+        job_config = bigquery.QueryJobConfig(
+            query_parameters=[
+                bigquery.ArrayQueryParameter("alert_ids", "INT64", alert_ids),
+                bigquery.ScalarQueryParameter("current_date", "DATE", current_date)
+            ]
+        )
+        
+        handle = self.job_runner.run(
+            "cooldown_counts", counts_query, job_config=job_config,
+            timeout_seconds=COOLDOWN_QUERY_TIMEOUT_SECONDS
+        )
+        try:
+            if handle.error:
+                raise handle.error
+            counts = {
+                (int(row.alert_id), row.slack_channel): row.alerts_sent_today
+                for row in handle.result(timeout=15)
+            }
+        except Exception as e:
+            self.logger.warning(
+                f"Failed to preload cooldown counts for {len(alert_ids)} hourly alerts, "
+                f"falling back to per-alert cooldown queries. Error: {str(e)}"
+            )
+            return
+        
+        with self._cooldown_lock:
+            self.cooldown_counts = counts
+            self.cooldown_date = current_date
+        self.logger.info(
+            f"Preloaded cooldown counts for {len(alert_ids)} hourly alerts on {current_date}: "
+            f"{len(counts)} alert/channel pairs already sent today"
+        )
+
+    def preload_last_evaluations(self) -> Dict[int, Dict[str, Any]]:
+        """
+        Load the latest evaluation of every alert from the execution history with one query.
+        
+        Returns a map of alert_id to the SQL hash, source table modification time and outcome of
+        the alert's most recent run. An empty map disables skipping (e.g. before the history table
+        has the pre-flight columns).
+        """
+        if not is_skip_unchanged_sources_enabled():
+            return {}
+        alert_ids = sorted({int(alert.alert_id) for alert in self.alerts if alert.alert_id and str(alert.alert_id).isdigit()})
+        if not alert_ids:
+            return {}
+        
+        if self.test_mode:
+            history_table = 'yotam-395120.peerplay.bigquery_alerts_execution_history_stage'
+        else:
+            history_table = 'yotam-395120.peerplay.bigquery_alerts_execution_history'
+        last_evaluation_query = f"""
+        WITH runs AS (
+          SELECT
+            alert_id,
+            run_id,
+            MAX(execution_timestamp) AS last_execution,
+            ANY_VALUE(sql_hash) AS sql_hash,
+            MAX(source_last_modified) AS source_last_modified,
+            LOGICAL_OR(alert_generated OR row_count >= threshold_value) AS threshold_met,
+            LOGICAL_AND(success) AS success
+          FROM `{history_table}`
+          WHERE alert_id IN UNNEST(@alert_ids)
+            AND execution_date >= DATE_SUB(@current_date, INTERVAL 2 DAY)
+            AND run_id IS NOT NULL
+          GROUP BY alert_id, run_id
+        )
+        SELECT alert_id, sql_hash, source_last_modified, threshold_met, success
+        FROM runs
+        WHERE TRUE
+        QUALIFY ROW_NUMBER() OVER (PARTITION BY alert_id ORDER BY last_execution DESC) = 1
+        """
+        
+        job_config = bigquery.QueryJobConfig(
+            query_parameters=[
+                bigquery.ArrayQueryParameter("alert_ids", "INT64", alert_ids),
+                bigquery.ScalarQueryParameter("current_date", "DATE", date.today())
+            ]
+        )
+        
+        handle = self.job_runner.run(
+            "last_evaluations", last_evaluation_query, job_config=job_config,
+            timeout_seconds=COOLDOWN_QUERY_TIMEOUT_SECONDS
+        )
+        try:
+            if handle.error:
+                raise handle.error
+            last_evaluations = {
+                int(row.alert_id): {
+                    'sql_hash': row.sql_hash,
+                    'source_last_modified': row.source_last_modified,
+                    'threshold_met': row.threshold_met,
+                    'success': row.success
+                }
+                for row in handle.result(timeout=15)
+            }
+        except Exception as e:
+            self.logger.warning(f"Failed to load last alert evaluations, unchanged-source skipping disabled for this run. Error: {str(e)}")
+            return {}
+        
+        self.logger.info(f"Loaded last evaluations for {len(last_evaluations)} alerts")
+        return last_evaluations
+
+    def get_table_last_modified(self, table_ref):
+        """
+        Last modification time of a source table, cached for the run.
+        
+        Returns None for tables whose modification time does not reflect their data
+        (views, external tables such as Google Sheets, tables with a streaming buffer).
+        """
+        table_id = f"{table_ref.project}.{table_ref.dataset_id}.{table_ref.table_id}"
+        with self._table_modified_lock:
+            if table_id in self._table_modified_cache:
+                return self._table_modified_cache[table_id]
+        
+        try:
+            table = self.client.get_table(table_id, timeout=15)
+            if table.table_type != 'TABLE' or table.streaming_buffer is not None:
+                modified = None
+            else:
+                modified = table.modified
+        except Exception as e:
+            self.logger.warning(f"Failed to get last modified time of {table_id}: {str(e)}")
+            modified = None
+        
+        with self._table_modified_lock:
+            self._table_modified_cache[table_id] = modified
+        return modified
+
+    def load_base_queries(self) -> Dict[str, str]:
+        """
+        Load the SQL of every shared base query referenced by the loaded alerts.
+        
+        Returns a map of base query name to SQL. Nothing is queried when no alert uses a base query.
+        """
+        dependents = {}
+        for alert in self.alerts:
+            for name in get_referenced_base_queries(alert.sql):
+                dependents.setdefault(name, []).append(alert.name)
+        if not dependents:
+            return {}
+        
+        for name, alert_names in sorted(dependents.items()):
+            self.logger.info(f"Base query '{name}' is shared by {len(alert_names)} alerts: {', '.join(alert_names)}")
+        
+        base_queries_table = get_base_queries_table_name(self.test_mode)
+        query = f"""
+        SELECT name, sql
+        FROM `{base_queries_table}`
+        WHERE name IN UNNEST(@names)
+        """
+        job_config = bigquery.QueryJobConfig(
+            query_parameters=[bigquery.ArrayQueryParameter("names", "STRING", sorted(dependents))]
+        )
+        
+        handle = self.job_runner.run("base_queries", query, job_config=job_config, timeout_seconds=COOLDOWN_QUERY_TIMEOUT_SECONDS)
+        try:
+            if handle.error:
+                raise handle.error
+            base_queries = {row.name: row.sql for row in handle.result(timeout=15)}
+        except Exception as e:
+            self.logger.error(f"Failed to load base queries from {base_queries_table}: {str(e)}")
+            return {}
+        
+        missing = sorted(set(dependents) - set(base_queries))
+        if missing:
+            self.logger.error(f"Base queries not found in {base_queries_table}: {', '.join(missing)}. Alerts using them will fail.")
+        return base_queries
+
+    def materialize_base_query(self, name: str) -> str:
+        """
+        Run a shared base query once per run and return the table holding its result.
+        
+        The result is the query job's destination (the cached anonymous result table), so no
+        dataset has to be managed. Concurrent callers wait for the first one; failures are
+        remembered so dependent alerts fail fast instead of re-running the base query.
+        """
+        if name not in self.base_queries:
+            raise ValueError(f"Base query '{name}' is not defined")
+        
+        with self._base_query_locks[name]:
+            if name not in self._materialized_base_queries:
+                handle = self.job_runner.run(f"base:{name}", self.base_queries[name], timeout_seconds=BASE_QUERY_TIMEOUT_SECONDS)
+                if handle.error:
+                    self.logger.error(f"Failed to materialize base query '{name}': {str(handle.error)}")
+                    self._materialized_base_queries[name] = handle.error
+                else:
+                    destination = handle.job.destination
+                    self._materialized_base_queries[name] = f"{destination.project}.{destination.dataset_id}.{destination.table_id}"
+                    self.logger.info(
+                        f"Materialized base query '{name}' into {self._materialized_base_queries[name]} "
+                        f"({handle.bytes_processed or 0} bytes processed)"
+                    )
+        
+        result = self._materialized_base_queries[name]
+        if isinstance(result, Exception):
+            raise RuntimeError(f"Base query '{name}' failed: {str(result)}")
+        return result
+
+    def resolve_base_queries(self, sql: str, inline: bool = False) -> str:
+        """
+        Replace {{base:<name>}} placeholders in alert SQL.
+        
+        By default each placeholder becomes the materialized result table of the base query.
+        With inline=True it becomes the base query itself as a subquery, so a dry run sees the
+        real source tables without materializing anything.
+        """
+        def replace(match):
+            name = match.group(1)
+            if inline:
+                if name not in self.base_queries:
+                    raise ValueError(f"Base query '{name}' is not defined")
+                return f"({self.base_queries[name].strip().rstrip(';')})"
+            return f"`{self.materialize_base_query(name)}`"
+        
+        return BASE_QUERY_PLACEHOLDER_PATTERN.sub(replace, sql)
+
+    def preflight_alert(self, alert: AlertConfig, sql: str) -> Dict[str, Any]:
+        """
+        Dry-run an alert query to get its bytes-to-scan and the last modification time of its sources.
+        
+        Returns:
+            Dict with estimated_bytes and source_last_modified (None if any source's
+            modification time is unknown)
+        """
+        dry_run_job = self.job_runner.dry_run(sql)
+        
+        source_last_modified = None
+        referenced_tables = dry_run_job.referenced_tables or []
+        for table_ref in referenced_tables:
+            modified = self.get_table_last_modified(table_ref)
+            if modified is None:
+                source_last_modified = None
+                break
+            source_last_modified = max(source_last_modified, modified) if source_last_modified else modified
+        
+        return {
+            'estimated_bytes': dry_run_job.total_bytes_processed,
+            'source_last_modified': source_last_modified
+        }
+
+    def can_skip_unchanged_alert(self, alert: AlertConfig, sql_hash: str, source_last_modified, sql: str = None) -> bool:
+        """
+        An alert can be skipped when its last run succeeded without meeting any threshold,
+        its SQL is unchanged and not time-dependent, and none of its source tables changed since.
+        sql is the alert SQL with base queries inlined (defaults to alert.sql).
+        """
+        if not is_skip_unchanged_sources_enabled() or not alert.alert_id or source_last_modified is None:
+            return False
+        if TIME_DEPENDENT_SQL_PATTERN.search(sql or alert.sql):
+            return False
+        
+        last = self.last_evaluations.get(int(alert.alert_id))
+        if not last or not last['success'] or last['threshold_met']:
+            return False
+        return (
+            last['sql_hash'] == sql_hash
+            and last['source_last_modified'] is not None
+            and source_last_modified <= last['source_last_modified']
+        )
+
+    def record_alert_sent(self, alert: AlertConfig, channel: str):
+        """Count a successfully sent alert towards today's cooldown limit for its channel."""
+        if self.cooldown_counts is None or not alert.alert_id:
+            return
+        key = (int(alert.alert_id), channel)
+        with self._cooldown_lock:
+            self.cooldown_counts[key] = self.cooldown_counts.get(key, 0) + 1
+
     def check_hourly_alert_cooldown(self, alert: AlertConfig, channel: str, max_hourly_alerts: int) -> bool:
         """
         Check if an hourly alert has exceeded its daily limit for a specific channel.
@@ -408,6 +997,24 @@ class AlertProcessor:
             self.logger.warning(f"Alert '{alert.name}' has no alert_id, cannot check cooldown. Allowing alert.")
             return True
         
+        # Use the preloaded counts when they cover today
+        with self._cooldown_lock:
+            preloaded = self.cooldown_counts is not None and self.cooldown_date == date.today()
+            if preloaded:
+                alerts_sent_today = self.cooldown_counts.get((int(alert.alert_id), channel), 0)
+        if preloaded:
+            self.logger.info(
+                f"Cooldown check for alert '{alert.name}' (ID: {alert.alert_id}) channel {channel}: "
+                f"{alerts_sent_today} alerts sent today, max allowed: {max_hourly_alerts}"
+            )
+            if alerts_sent_today >= max_hourly_alerts:
+                self.logger.info(
+                    f"Alert '{alert.name}' is in cooldown for channel {channel}. "
+                    f"Already sent {alerts_sent_today} alerts today (max: {max_hourly_alerts})"
+                )
+                return False
+            return True
+        
         current_date = date.today()
         
         # Query to count how many alerts were generated today for this alert_id and channel
@@ -436,48 +1043,20 @@ class AlertProcessor:
         try:
             self.logger.info(f"Checking cooldown for alert_id {alert.alert_id} on date {current_date} for channel {channel}")
             
-            # Add timeout to prevent hanging queries (45 seconds total for cooldown check)
-            # Use ThreadPoolExecutor to ensure timeout is enforced even if BigQuery client hangs
-            # Wrap both query submission and result waiting in timeout
-            # Increased timeouts to allow for table operations after cleanup
-            query_job = None
+            # The job runner enforces the timeout at the API level and cancels the job if it is exceeded
+            handle = self.job_runner.run(
+                f"cooldown:{alert.alert_id}:{channel}", cooldown_query, job_config=job_config,
+                timeout_seconds=COOLDOWN_QUERY_TIMEOUT_SECONDS
+            )
             try:
-                with ThreadPoolExecutor(max_workers=1) as executor:
-                    # Submit the query in a thread with timeout
-                    future_query = executor.submit(self.client.query, cooldown_query, job_config)
-                    query_job = future_query.result(timeout=15)  # 15 seconds to submit query
-                    
-                    # Wait for query result with timeout
-                    future_result = executor.submit(query_job.result, timeout=15)
-                    results = future_result.result(timeout=15)  # 15 seconds to get result
-            except (FuturesTimeoutError, Exception) as timeout_error:
-                # Try to cancel the query job to free up resources
-                if query_job:
-                    try:
-                        query_job.cancel()
-                        self.logger.info(f"Cancelled timed-out cooldown query job for alert '{alert.name}' (ID: {alert.alert_id})")
-                    except Exception as cancel_error:
-                        self.logger.warning(f"Failed to cancel cooldown query job: {str(cancel_error)}")
-                
+                rows_list = list(handle.result(timeout=15))
+            except Exception as timeout_error:
                 self.logger.warning(
-                    f"Cooldown check query timed out for alert '{alert.name}' (ID: {alert.alert_id}) for channel {channel}. "
+                    f"Cooldown check query failed or timed out for alert '{alert.name}' (ID: {alert.alert_id}) for channel {channel}. "
                     f"Allowing alert to proceed (fail open). Error: {str(timeout_error)}"
                 )
                 return True  # Fail open - allow alert if we can't check cooldown
             
-            # Wrap result iteration in timeout as well - iteration can trigger additional API calls
-            try:
-                with ThreadPoolExecutor(max_workers=1) as executor:
-                    # Convert results to list with timeout (this forces all pages to be fetched)
-                    future_list = executor.submit(lambda: list(results))
-                    rows_list = future_list.result(timeout=15)  # 15 seconds to iterate/fetch all pages
-            except (FuturesTimeoutError, Exception) as iteration_timeout:
-                self.logger.warning(
-                    f"Cooldown check result iteration timed out for alert '{alert.name}' (ID: {alert.alert_id}) for channel {channel}. "
-                    f"Allowing alert to proceed (fail open). Error: {str(iteration_timeout)}"
-                )
-                return True  # Fail open - allow alert if we can't iterate results
-            
             for row in rows_list:
                 alerts_sent_today = row.alerts_sent_today
                 
@@ -506,6 +1085,9 @@ class AlertProcessor:
                           threshold: int = None, channel: str = None, success: bool = True, error_message: str = None):
         """
         Log the alert execution to the history table for cooldown tracking.
+        
+        The row is buffered (and spilled to a local file) and written to the history table
+        by flush_execution_log at the end of the run.
         """
         # Skip logging if alert doesn't have an alert_id
         if not alert.alert_id:
@@ -532,79 +1114,47 @@ class AlertProcessor:
         resolution_str = str(alert.resolution) if alert.resolution is not None else ""
         error_message_str = str(error_message) if error_message is not None else ""
         
-        if self.test_mode:
-            history_table = 'yotam-395120.peerplay.bigquery_alerts_execution_history_stage'
-        else:
-            history_table = 'yotam-395120.peerplay.bigquery_alerts_execution_history'
-        insert_query = f"""
-        INSERT INTO `{history_table}`
-        (alert_id, alert_name, execution_timestamp, execution_date, alert_generated, 
-         row_count, threshold_value, slack_channel, resolution, success, error_message)
-        VALUES (@alert_id, @alert_name, @execution_timestamp, @execution_date, @alert_generated,
-                @row_count, @threshold_value, @slack_channel, @resolution, @success, @error_message)
-        """
-        
-        # Create parameters with explicit type checking
-        job_config = bigquery.QueryJobConfig(
-            query_parameters=[
-                bigquery.ScalarQueryParameter("alert_id", "INT64", alert_id_int),
-                bigquery.ScalarQueryParameter("alert_name", "STRING", alert_name_str),
-                bigquery.ScalarQueryParameter("execution_timestamp", "TIMESTAMP", current_timestamp),
-                bigquery.ScalarQueryParameter("execution_date", "DATE", current_date),
-                bigquery.ScalarQueryParameter("alert_generated", "BOOL", alert_generated_bool),
-                bigquery.ScalarQueryParameter("row_count", "INT64", row_count_int),
-                bigquery.ScalarQueryParameter("threshold_value", "INT64", threshold_int),
-                bigquery.ScalarQueryParameter("slack_channel", "STRING", slack_channel_str),
-                bigquery.ScalarQueryParameter("resolution", "STRING", resolution_str),
-                bigquery.ScalarQueryParameter("success", "BOOL", success_bool),
-                bigquery.ScalarQueryParameter("error_message", "STRING", error_message_str)
-            ]
-        )
+        # Pre-flight and cost fields recorded by process_alert for this alert
+        evaluation = self.alert_evaluations.get(alert_id_int, {})
         
         try:
-            self.logger.info(f"Attempting to log execution for alert '{alert.name}' (ID: {alert_id_int})")
-            self.logger.info(f"Log parameters: alert_generated={alert_generated_bool}, success={success_bool}, date={current_date}")
-            
-            # Create a separate BigQuery client for execution logging to avoid connection pool issues
-            # If the main client's connection is blocked, this ensures execution logging can still proceed
-            logging_client = setup_credentials()
-            
-            # Add timeout to prevent hanging queries (35 seconds total for execution logging)
-            # Use ThreadPoolExecutor to ensure timeout is enforced even if BigQuery client hangs
-            # Wrap both query submission and result waiting in timeout
-            # Increased timeout to 30 seconds for result retrieval to allow for table operations
-            query_job = None
-            try:
-                with ThreadPoolExecutor(max_workers=1) as executor:
-                    # Submit the query in a thread with timeout using the separate client
-                    future_query = executor.submit(logging_client.query, insert_query, job_config)
-                    query_job = future_query.result(timeout=5)  # 5 seconds to submit query
-                    
-                    # Wait for query result with timeout
-                    future_result = executor.submit(query_job.result, timeout=30)
-                    future_result.result(timeout=30)  # 30 seconds to get result
-            except (FuturesTimeoutError, Exception) as timeout_error:
-                # Try to cancel the query job to free up resources
-                if query_job:
-                    try:
-                        query_job.cancel()
-                        self.logger.info(f"Cancelled timed-out query job for alert '{alert.name}' (ID: {alert_id_int})")
-                    except Exception as cancel_error:
-                        self.logger.warning(f"Failed to cancel query job: {str(cancel_error)}")
-                
-                self.logger.warning(
-                    f"Execution logging query timed out for alert '{alert.name}' (ID: {alert_id_int}). "
-                    f"Logging failed. Error: {str(timeout_error)}"
-                )
-                return False  # Return False since logging failed
-            
-            self.logger.info(f"✅ Alert execution logged successfully for '{alert.name}' (ID: {alert_id_int})")
+            with self._log_lock:
+                if self._logs_closed:
+                    self.logger.warning(f"Execution log closed after the run deadline - not logging alert '{alert.name}'")
+                    return False
+                self.execution_log.append({
+                    'run_id': self.run_id,
+                    'sql_hash': evaluation.get('sql_hash'),
+                    'source_last_modified': evaluation.get('source_last_modified'),
+                    'estimated_bytes': evaluation.get('estimated_bytes'),
+                    'bytes_processed': evaluation.get('bytes_processed'),
+                    'bytes_billed': evaluation.get('bytes_billed'),
+                    'alert_id': alert_id_int,
+                    'alert_name': alert_name_str,
+                    'execution_timestamp': current_timestamp,
+                    'execution_date': current_date,
+                    'alert_generated': alert_generated_bool,
+                    'row_count': row_count_int,
+                    'threshold_value': threshold_int,
+                    'slack_channel': slack_channel_str,
+                    'resolution': resolution_str,
+                    'success': success_bool,
+                    'error_message': error_message_str
+                })
+            self.logger.info(
+                f"Buffered execution log for alert '{alert.name}' (ID: {alert_id_int}): "
+                f"alert_generated={alert_generated_bool}, success={success_bool}, date={current_date}"
+            )
             return True
             
         except Exception as e:
             self.logger.error(f"❌ Failed to log alert execution for '{alert.name}' (ID: {alert_id_int}): {str(e)}")
             return False
 
+    def flush_execution_log(self) -> bool:
+        """Write all buffered execution history rows with a single load job."""
+        return self.execution_log.flush()
+
     def get_slack_webhook_url(self, channel: str) -> str:
         base_url = "https://hooks.slack.com/services/T03SBHW3W4S"
         
@@ -638,14 +1188,7 @@ class AlertProcessor:
 
         # Add cooldown information for hourly alerts - channel-specific
         cooldown_text = ""
-        max_hourly_alerts = None
-        if alert.resolution == 'H':
-            if channel == 'data-alerts-sandbox' and alert.max_hourly_alerts_sandbox is not None:
-                max_hourly_alerts = alert.max_hourly_alerts_sandbox
-            elif channel == 'data-alerts-non-critical' and alert.max_hourly_alerts_non_critical is not None:
-                max_hourly_alerts = alert.max_hourly_alerts_non_critical
-            elif channel == 'data-alerts-critical' and alert.max_hourly_alerts_critical is not None:
-                max_hourly_alerts = alert.max_hourly_alerts_critical
+        max_hourly_alerts = self.get_compiled_alert(alert).max_hourly_for(channel)
         
         if max_hourly_alerts is not None:
             cooldown_text = f"*Max alerts per day:*\n{max_hourly_alerts}"
@@ -808,11 +1351,24 @@ class AlertProcessor:
             return False
             
         try:
-            response = requests.post(
-                webhook_url,
-                data=json.dumps(message),
-                headers={'Content-Type': 'application/json'}
-            )
+            # Slack answers 429 with a Retry-After header when the channel is rate limited
+            max_retries = 3
+            for attempt in range(max_retries + 1):
+                response = self.slack_session.post(
+                    webhook_url,
+                    data=json.dumps(message),
+                    headers={'Content-Type': 'application/json'},
+                    timeout=10
+                )
+                if response.status_code == 429 and attempt < max_retries:
+                    try:
+                        retry_after = max(float(response.headers.get('Retry-After', 1)), 0.0)
+                    except (TypeError, ValueError):
+                        retry_after = 1.0
+                    self.logger.warning(f"Slack rate limited channel {channel}, retrying in {retry_after:.1f}s (attempt {attempt + 1}/{max_retries})")
+                    sleep(retry_after)
+                    continue
+                break
             response.raise_for_status()
             self.logger.info(f"Message sent to Slack channel {channel} successfully")
             return True
@@ -820,50 +1376,171 @@ class AlertProcessor:
             self.logger.error(f"Error sending message to Slack channel {channel}: {str(e)}")
             return False
 
+    def get_compiled_alert(self, alert: AlertConfig) -> CompiledAlert:
+        """The alert's compiled tier table (compiled at startup, or on first use for other alerts)"""
+        compiled = self._compiled_alerts.get(id(alert))
+        if compiled is None or compiled.alert is not alert:
+            compiled = CompiledAlert(alert)
+            self._compiled_alerts[id(alert)] = compiled
+        return compiled
+
+    def get_threshold_channels(self, alert: AlertConfig) -> list:
+        """(channel, threshold) pairs for every channel the alert has a threshold for"""
+        return [(tier.channel, tier.threshold) for tier in self.get_compiled_alert(alert).tiers]
+
+    def fetch_alert_result(self, handle, eval_mode: str = 'first_row'):
+        """
+        Get the row count and first row of a finished alert query.
+        
+        In 'first_row' mode the count comes from the job's total_rows metadata and only one row is
+        fetched (max_results=1). In 'count' mode the query was wrapped by build_count_query and
+        returns a single row holding both values.
+        
+        Returns:
+            Tuple of (row_count, first_row dict or None)
+        """
+        result = handle.result(max_results=1, timeout=60)
+        row = next(iter(result), None)
+        
+        if eval_mode == 'count':
+            if row is None:
+                return 0, None
+            first_row = row['alert_first_row']
+            return row['alert_row_count'], dict(first_row) if first_row else None
+        
+        row_count = result.total_rows or 0
+        return row_count, dict(row) if row is not None else None
+
     def process_alert(self, alert: AlertConfig) -> Dict[str, Any]:
+        """Process one alert and record its latency and cost telemetry in the metrics buffer."""
+        started = monotonic()
+        metrics = {'slack_posts': 0, 'slack_post_seconds': 0.0}
+        result = self._process_alert(alert, metrics)
+        
+        try:
+            with self._log_lock:
+                if not self._logs_closed:
+                    self.metrics_log.append({
+                        'run_id': self.run_id,
+                        'metric_timestamp': datetime.now(),
+                        'alert_id': int(alert.alert_id) if alert.alert_id and str(alert.alert_id).isdigit() else None,
+                        'alert_name': alert.name,
+                        'resolution': alert.resolution,
+                        'success': result.get('success', False),
+                        'skipped': result.get('skipped'),
+                        'total_seconds': round(monotonic() - started, 3),
+                        **metrics
+                    })
+        except Exception as e:
+            self.logger.warning(f"Failed to record metrics for alert '{alert.name}': {str(e)}")
+        return result
+
+    def _process_alert(self, alert: AlertConfig, metrics: Dict[str, Any]) -> Dict[str, Any]:
         try:
             if alert.resolution == 'H' and not alert.alert_id:
                 self.logger.warning(f"Hourly alert '{alert.name}' has no alert_id - cooldown mechanism disabled")
             
-            # Add timeout to prevent hanging queries for main alert execution
-            # Use ThreadPoolExecutor to ensure timeout is enforced even if BigQuery client hangs
-            # Wrap both query submission and result waiting in timeout
-            # Timeouts set to allow complex queries while staying under Gunicorn timeout (120s)
-            # Total: 30s submit + 60s result = 90s (leaves 30s buffer for other operations)
-            query_job = None
+            eval_mode = get_alert_eval_mode()
+            uses_base_queries = bool(get_referenced_base_queries(alert.sql))
+            # Base queries inlined for pre-flight, so the dry run sees the real sources and SQL changes
+            inlined_sql = self.resolve_base_queries(alert.sql, inline=True) if uses_base_queries else alert.sql
+            
+            evaluation = {'sql_hash': get_sql_hash(inlined_sql)}
+            if alert.alert_id and str(alert.alert_id).isdigit():
+                self.alert_evaluations[int(alert.alert_id)] = evaluation
+            
+            # Pre-flight: dry-run for bytes-to-scan and source table modification times
+            preflight_started = monotonic()
             try:
-                with ThreadPoolExecutor(max_workers=1) as executor:
-                    # Submit the query in a thread with timeout
-                    future_query = executor.submit(self.client.query, alert.sql)
-                    query_job = future_query.result(timeout=30)  # 30 seconds to submit query
-                    
-                    # Wait for query result with timeout
-                    future_result = executor.submit(query_job.result, timeout=60)
-                    results = future_result.result(timeout=60)  # 60 seconds to get result
-            except (FuturesTimeoutError, Exception) as timeout_error:
-                # Try to cancel the query job to free up resources
-                job_id = None
-                if query_job:
-                    try:
-                        job_id = getattr(query_job, 'job_id', None)
-                        query_job.cancel()
-                        self.logger.info(f"Cancelled timed-out alert query job for alert '{alert.name}' (ID: {alert.alert_id or 'N/A'})" + 
-                                       (f", BigQuery job_id: {job_id}" if job_id else ""))
-                    except Exception as cancel_error:
-                        self.logger.warning(f"Failed to cancel alert query job: {str(cancel_error)}")
-                
-                # Enhanced error logging with exception type and details
-                error_type = type(timeout_error).__name__
-                error_msg = str(timeout_error) if str(timeout_error) else repr(timeout_error)
-                job_id_str = f", BigQuery job_id: {job_id}" if job_id else ""
+                evaluation.update(self.preflight_alert(alert, inlined_sql))
+                metrics['preflight_seconds'] = round(monotonic() - preflight_started, 3)
+                self.logger.info(
+                    f"Pre-flight for alert '{alert.name}': {evaluation['estimated_bytes']} bytes to scan, "
+                    f"sources last modified {evaluation['source_last_modified'] or 'unknown'}"
+                )
+            except Exception as e:
+                self.logger.warning(f"Pre-flight dry run failed for alert '{alert.name}', running it anyway. Error: {str(e)}")
+            
+            if self.can_skip_unchanged_alert(alert, evaluation['sql_hash'], evaluation.get('source_last_modified'), inlined_sql):
+                self.logger.info(f"Skipping alert '{alert.name}' - source tables unchanged since its last evaluation, which met no threshold")
+                for channel, threshold in self.get_threshold_channels(alert):
+                    self.log_alert_execution(alert, alert_generated=False, row_count=0, threshold=threshold, channel=channel,
+                                             error_message="Skipped: source tables unchanged since last evaluation")
+                return {
+                    'success': True,
+                    'row_count': 0,
+                    'alert_generated': False,
+                    'skipped': 'sources_unchanged',
+                    'timestamp': datetime.now().isoformat(),
+                    'logging_success': True
+                }
+            
+            # The inlined estimate includes the shared base query scan, so it is not checked for those alerts
+            estimated_bytes = evaluation.get('estimated_bytes')
+            if alert.max_bytes_billed and not uses_base_queries and estimated_bytes is not None and estimated_bytes > alert.max_bytes_billed:
+                error_message = (
+                    f"Query would scan {estimated_bytes} bytes, above maximum_bytes_billed {alert.max_bytes_billed}. Alert not run."
+                )
+                self.logger.error(f"Alert '{alert.name}' (ID: {alert.alert_id or 'N/A'}): {error_message}")
+                logging_success = self.log_alert_execution(
+                    alert, 
+                    alert_generated=False, 
+                    row_count=0,
+                    threshold=1,
+                    success=False,
+                    error_message=error_message
+                )
+                return {
+                    'success': False,
+                    'row_count': 0,
+                    'alert_generated': False,
+                    'error': error_message,
+                    'timestamp': datetime.now().isoformat(),
+                    'logging_success': logging_success
+                }
+            
+            # Alerts using base queries read the materialized results, once per run
+            alert_sql = self.resolve_base_queries(alert.sql) if uses_base_queries else alert.sql
+            if eval_mode == 'count' and ORDER_BY_SQL_PATTERN.search(alert_sql):
+                eval_mode = 'first_row'
+            if eval_mode == 'count':
+                alert_sql = build_count_query(alert_sql)
+            
+            # maximum_bytes_billed also guards the real job in case the estimate was low
+            job_config = bigquery.QueryJobConfig()
+            if alert.max_bytes_billed:
+                job_config.maximum_bytes_billed = alert.max_bytes_billed
+            
+            # Submit through the job runner: job_timeout_ms enforces the timeout server-side and the
+            # runner cancels the job if it is still running at the deadline (stays under Gunicorn timeout)
+            handle = self.job_runner.run(
+                f"alert:{alert.alert_id or alert.name}", alert_sql, job_config=job_config,
+                timeout_seconds=ALERT_QUERY_TIMEOUT_SECONDS
+            )
+            evaluation['bytes_processed'] = handle.bytes_processed
+            evaluation['bytes_billed'] = handle.bytes_billed
+            metrics.update({
+                'submit_seconds': handle.submit_seconds,
+                'queue_seconds': handle.queue_seconds,
+                'execution_seconds': handle.execution_seconds,
+                'job_latency_seconds': handle.latency_seconds,
+                'bytes_processed': handle.bytes_processed,
+                'bytes_billed': handle.bytes_billed,
+                'slot_millis': handle.slot_millis,
+                'cache_hit': handle.cache_hit
+            })
+            if handle.error:
+                error_type = type(handle.error).__name__
+                error_msg = str(handle.error) if str(handle.error) else repr(handle.error)
+                job_id_str = f", BigQuery job_id: {handle.job_id}" if handle.job_id else ""
                 
                 self.logger.error(
-                    f"Alert query timed out for alert '{alert.name}' (ID: {alert.alert_id or 'N/A'}){job_id_str}. "
-                    f"Timeout after 30s submit + 60s result. Exception type: {error_type}, Error: {error_msg}"
+                    f"Alert query failed for alert '{alert.name}' (ID: {alert.alert_id or 'N/A'}){job_id_str} "
+                    f"after {handle.latency_seconds:.1f}s (timeout {ALERT_QUERY_TIMEOUT_SECONDS}s). Exception type: {error_type}, Error: {error_msg}"
                 )
                 
                 # Log the execution as failed
-                error_message = f"Query timeout after 90s total (30s submit + 60s result). Exception: {error_type}: {error_msg}"
+                error_message = f"Query failed after {handle.latency_seconds:.1f}s (timeout {ALERT_QUERY_TIMEOUT_SECONDS}s). Exception: {error_type}: {error_msg}"
                 logging_success = self.log_alert_execution(
                     alert, 
                     alert_generated=False, 
@@ -882,36 +1559,22 @@ class AlertProcessor:
                     'logging_success': logging_success
                 }
             
-            # Wrap result iteration in timeout as well - iteration can trigger additional API calls
+            # Only the row count and the first row are needed, so the result set is never paged into memory
             try:
-                with ThreadPoolExecutor(max_workers=1) as executor:
-                    # Convert results to list with timeout (this forces all pages to be fetched)
-                    future_list = executor.submit(lambda: list(results))
-                    rows = future_list.result(timeout=60)  # 60 seconds to iterate/fetch all pages
-            except (FuturesTimeoutError, Exception) as iteration_timeout:
-                # Try to cancel the query job to free up resources
-                job_id = None
-                if query_job:
-                    try:
-                        job_id = getattr(query_job, 'job_id', None)
-                        query_job.cancel()
-                        self.logger.info(f"Cancelled timed-out alert query job after iteration timeout for alert '{alert.name}' (ID: {alert.alert_id or 'N/A'})" +
-                                       (f", BigQuery job_id: {job_id}" if job_id else ""))
-                    except Exception as cancel_error:
-                        self.logger.warning(f"Failed to cancel alert query job: {str(cancel_error)}")
-                
-                # Enhanced error logging with exception type and details
+                row_count, first_row = self.fetch_alert_result(handle, eval_mode)
+                metrics['rows_returned'] = row_count
+            except Exception as iteration_timeout:
                 error_type = type(iteration_timeout).__name__
                 error_msg = str(iteration_timeout) if str(iteration_timeout) else repr(iteration_timeout)
-                job_id_str = f", BigQuery job_id: {job_id}" if job_id else ""
+                job_id_str = f", BigQuery job_id: {handle.job_id}" if handle.job_id else ""
                 
                 self.logger.error(
-                    f"Alert query result iteration timed out for alert '{alert.name}' (ID: {alert.alert_id or 'N/A'}){job_id_str}. "
-                    f"Timeout after 60s iteration. Exception type: {error_type}, Error: {error_msg}"
+                    f"Alert query result iteration failed for alert '{alert.name}' (ID: {alert.alert_id or 'N/A'}){job_id_str}. "
+                    f"Exception type: {error_type}, Error: {error_msg}"
                 )
                 
                 # Log the execution as failed
-                error_message = f"Result iteration timeout after 60s. Exception: {error_type}: {error_msg}"
+                error_message = f"Result iteration failed. Exception: {error_type}: {error_msg}"
                 logging_success = self.log_alert_execution(
                     alert, 
                     alert_generated=False, 
@@ -930,8 +1593,6 @@ class AlertProcessor:
                     'logging_success': logging_success
                 }
             
-            row_count = len(rows)
-            
             # Define newline characters outside the f-string
             newline = '\n'
             carriage_return = '\r'
@@ -960,13 +1621,7 @@ class AlertProcessor:
             if row_count == 0:
                 self.logger.info("No rows returned - no alert will be generated")
                 # Log for all channels that have thresholds defined
-                channels_to_log = []
-                if alert.threshold_sandbox is not None:
-                    channels_to_log.append(('data-alerts-sandbox', alert.threshold_sandbox))
-                if alert.threshold_non_critical is not None:
-                    channels_to_log.append(('data-alerts-non-critical', alert.threshold_non_critical))
-                if alert.threshold_critical is not None:
-                    channels_to_log.append(('data-alerts-critical', alert.threshold_critical))
+                channels_to_log = self.get_threshold_channels(alert)
                 
                 for channel, threshold in channels_to_log:
                     self.log_alert_execution(alert, alert_generated=False, row_count=row_count, threshold=threshold, channel=channel)
@@ -979,21 +1634,12 @@ class AlertProcessor:
                     'logging_success': True
                 }
             
-            # Get the first row for analysis and reporting
-            first_row = dict(rows[0])
-            
             # Check for count columns with value 0
             count_columns = [col for col in first_row.keys() if 'count' in col.lower()]
             if count_columns and all(first_row[col] == 0 for col in count_columns):
                 self.logger.info("Count query returned all zeros - no alert will be generated")
                 # Log for all channels that have thresholds defined
-                channels_to_log = []
-                if alert.threshold_sandbox is not None:
-                    channels_to_log.append(('data-alerts-sandbox', alert.threshold_sandbox))
-                if alert.threshold_non_critical is not None:
-                    channels_to_log.append(('data-alerts-non-critical', alert.threshold_non_critical))
-                if alert.threshold_critical is not None:
-                    channels_to_log.append(('data-alerts-critical', alert.threshold_critical))
+                channels_to_log = self.get_threshold_channels(alert)
                 
                 for channel, threshold in channels_to_log:
                     self.log_alert_execution(alert, alert_generated=False, row_count=row_count, threshold=threshold, channel=channel)
@@ -1008,14 +1654,8 @@ class AlertProcessor:
                     'logging_success': True
                 }
             
-            # Check which channels should receive alerts based on thresholds
-            channels_to_send = []
-            if alert.threshold_sandbox is not None and row_count >= alert.threshold_sandbox:
-                channels_to_send.append(('data-alerts-sandbox', alert.threshold_sandbox, alert.max_hourly_alerts_sandbox))
-            if alert.threshold_non_critical is not None and row_count >= alert.threshold_non_critical:
-                channels_to_send.append(('data-alerts-non-critical', alert.threshold_non_critical, alert.max_hourly_alerts_non_critical))
-            if alert.threshold_critical is not None and row_count >= alert.threshold_critical:
-                channels_to_send.append(('data-alerts-critical', alert.threshold_critical, alert.max_hourly_alerts_critical))
+            # Check which channels should receive alerts based on thresholds: (channel, threshold, max_hourly) tiers
+            channels_to_send = self.get_compiled_alert(alert).firing_tiers(row_count)
             
             if channels_to_send:
                 self.logger.info(f"Alert will be generated. Number of returned rows = {row_count}")
@@ -1039,9 +1679,20 @@ class AlertProcessor:
                             channels_skipped_cooldown.append(channel)
                             continue
                     
+                    # Past the run deadline nothing more is sent; the alert is reported as failed
+                    if self._run_cancelled.is_set():
+                        self.logger.warning(f"Run deadline exceeded - alert '{alert.name}' not sent to {channel}")
+                        self.log_alert_execution(alert, alert_generated=False, row_count=row_count,
+                                   threshold=threshold, channel=channel, success=False,
+                                   error_message="Run deadline exceeded before the alert was sent")
+                        continue
+                    
                     # Send alert to Slack
                     message = self.format_slack_message(alert, row_count, first_row, channel, threshold)
+                    slack_started = monotonic()
                     slack_success = self.send_to_slack(message, channel)
+                    metrics['slack_posts'] += 1
+                    metrics['slack_post_seconds'] = round(metrics['slack_post_seconds'] + monotonic() - slack_started, 3)
                     
                     # Log the execution AFTER sending to Slack
                     logging_success = self.log_alert_execution(
@@ -1061,6 +1712,7 @@ class AlertProcessor:
                     if slack_success:
                         self.logger.info(f"✅ Alert sent successfully to {channel}")
                         channels_sent.append(channel)
+                        self.record_alert_sent(alert, channel)
                     else:
                         self.logger.error(f"❌ Failed to send alert to {channel}")
                 
@@ -1075,13 +1727,7 @@ class AlertProcessor:
                 }
             else:
                 # No thresholds met - log for all channels that have thresholds defined
-                channels_to_log = []
-                if alert.threshold_sandbox is not None:
-                    channels_to_log.append(('data-alerts-sandbox', alert.threshold_sandbox))
-                if alert.threshold_non_critical is not None:
-                    channels_to_log.append(('data-alerts-non-critical', alert.threshold_non_critical))
-                if alert.threshold_critical is not None:
-                    channels_to_log.append(('data-alerts-critical', alert.threshold_critical))
+                channels_to_log = self.get_threshold_channels(alert)
                 
                 threshold_info = ', '.join([f"{ch[0]}: {ch[1]}" for ch in channels_to_log])
                 self.logger.info(f"Alert will not be generated. Row count {row_count} does not meet any threshold. Thresholds: {threshold_info}")
@@ -1102,13 +1748,7 @@ class AlertProcessor:
             error_msg = f"Error processing alert '{alert.name}': {str(e)}"
             self.logger.error(error_msg)
             # Log the execution with error for all channels that have thresholds defined
-            channels_to_log = []
-            if alert.threshold_sandbox is not None:
-                channels_to_log.append(('data-alerts-sandbox', alert.threshold_sandbox))
-            if alert.threshold_non_critical is not None:
-                channels_to_log.append(('data-alerts-non-critical', alert.threshold_non_critical))
-            if alert.threshold_critical is not None:
-                channels_to_log.append(('data-alerts-critical', alert.threshold_critical))
+            channels_to_log = self.get_threshold_channels(alert)
             
             # If no channels defined, use a default channel for logging
             if not channels_to_log:
@@ -1125,26 +1765,121 @@ class AlertProcessor:
                 'logging_success': True
             }
 
-    def process_all_alerts(self) -> list:
-        self.logger.info("Starting alert processing")
-        results = []
+    def process_all_alerts(self, max_workers: int = None, deadline_seconds: float = None) -> list:
+        """
+        Process all loaded alerts.
         
-        for alert in self.alerts:
-            result = self.process_alert(alert)
-            results.append({
-                'alert_name': alert.name,
-                'result': result
-            })
+        Alerts run on a bounded worker pool (max_workers, default ALERT_MAX_WORKERS; 1 = one at a time).
+        When the run exceeds deadline_seconds (default ALERT_RUN_DEADLINE_SECONDS), outstanding
+        BigQuery jobs are cancelled and unfinished alerts are reported as failed.
+        Results keep the order of self.alerts.
+        """
+        max_workers = max_workers if max_workers is not None else get_max_workers()
+        deadline_seconds = deadline_seconds if deadline_seconds is not None else get_run_deadline_seconds()
+        
+        self.logger.info(f"Starting alert processing ({len(self.alerts)} alerts, {max_workers} workers, deadline {deadline_seconds:.0f}s)")
+        
+        # max_workers=1 runs the alerts one at a time, under the same deadline and cancellation
+        results = self._process_alerts_concurrently(max(1, min(max_workers, len(self.alerts))), deadline_seconds)
         
         self.logger.info("Completed processing all alerts")
         
+        # Write the buffered execution history and alert metrics in one batch each
+        buffered_rows = len(self.execution_log)
+        flush_success = self.flush_execution_log()
+        self.metrics_log.flush()
+        
         # Summary of logging success
-        successful_logs = sum(1 for r in results if r['result'].get('logging_success', False))
+        successful_logs = sum(1 for r in results if r['result'].get('logging_success', False)) if flush_success else 0
         total_alerts = len(results)
-        self.logger.info(f"Logging summary: {successful_logs}/{total_alerts} alerts logged successfully")
+        self.logger.info(
+            f"Logging summary: {successful_logs}/{total_alerts} alerts logged successfully "
+            f"({buffered_rows} execution log rows, flush {'succeeded' if flush_success else 'failed'})"
+        )
+        
+        # Summary of BigQuery job cost and latency
+        job_stats = self.job_runner.job_stats()
+        total_bytes = sum(j['bytes_processed'] or 0 for j in job_stats)
+        slowest = sorted(job_stats, key=lambda j: j['latency_seconds'] or 0, reverse=True)[:5]
+        skipped_unchanged = sum(1 for r in results if r['result'].get('skipped') == 'sources_unchanged')
+        self.logger.info(
+            f"BigQuery job summary: {len(job_stats)} jobs, {total_bytes} bytes processed, "
+            f"{skipped_unchanged} alerts skipped with unchanged sources"
+        )
+        for j in slowest:
+            self.logger.info(f"  Slow job '{j['name']}' (job_id: {j['job_id']}): {j['latency_seconds']}s, {j['bytes_processed'] or 0} bytes")
         
         return results
 
+    def _process_alerts_concurrently(self, max_workers: int, deadline_seconds: float) -> list:
+        deadline = monotonic() + deadline_seconds
+        results_by_index = {}
+        
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='alert')
+        try:
+            future_to_index = {
+                executor.submit(self.process_alert, alert): index
+                for index, alert in enumerate(self.alerts)
+            }
+            pending = set(future_to_index)
+            
+            def collect(done):
+                for future in done:
+                    index = future_to_index[future]
+                    if future.cancelled():
+                        continue
+                    try:
+                        results_by_index[index] = future.result()
+                    except Exception as e:
+                        self.logger.error(f"Unexpected error processing alert '{self.alerts[index].name}': {str(e)}")
+                        results_by_index[index] = {
+                            'success': False,
+                            'error': f"Error processing alert '{self.alerts[index].name}': {str(e)}",
+                            'timestamp': datetime.now().isoformat(),
+                            'logging_success': False
+                        }
+            
+            while pending:
+                remaining = deadline - monotonic()
+                if remaining <= 0:
+                    break
+                done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                collect(done)
+            
+            if pending:
+                self.logger.error(
+                    f"Run deadline of {deadline_seconds:.0f}s exceeded with {len(pending)} alerts unfinished - cancelling outstanding BigQuery jobs"
+                )
+                for future in pending:
+                    future.cancel()
+                self.cancel_outstanding_jobs()
+                
+                # Running alerts now fail fast on their cancelled jobs; let them record that before the flush
+                done, pending = wait(pending, timeout=RUN_DEADLINE_GRACE_SECONDS)
+                collect(done)
+                if pending:
+                    self.logger.error(f"{len(pending)} alerts still running {RUN_DEADLINE_GRACE_SECONDS}s after the deadline - their results are dropped")
+                
+                for index in set(future_to_index.values()) - set(results_by_index):
+                    results_by_index[index] = {
+                        'success': False,
+                        'row_count': 0,
+                        'alert_generated': False,
+                        'error': f"Run deadline of {deadline_seconds:.0f}s exceeded before alert completed",
+                        'timestamp': datetime.now().isoformat(),
+                        'logging_success': False
+                    }
+        finally:
+            # Alerts still running after the grace period can no longer send or log; do not block on them
+            self._run_cancelled.set()
+            self.close_logs()
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        return [
+            {'alert_name': alert.name, 'result': results_by_index[index]}
+            for index, alert in enumerate(self.alerts)
+        ]
+
 @functions_framework.http
 def run_alerts(request):
     """
@@ -1164,18 +1899,37 @@ def run_alerts(request):
     try:
         # Get resolution from query parameters if specified
         resolution = request.args.get('resolution')
+        max_workers = request.args.get('max_workers', type=int)
+        # Optional sharding: process only alerts whose hash falls in shard (0-based) of num_shards
+        shard = request.args.get('shard', type=int)
+        num_shards = request.args.get('num_shards', type=int)
+        if 'num_shards' in request.args:
+            error = validate_num_shards(num_shards)
+            if error is None and num_shards > 1 and (shard is None or not 0 <= shard < num_shards):
+                error = f"shard must be an integer between 0 and {num_shards - 1}"
+            if error:
+                logger.error(f"Invalid sharding parameters: {error}")
+                return jsonify({
+                    'success': False,
+                    'error': error,
+                    'timestamp': datetime.now().isoformat()
+                }), 400
         # Check TEST_MODE environment variable for Cloud Run
         test_mode = is_test_mode()
-        processor = AlertProcessor(resolution, test_mode=test_mode)
-        results = processor.process_all_alerts()
+        processor = AlertProcessor(resolution, test_mode=test_mode, shard=shard, num_shards=num_shards)
+        results = processor.process_all_alerts(max_workers=max_workers)
         logger.info("Alert Processor Cloud Run Function completed successfully")
         
         # Return results as JSON with flask's jsonify for proper response
-        return jsonify({
+        response = {
             'success': True,
             'results': results,
             'timestamp': datetime.now().isoformat()
-        })
+        }
+        if num_shards and num_shards > 1:
+            response['shard'] = shard
+            response['num_shards'] = num_shards
+        return jsonify(response)
     except Exception as e:
         logger.error(f"Alert Processor Cloud Run Function failed: {str(e)}")
         # Return error as JSON
@@ -1189,6 +1943,130 @@ def run_alerts(request):
 # Create Flask app and wrap the functions_framework handler
 app = Flask(__name__)
 
+@app.route('/coordinate', methods=['GET', 'POST'])
+def coordinate_shards():
+    """
+    Fan one run out to num_shards invocations of this service and aggregate their results.
+    
+    Query parameters: resolution, num_shards (default ALERT_NUM_SHARDS), max_workers (passed to each shard).
+    Shards are called in parallel on SERVICE_URL (required), each with its own request timeout,
+    so the alert catalog is not bound by one request's time limit. The caller's credentials are
+    never forwarded: shards are called with an ID token of this service's own account.
+    """
+    logger = setup_logging()
+    resolution = flask_request.args.get('resolution')
+    # A num_shards that is not an integer reads as None and is rejected, not replaced by the default
+    num_shards = flask_request.args.get('num_shards', type=int) if 'num_shards' in flask_request.args else get_num_shards()
+    max_workers = flask_request.args.get('max_workers', type=int)
+    error = validate_num_shards(num_shards)
+    if error:
+        logger.error(f"Invalid num_shards: {error}")
+        return jsonify({
+            'success': False,
+            'error': error,
+            'timestamp': datetime.now().isoformat()
+        }), 400
+    # Never derive the shard URL from the request's Host header
+    service_url = os.getenv('SERVICE_URL', '').rstrip('/')
+    if not service_url:
+        logger.error("SERVICE_URL is not set, cannot call shards")
+        return jsonify({
+            'success': False,
+            'error': 'SERVICE_URL must be set to the service URL to run sharded',
+            'timestamp': datetime.now().isoformat()
+        }), 500
+    # Each shard gets the run deadline plus time for startup and the final batch loads
+    shard_timeout = get_run_deadline_seconds() + 60
+    
+    headers = {}
+    try:
+        from google.oauth2 import id_token
+        headers['Authorization'] = f"Bearer {id_token.fetch_id_token(Request(), service_url)}"
+    except Exception as e:
+        # Local runs without a service account; the shards must then allow unauthenticated calls
+        logger.warning(f"Could not get an ID token for {service_url}, calling shards without one: {str(e)}")
+    
+    def call_shard(shard):
+        params = {'shard': shard, 'num_shards': num_shards}
+        if resolution:
+            params['resolution'] = resolution
+        if max_workers:
+            params['max_workers'] = max_workers
+        started = monotonic()
+        try:
+            response = requests.get(f"{service_url}/", params=params, headers=headers, timeout=shard_timeout)
+            body = response.json()
+            return {
+                'shard': shard,
+                'success': response.ok and body.get('success', False),
+                'status_code': response.status_code,
+                'seconds': round(monotonic() - started, 1),
+                'results': body.get('results', []),
+                'error': body.get('error')
+            }
+        except Exception as e:
+            return {
+                'shard': shard,
+                'success': False,
+                'seconds': round(monotonic() - started, 1),
+                'results': [],
+                'error': f"{type(e).__name__}: {str(e)}"
+            }
+    
+    logger.info(f"Coordinating {num_shards} shards for resolution {resolution} via {service_url}")
+    with ThreadPoolExecutor(max_workers=num_shards, thread_name_prefix='shard') as executor:
+        shard_results = list(executor.map(call_shard, range(num_shards)))
+    
+    results = [result for shard_result in shard_results for result in shard_result['results']]
+    failed_shards = [shard_result['shard'] for shard_result in shard_results if not shard_result['success']]
+    for shard_result in shard_results:
+        logger.info(
+            f"Shard {shard_result['shard']}/{num_shards}: {'ok' if shard_result['success'] else 'FAILED'}, "
+            f"{len(shard_result['results'])} alerts in {shard_result['seconds']}s"
+            + (f", error: {shard_result['error']}" if shard_result['error'] else "")
+        )
+    
+    return jsonify({
+        'success': not failed_shards,
+        'num_shards': num_shards,
+        'failed_shards': failed_shards,
+        'shards': [
+            {key: value for key, value in shard_result.items() if key != 'results'}
+            for shard_result in shard_results
+        ],
+        'results': results,
+        'timestamp': datetime.now().isoformat()
+    }), 200 if not failed_shards else 502
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """
+    Per-alert latency and cost percentiles from the metrics table.
+    
+    Query parameters: hours (look-back window, default 24), limit (max alerts, default 50).
+    Alerts are ordered by p90 total time, slowest first.
+    """
+    logger = setup_logging()
+    try:
+        hours = flask_request.args.get('hours', default=24, type=int)
+        limit = flask_request.args.get('limit', default=50, type=int)
+        metrics_table = get_metrics_table_name(is_test_mode())
+        alerts = query_alert_percentiles(setup_credentials(), metrics_table, hours=hours, limit=limit)
+        return jsonify({
+            'success': True,
+            'metrics_table': metrics_table,
+            'hours': hours,
+            'alerts': alerts,
+            'timestamp': datetime.now().isoformat()
+        })
+    except Exception as e:
+        logger.error(f"Failed to read alert metrics: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'timestamp': datetime.now().isoformat()
+        }), 500
+
 @app.route('/', methods=['GET', 'POST'])
 @app.route('/<path:path>', methods=['GET', 'POST'])
 def handle_request(path=''):
@@ -1227,24 +2105,29 @@ if __name__ == "__main__":
     This will be used when running the script directly on your laptop.
     
     Usage:
-        python main.py [H|D] [--test|--test-mode]
+        python main.py [H|D] [--test|--test-mode] [--shard=i/n]
         
     Examples:
         python main.py              # Run all alerts in production mode
         python main.py H           # Run hourly alerts in production mode
         python main.py --test      # Run all alerts in test mode (uses stage tables)
         python main.py H --test    # Run hourly alerts in test mode
+        python main.py H --shard=0/4  # Run the first of 4 shards of hourly alerts
     """
     try:
         # Parse command line arguments
         resolution = None
         test_mode = False
+        shard = None
+        num_shards = None
         
         for arg in sys.argv[1:]:
             if arg in ['H', 'D']:
                 resolution = arg
             elif arg in ['--test', '--test-mode']:
                 test_mode = True
+            elif arg.startswith('--shard='):
+                shard, num_shards = (int(part) for part in arg.split('=', 1)[1].split('/'))
         
         # Check environment variable for test mode
         if not test_mode:
@@ -1259,7 +2142,7 @@ if __name__ == "__main__":
             print("   - Settings table: yotam-395120.peerplay.bigquery_alerts_to_slack_settings")
             print("   - History table: yotam-395120.peerplay.bigquery_alerts_execution_history")
         
-        processor = AlertProcessor(resolution, test_mode=test_mode) 
+        processor = AlertProcessor(resolution, test_mode=test_mode, shard=shard, num_shards=num_shards) 
         results = processor.process_all_alerts()
         processor.logger.info("Program completed successfully")
         print(json.dumps(results, indent=2))
@@ -0,0 +1,98 @@
+"""
+Per-alert latency and cost telemetry for the alert processor.
+
+One row per alert per run is buffered during the run and loaded into the
+metrics table at the end (through ExecutionLogBuffer). The /metrics endpoint
+reads percentiles per alert back from that table.
+"""
+from typing import Any, Dict, List
+
+from google.cloud import bigquery
+
+
+ALERT_METRICS_SCHEMA = [
+    bigquery.SchemaField("run_id", "STRING"),
+    bigquery.SchemaField("metric_timestamp", "TIMESTAMP"),
+    bigquery.SchemaField("alert_id", "INT64"),
+    bigquery.SchemaField("alert_name", "STRING"),
+    bigquery.SchemaField("resolution", "STRING"),
+    bigquery.SchemaField("success", "BOOL"),
+    bigquery.SchemaField("skipped", "STRING"),
+    bigquery.SchemaField("total_seconds", "FLOAT64"),
+    bigquery.SchemaField("preflight_seconds", "FLOAT64"),
+    bigquery.SchemaField("submit_seconds", "FLOAT64"),
+    bigquery.SchemaField("queue_seconds", "FLOAT64"),
+    bigquery.SchemaField("execution_seconds", "FLOAT64"),
+    bigquery.SchemaField("job_latency_seconds", "FLOAT64"),
+    bigquery.SchemaField("bytes_processed", "INT64"),
+    bigquery.SchemaField("bytes_billed", "INT64"),
+    bigquery.SchemaField("slot_millis", "INT64"),
+    bigquery.SchemaField("cache_hit", "BOOL"),
+    bigquery.SchemaField("rows_returned", "INT64"),
+    bigquery.SchemaField("slack_posts", "INT64"),
+    bigquery.SchemaField("slack_post_seconds", "FLOAT64"),
+]
+
+# Metrics reported by /metrics as p50/p90/p99 per alert
+PERCENTILE_METRICS = [
+    'total_seconds',
+    'queue_seconds',
+    'execution_seconds',
+    'bytes_processed',
+    'slot_millis',
+    'rows_returned',
+    'slack_post_seconds',
+]
+
+
+def get_metrics_table_name(test_mode: bool) -> str:
+    """Get the alert metrics table name based on test mode"""
+    if test_mode:
+        return 'yotam-395120.peerplay.bigquery_alerts_metrics_stage'
+    return 'yotam-395120.peerplay.bigquery_alerts_metrics'
+
+
+def query_alert_percentiles(client, metrics_table: str, hours: int = 24, limit: int = 50) -> List[Dict[str, Any]]:
+    """
+    Percentiles of every metric per alert over the last `hours`, slowest alerts (p90 total time) first.
+
+    Args:
+        client: BigQuery client
+        metrics_table: Fully qualified metrics table
+        hours: Look-back window
+        limit: Maximum number of alerts returned
+
+    Returns:
+        List of dicts with alert_id, alert_name, runs, failures, cache_hits, total bytes billed
+        and p50/p90/p99 for each metric in PERCENTILE_METRICS
+    """
+    percentile_columns = ',\n'.join(
+        f"APPROX_QUANTILES({metric}, 100)[OFFSET(50)] AS {metric}_p50,\n"
+        f"APPROX_QUANTILES({metric}, 100)[OFFSET(90)] AS {metric}_p90,\n"
+        f"APPROX_QUANTILES({metric}, 100)[OFFSET(99)] AS {metric}_p99"
+        for metric in PERCENTILE_METRICS
+    )
+    query = f"""
+    SELECT
+      alert_id,
+      ANY_VALUE(alert_name) AS alert_name,
+      COUNT(*) AS runs,
+      COUNTIF(NOT success) AS failures,
+      COUNTIF(skipped IS NOT NULL) AS skipped,
+      COUNTIF(cache_hit) AS cache_hits,
+      SUM(bytes_billed) AS bytes_billed_total,
+      {percentile_columns}
+    FROM `{metrics_table}`
+    WHERE metric_timestamp >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL @hours HOUR)
+    GROUP BY alert_id
+    ORDER BY total_seconds_p90 DESC
+    LIMIT @limit
+    """
+    job_config = bigquery.QueryJobConfig(
+        query_parameters=[
+            bigquery.ScalarQueryParameter("hours", "INT64", hours),
+            bigquery.ScalarQueryParameter("limit", "INT64", limit),
+        ]
+    )
+    rows = client.query(query, job_config=job_config, timeout=15).result(timeout=60)
+    return [dict(row.items()) for row in rows]
@@ -4,7 +4,7 @@ from datetime import datetime, timedelta
 from typing import Dict, List
 from shared.config import get_config, load_events_config
 from shared.bigquery_client import query_events_by_minute
-from shared.slack_client import send_slack_alert
+from shared.slack_client import send_slack_alert, SlackDeliveryQueue
 
 
 # In-memory cache for last alert time per event per minute
@@ -19,6 +19,7 @@ def detect_anomalies(request):
     Checks all configured events for abnormal behavior and sends
     Slack alerts when thresholds are exceeded.
     """
+    delivery_queue = None
     try:
         config = get_config()
         
@@ -38,6 +39,9 @@ def detect_anomalies(request):
         
         alerts_sent = 0
         
+        # Alerts are delivered in the background and merged per channel
+        delivery_queue = SlackDeliveryQueue()
+        
         # Check each event
         for event_config in enabled_events:
             event_name = event_config["name"]
@@ -77,7 +81,8 @@ def detect_anomalies(request):
                                 event_name=event_name,
                                 alert_data=new_alerts,
                                 channel=channel,
-                                webhook_url=config.get("slack_webhook_url")
+                                webhook_url=config.get("slack_webhook_url"),
+                                delivery_queue=delivery_queue
                             )
                             
                             # Update alert cache
@@ -101,15 +106,23 @@ def detect_anomalies(request):
                 # Continue with other events
                 continue
         
+        # Wait for queued alerts to be delivered before the function returns
+        delivery_stats = delivery_queue.close()
+        
         return {
             "status": "success",
             "events_checked": len(enabled_events),
-            "alerts_sent": alerts_sent
+            "alerts_sent": alerts_sent,
+            "alerts_failed": delivery_stats["failed"]
         }
         
     except Exception as e:
         print(f"Error in detect_anomalies: {e}")
         raise
+    finally:
+        # Deliver alerts queued before a failure as well (close() is a no-op when already closed)
+        if delivery_queue is not None:
+            delivery_queue.close()
 
 
 def filter_recent_alerts(event_name: str, abnormal_minutes: List[Dict]) -> List[Dict]:
@@ -1,15 +1,128 @@
 """API clients for Mixpanel and Singular GDPR deletion requests."""
 import os
+import time
 import uuid
+import threading
 import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Dict, List
 from datetime import datetime, timezone
 from shared.config import get_config
 
 
+# Maximum distinct_ids per Mixpanel deletion task (the API accepts up to 2000)
+MIXPANEL_GDPR_BATCH_SIZE = int(os.getenv("MIXPANEL_GDPR_BATCH_SIZE", "1000"))
+
+# Maximum advertising IDs per AppLovin deletion request
+APPLOVIN_GDPR_BATCH_SIZE = int(os.getenv("APPLOVIN_GDPR_BATCH_SIZE", "1000"))
+
+# Singular's OpenDSR API takes one subject per request, so requests are sent concurrently
+SINGULAR_GDPR_WORKERS = int(os.getenv("SINGULAR_GDPR_WORKERS", "4"))
+
+# Maximum concurrent status checks per vendor
+MIXPANEL_STATUS_WORKERS = int(os.getenv("MIXPANEL_STATUS_WORKERS", "4"))
+SINGULAR_STATUS_WORKERS = int(os.getenv("SINGULAR_STATUS_WORKERS", "8"))
+
+# Per-vendor request rate limits (requests per second, shared by all threads)
+MIXPANEL_GDPR_REQUESTS_PER_SECOND = float(os.getenv("MIXPANEL_GDPR_REQUESTS_PER_SECOND", "1"))
+SINGULAR_GDPR_REQUESTS_PER_SECOND = float(os.getenv("SINGULAR_GDPR_REQUESTS_PER_SECOND", "5"))
+APPLOVIN_GDPR_REQUESTS_PER_SECOND = float(os.getenv("APPLOVIN_GDPR_REQUESTS_PER_SECOND", "1"))
+
+DEFAULT_SINGULAR_PROPERTY_ID = "Android:com.peerplay.megamerge"
+
+_http_session: Optional[requests.Session] = None
+_http_session_lock = threading.Lock()
+
+
+def get_http_session() -> requests.Session:
+    """
+    Get the process-wide HTTP session used for vendor GDPR API calls.
+    
+    Reusing one session keeps TLS connections to the vendor APIs open between
+    requests instead of opening a new connection per user.
+    
+    Returns:
+        Shared requests.Session with a pooled HTTPS adapter
+    """
+    global _http_session
+    if _http_session is None:
+        with _http_session_lock:
+            if _http_session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=4,
+                    pool_maxsize=max(8, SINGULAR_GDPR_WORKERS, MIXPANEL_STATUS_WORKERS, SINGULAR_STATUS_WORKERS)
+                )
+                session.mount("https://", adapter)
+                _http_session = session
+    return _http_session
+
+
+class RateLimiter:
+    """Thread-safe limiter that spaces calls at least 1 / rate seconds apart."""
+    
+    def __init__(self, requests_per_second: float):
+        self.min_interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self._next_time = 0.0
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until the next call is allowed."""
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_time - now
+            self._next_time = max(now, self._next_time) + self.min_interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+def collect_advertising_ids(ad_info: Dict[str, Optional[str]]) -> List[str]:
+    """
+    Collect the distinct non-null advertising IDs of a user.
+    
+    Args:
+        ad_info: Dict with last_idfa, first_idfa, last_gaid, first_gaid (see get_advertising_ids)
+    
+    Returns:
+        List of IDFA/GAID values to send to AppLovin
+    """
+    advertising_ids = []
+    if ad_info.get("last_idfa"):
+        advertising_ids.append(ad_info["last_idfa"])
+    if ad_info.get("first_idfa") and ad_info["first_idfa"] != ad_info.get("last_idfa"):
+        advertising_ids.append(ad_info["first_idfa"])
+    if ad_info.get("last_gaid"):
+        advertising_ids.append(ad_info["last_gaid"])
+    if ad_info.get("first_gaid") and ad_info["first_gaid"] != ad_info.get("last_gaid"):
+        advertising_ids.append(ad_info["first_gaid"])
+    return advertising_ids
+
+
 def create_mixpanel_gdpr_request(distinct_id: str, compliance_type: str = "gdpr") -> Optional[str]:
     """
-    Create a GDPR deletion request in Mixpanel.
+    Create a GDPR deletion request in Mixpanel for a single user.
+    
+    Args:
+        distinct_id: The user's distinct_id in Mixpanel
+        compliance_type: Type of compliance request (default: "gdpr")
+    
+    Returns:
+        Request ID if successful, None otherwise
+    """
+    return create_mixpanel_gdpr_batch_request([distinct_id], compliance_type=compliance_type)
+
+
+def create_mixpanel_gdpr_batch_request(
+    distinct_ids: List[str],
+    compliance_type: str = "gdpr",
+    config: Optional[Dict] = None
+) -> Optional[str]:
+    """
+    Create one GDPR deletion request in Mixpanel covering several users.
+    
+    All users share the returned task_id, so their status is checked with a
+    single status call.
     
     Supports multiple authentication methods:
     1. OAuth Token (Bearer token) - from Profile & Preferences → Data & Privacy
@@ -17,13 +130,15 @@ def create_mixpanel_gdpr_request(distinct_id: str, compliance_type: str = "gdpr"
     3. Export API Secret - from Project Settings → Service Accounts
     
     Args:
-        distinct_id: The user's distinct_id in Mixpanel
+        distinct_ids: The users' distinct_ids in Mixpanel (at most MIXPANEL_GDPR_BATCH_SIZE)
         compliance_type: Type of compliance request (default: "gdpr")
+        config: Config from get_config() (fetched if not provided)
     
     Returns:
         Request ID if successful, None otherwise
     """
-    config = get_config()
+    config = config or get_config()
+    users_label = distinct_ids[0] if len(distinct_ids) == 1 else f"{len(distinct_ids)} users"
     
     # Mixpanel GDPR API requires BOTH:
     # 1. Project token (in query parameter) - identifies the project
@@ -79,12 +194,12 @@ def create_mixpanel_gdpr_request(distinct_id: str, compliance_type: str = "gdpr"
         )
     
     payload = {
-        "distinct_ids": [distinct_id],  # API expects an array
+        "distinct_ids": distinct_ids,  # API expects an array
         "compliance_type": compliance_type.upper()  # GDPR should be uppercase
     }
     
     try:
-        response = requests.post(
+        response = get_http_session().post(
             url,
             json=payload,
             headers=headers,
@@ -103,7 +218,7 @@ def create_mixpanel_gdpr_request(distinct_id: str, compliance_type: str = "gdpr"
             request_id = result.get("request_id") or result.get("id") or result.get("deletion_request_id") or result.get("task_id")
         
         if request_id:
-            print(f"✅ Created Mixpanel GDPR request for {distinct_id}: {request_id}")
+            print(f"✅ Created Mixpanel GDPR request for {users_label}: {request_id}")
             return str(request_id)
         else:
             print(f"⚠️  Mixpanel GDPR request created but no request_id in response: {result}")
@@ -122,7 +237,7 @@ def create_mixpanel_gdpr_request(distinct_id: str, compliance_type: str = "gdpr"
             # Try with Basic Auth on v3.0 (without token in URL)
             if auth_method == "oauth" and auth:
                 try:
-                    response_alt = requests.post(
+                    response_alt = get_http_session().post(
                         url,
                         json=payload,
                         auth=auth,
@@ -132,12 +247,12 @@ def create_mixpanel_gdpr_request(distinct_id: str, compliance_type: str = "gdpr"
                     result_alt = response_alt.json()
                     request_id = result_alt.get("request_id") or result_alt.get("id")
                     if request_id:
-                        print(f"✅ Created Mixpanel GDPR request for {distinct_id}: {request_id}")
+                        print(f"✅ Created Mixpanel GDPR request for {users_label}: {request_id}")
                         return str(request_id)
                 except:
                     pass
         
-        print(f"❌ Error creating Mixpanel GDPR request for {distinct_id}: {e}")
+        print(f"❌ Error creating Mixpanel GDPR request for {users_label}: {e}")
         if hasattr(e, 'response') and e.response is not None:
             try:
                 error_detail = e.response.json()
@@ -147,7 +262,61 @@ def create_mixpanel_gdpr_request(distinct_id: str, compliance_type: str = "gdpr"
         return None
 
 
-def create_singular_gdpr_request(distinct_id: str, property_id: Optional[str] = None) -> Optional[str]:
+def get_singular_property_ids(distinct_ids: List[str]) -> Dict[str, str]:
+    """
+    Map users to their Singular property_id based on last_platform in dim_player.
+    
+    Args:
+        distinct_ids: List of distinct_id values to query
+    
+    Returns:
+        Dictionary mapping distinct_id to property_id (Android when the platform is unknown or missing)
+    """
+    if not distinct_ids:
+        return {}
+    
+    property_ids = {distinct_id: DEFAULT_SINGULAR_PROPERTY_ID for distinct_id in distinct_ids}
+    try:
+        from shared.bigquery_client import get_bigquery_client
+        from google.cloud import bigquery
+        client = get_bigquery_client()
+        query = f"""
+        SELECT distinct_id, ANY_VALUE(last_platform) AS last_platform
+        FROM `peerplay.dim_player`
+        WHERE distinct_id IN UNNEST(@distinct_ids)
+        GROUP BY distinct_id
+        """
+        job_config = bigquery.QueryJobConfig(
+            query_parameters=[
+                bigquery.ArrayQueryParameter("distinct_ids", "STRING", list(property_ids)),
+            ]
+        )
+        found = set()
+        for row in client.query(query, job_config=job_config).result():
+            if not row.last_platform:
+                continue
+            found.add(row.distinct_id)
+            platform = row.last_platform
+            # Map platform to property_id
+            if platform.lower() in ["android", "google"]:
+                property_ids[row.distinct_id] = "Android:com.peerplay.megamerge"
+            elif platform.lower() in ["ios", "apple"]:
+                property_ids[row.distinct_id] = "iOS:com.peerplay.megamerge"
+            else:
+                print(f"⚠️  Unknown platform '{platform}' for user {row.distinct_id}, defaulting to Android")
+        missing = len(property_ids) - len(found)
+        if missing:
+            print(f"⚠️  No platform found for {missing} users, defaulting to Android")
+    except Exception as e:
+        print(f"⚠️  Error fetching platforms from dim_player: {e}, defaulting to Android")
+    return property_ids
+
+
+def create_singular_gdpr_request(
+    distinct_id: str,
+    property_id: Optional[str] = None,
+    config: Optional[Dict] = None
+) -> Optional[str]:
     """
     Create a GDPR deletion request in Singular using OpenDSR API.
     
@@ -155,11 +324,12 @@ def create_singular_gdpr_request(distinct_id: str, property_id: Optional[str] =
         distinct_id: The user's distinct_id (used as user_id in Singular)
         property_id: Optional property_id (e.g., "Android:com.peerplay.megamerge" or "iOS:com.peerplay.game")
                    If not provided, will try to fetch from dim_player based on last_platform
+        config: Config from get_config() (fetched if not provided)
     
     Returns:
         subject_request_id if successful, None otherwise
     """
-    config = get_config()
+    config = config or get_config()
     api_key = config.get("singular_api_key") or config.get("singular_api_secret")
     
     if not api_key:
@@ -167,39 +337,7 @@ def create_singular_gdpr_request(distinct_id: str, property_id: Optional[str] =
     
     # If property_id not provided, try to fetch from dim_player
     if not property_id:
-        try:
-            from shared.bigquery_client import get_bigquery_client
-            client = get_bigquery_client()
-            query = f"""
-            SELECT last_platform
-            FROM `peerplay.dim_player`
-            WHERE distinct_id = @distinct_id
-            LIMIT 1
-            """
-            from google.cloud import bigquery
-            job_config = bigquery.QueryJobConfig(
-                query_parameters=[
-                    bigquery.ScalarQueryParameter("distinct_id", "STRING", distinct_id),
-                ]
-            )
-            results = client.query(query, job_config=job_config).result()
-            row = next(results, None)
-            if row and row.last_platform:
-                platform = row.last_platform
-                # Map platform to property_id
-                if platform.lower() in ["android", "google"]:
-                    property_id = "Android:com.peerplay.megamerge"
-                elif platform.lower() in ["ios", "apple"]:
-                    property_id = "iOS:com.peerplay.megamerge"
-                else:
-                    print(f"⚠️  Unknown platform '{platform}', defaulting to Android")
-                    property_id = "Android:com.peerplay.megamerge"
-            else:
-                print(f"⚠️  No platform found for user {distinct_id}, defaulting to Android")
-                property_id = "Android:com.peerplay.megamerge"
-        except Exception as e:
-            print(f"⚠️  Error fetching platform for {distinct_id}: {e}, defaulting to Android")
-            property_id = "Android:com.peerplay.megamerge"
+        property_id = get_singular_property_ids([distinct_id]).get(distinct_id)
     
     # If property_id still not set, default to Android
     if not property_id:
@@ -246,7 +384,7 @@ def create_singular_gdpr_request(distinct_id: str, property_id: Optional[str] =
         print(f"   Sending OpenDSR payload: property_id={property_id}, user_id={distinct_id}")
         print(f"   Subject request ID: {subject_request_id}")
         
-        response = requests.post(url, headers=headers, json=payload, timeout=30)
+        response = get_http_session().post(url, headers=headers, json=payload, timeout=30)
         response.raise_for_status()
         
         result = response.json()
@@ -275,17 +413,18 @@ def create_singular_gdpr_request(distinct_id: str, property_id: Optional[str] =
         return None
 
 
-def check_mixpanel_gdpr_status(task_id: str) -> Optional[str]:
+def check_mixpanel_gdpr_status(task_id: str, config: Optional[Dict] = None) -> Optional[str]:
     """
     Check the status of a Mixpanel GDPR deletion request.
     
     Args:
         task_id: The task_id returned when creating the deletion request
+        config: Config from get_config() (fetched if not provided)
     
     Returns:
         "completed" or "pending" if successful, None otherwise
     """
-    config = get_config()
+    config = config or get_config()
     oauth_token = config.get("mixpanel_gdpr_token")
     project_token = os.getenv("MIXPANEL_PROJECT_TOKEN") or config.get("mixpanel_project_id")
     
@@ -300,7 +439,7 @@ def check_mixpanel_gdpr_status(task_id: str) -> Optional[str]:
     headers = {"Authorization": f"Bearer {oauth_token}"}
     
     try:
-        response = requests.get(url, headers=headers, timeout=30)
+        response = get_http_session().get(url, headers=headers, timeout=30)
         response.raise_for_status()
         result = response.json()
         
@@ -325,17 +464,18 @@ def check_mixpanel_gdpr_status(task_id: str) -> Optional[str]:
         return None
 
 
-def check_singular_gdpr_status(subject_request_id: str) -> Optional[str]:
+def check_singular_gdpr_status(subject_request_id: str, config: Optional[Dict] = None) -> Optional[str]:
     """
     Check the status of a Singular GDPR deletion request.
     
     Args:
         subject_request_id: The subject_request_id returned when creating the deletion request
+        config: Config from get_config() (fetched if not provided)
     
     Returns:
         "completed" or "pending" if successful, None otherwise
     """
-    config = get_config()
+    config = config or get_config()
     api_key = config.get("singular_api_key") or config.get("singular_api_secret")
     
     if not api_key:
@@ -349,7 +489,7 @@ def check_singular_gdpr_status(subject_request_id: str) -> Optional[str]:
     }
     
     try:
-        response = requests.get(url, headers=headers, timeout=30)
+        response = get_http_session().get(url, headers=headers, timeout=30)
         response.raise_for_status()
         result = response.json()
         
@@ -369,7 +509,18 @@ def check_singular_gdpr_status(subject_request_id: str) -> Optional[str]:
         return None
 
 
-def create_applovin_gdpr_request(advertising_ids: List[str]) -> Optional[int]:
+def _valid_advertising_id(ad_id: Optional[str]) -> Optional[str]:
+    """Return the stripped advertising ID if it looks like a UUID, None otherwise."""
+    if not ad_id:
+        return None
+    # Basic UUID format validation (8-4-4-4-12 hex digits)
+    stripped = ad_id.strip()
+    if len(stripped) == 36 and stripped.count('-') == 4:
+        return stripped
+    return None
+
+
+def create_applovin_gdpr_request(advertising_ids: List[str], config: Optional[Dict] = None) -> Optional[int]:
     """
     Create GDPR deletion request in AppLovin Max mediation.
     
@@ -378,11 +529,12 @@ def create_applovin_gdpr_request(advertising_ids: List[str]) -> Optional[int]:
     
     Args:
         advertising_ids: List of IDFA (iOS) or GAID (Android) in UUID format
+        config: Config from get_config() (fetched if not provided)
     
     Returns:
         Number of successfully deleted IDs (num_deleted_ids or num_valid_ids from response), or None if failed
     """
-    config = get_config()
+    config = config or get_config()
     api_key = config.get("applovin_gdpr_api_key")
     
     if not api_key:
@@ -396,9 +548,8 @@ def create_applovin_gdpr_request(advertising_ids: List[str]) -> Optional[int]:
     valid_ids = []
     for ad_id in advertising_ids:
         if ad_id and ad_id.strip():
-            # Basic UUID format validation (8-4-4-4-12 hex digits)
-            stripped = ad_id.strip()
-            if len(stripped) == 36 and stripped.count('-') == 4:
+            stripped = _valid_advertising_id(ad_id)
+            if stripped:
                 valid_ids.append(stripped)
             else:
                 print(f"⚠️  Invalid UUID format for advertising ID: {ad_id}")
@@ -421,7 +572,7 @@ def create_applovin_gdpr_request(advertising_ids: List[str]) -> Optional[int]:
     try:
         print(f"   Sending {len(valid_ids)} advertising IDs to AppLovin for deletion...")
         
-        response = requests.post(
+        response = get_http_session().post(
             url,
             params=params,
             data=request_body,
@@ -452,3 +603,224 @@ def create_applovin_gdpr_request(advertising_ids: List[str]) -> Optional[int]:
                 print(f"   Response status: {e.response.status_code}")
         return None
 
+
+
+def _chunks(items: List, size: int) -> List[List]:
+    """Split items into lists of at most size items."""
+    return [items[i:i + size] for i in range(0, len(items), max(size, 1))]
+
+
+def _create_mixpanel_requests(distinct_ids: List[str], config: Dict) -> Dict[str, Optional[str]]:
+    """
+    Create Mixpanel deletion tasks in batches; every user of a batch gets that batch's task_id.
+    
+    A failed batch is split in halves and retried, so one bad distinct_id only leaves
+    itself without a task_id instead of its whole batch.
+    """
+    rate_limiter = RateLimiter(MIXPANEL_GDPR_REQUESTS_PER_SECOND)
+    request_ids = {}
+    
+    def create(batch: List[str]):
+        rate_limiter.acquire()
+        try:
+            request_id = create_mixpanel_gdpr_batch_request(batch, compliance_type="gdpr", config=config)
+        except Exception as e:
+            print(f"⚠️  Failed to create Mixpanel request for {len(batch)} users: {e}")
+            request_id = None
+        if request_id is None and len(batch) > 1:
+            print(f"   Retrying the {len(batch)} users in two smaller Mixpanel requests...")
+            middle = len(batch) // 2
+            create(batch[:middle])
+            create(batch[middle:])
+            return
+        request_ids.update({distinct_id: request_id for distinct_id in batch})
+    
+    for batch in _chunks(distinct_ids, MIXPANEL_GDPR_BATCH_SIZE):
+        create(batch)
+    return request_ids
+
+
+def _create_singular_requests(distinct_ids: List[str], config: Dict) -> Dict[str, Optional[str]]:
+    """Create Singular OpenDSR requests (one per user) concurrently under the Singular rate limit."""
+    rate_limiter = RateLimiter(SINGULAR_GDPR_REQUESTS_PER_SECOND)
+    property_ids = get_singular_property_ids(distinct_ids)
+    
+    def create(distinct_id: str) -> Optional[str]:
+        rate_limiter.acquire()
+        try:
+            return create_singular_gdpr_request(distinct_id, property_ids.get(distinct_id), config=config)
+        except Exception as e:
+            print(f"⚠️  Failed to create Singular request for {distinct_id}: {e}")
+            return None
+    
+    with ThreadPoolExecutor(max_workers=max(SINGULAR_GDPR_WORKERS, 1), thread_name_prefix="singular-gdpr") as executor:
+        return dict(zip(distinct_ids, executor.map(create, distinct_ids)))
+
+
+def create_applovin_gdpr_requests(advertising_ids: Dict[str, List[str]], config: Optional[Dict] = None) -> Dict[str, str]:
+    """
+    Send the advertising IDs of all users to AppLovin in batches.
+    
+    Users with no advertising IDs have nothing to delete and are "completed". Only valid IDs
+    (UUID format, as in create_applovin_gdpr_request) are sent, and users whose IDs are all
+    invalid stay "pending". The users of a batch are "completed" only when AppLovin deleted
+    every ID of the batch; otherwise each of them is sent again in a request of its own and is
+    "completed" if AppLovin deleted any of its IDs, "pending" if not.
+    
+    Args:
+        advertising_ids: Users mapped to their advertising IDs (see collect_advertising_ids)
+        config: Config from get_config() (fetched if not provided)
+    
+    Returns:
+        Dictionary mapping distinct_id to "completed" or "pending"
+    """
+    config = config or get_config()
+    rate_limiter = RateLimiter(APPLOVIN_GDPR_REQUESTS_PER_SECOND)
+    statuses = {distinct_id: "completed" for distinct_id, ids in advertising_ids.items() if not ids}
+    
+    # Fill batches with whole users so a user's status depends on a single request
+    batches = []
+    valid_ids = {}
+    for distinct_id, ids in advertising_ids.items():
+        if not ids:
+            continue
+        ids = list(dict.fromkeys(valid_id for valid_id in map(_valid_advertising_id, ids) if valid_id))
+        if not ids:
+            print(f"⚠️  No valid advertising IDs for {distinct_id}, AppLovin deletion stays pending")
+            statuses[distinct_id] = "pending"
+            continue
+        valid_ids[distinct_id] = ids
+        if not batches or len(batches[-1]["ids"]) + len(ids) > APPLOVIN_GDPR_BATCH_SIZE:
+            batches.append({"users": [], "ids": []})
+        batches[-1]["users"].append(distinct_id)
+        batches[-1]["ids"].extend(ids)
+    
+    def send(ids: List[str], users_label: str) -> Optional[int]:
+        rate_limiter.acquire()
+        try:
+            return create_applovin_gdpr_request(ids, config=config)
+        except Exception as e:
+            print(f"⚠️  Failed to create AppLovin request for {users_label}: {e}")
+            return None
+    
+    for batch in batches:
+        num_deleted = send(batch["ids"], f"{len(batch['users'])} users")
+        # Users can share an advertising ID, so a full batch deletes its distinct IDs
+        if num_deleted is not None and num_deleted >= len(set(batch["ids"])):
+            statuses.update({distinct_id: "completed" for distinct_id in batch["users"]})
+            continue
+        if len(batch["users"]) == 1:
+            statuses[batch["users"][0]] = "completed" if num_deleted else "pending"
+            continue
+        
+        # Partly deleted or failed: a shared count cannot tell whose IDs were deleted
+        print(f"   AppLovin deleted {num_deleted or 0}/{len(set(batch['ids']))} IDs, retrying {len(batch['users'])} users one at a time...")
+        for distinct_id in batch["users"]:
+            user_ids = valid_ids[distinct_id]
+            num_deleted = send(user_ids, distinct_id)
+            statuses[distinct_id] = "completed" if num_deleted else "pending"
+    return statuses
+
+
+def create_gdpr_deletion_requests(
+    distinct_ids: List[str],
+    applovin_advertising_ids: Dict[str, List[str]]
+) -> Dict[str, Dict]:
+    """
+    Create deletion requests for many users across all vendors at once.
+    
+    Mixpanel and AppLovin accept many IDs per request and are called in batches;
+    Singular takes one user per request and is called concurrently. The three
+    vendors run in parallel, each under its own rate limit, and a failing vendor
+    does not affect the others.
+    
+    Args:
+        distinct_ids: Users to create Mixpanel and Singular deletion requests for
+        applovin_advertising_ids: Users to create AppLovin deletion requests for,
+                                  mapped to their advertising IDs (see collect_advertising_ids)
+    
+    Returns:
+        Dictionary mapping distinct_id to dict with keys:
+        - mixpanel_request_id: Mixpanel task_id (shared by the users of a batch) or None
+        - singular_request_id: Singular subject_request_id or None
+        - max_mediation_status: "completed" or "pending" for users in applovin_advertising_ids, None otherwise
+    """
+    distinct_ids = list(dict.fromkeys(distinct_ids))
+    config = get_config()
+    
+    print(f"Creating deletion requests for {len(distinct_ids)} users "
+          f"(Mixpanel, Singular) and {len(applovin_advertising_ids)} users (AppLovin)...")
+    with ThreadPoolExecutor(max_workers=3, thread_name_prefix="gdpr-vendor") as executor:
+        mixpanel_future = executor.submit(_create_mixpanel_requests, distinct_ids, config)
+        singular_future = executor.submit(_create_singular_requests, distinct_ids, config)
+        applovin_future = executor.submit(create_applovin_gdpr_requests, applovin_advertising_ids, config)
+        
+        results = {}
+        for vendor, future in [("Mixpanel", mixpanel_future), ("Singular", singular_future), ("AppLovin", applovin_future)]:
+            try:
+                results[vendor] = future.result()
+            except Exception as e:
+                print(f"⚠️  Failed to create {vendor} requests: {e}")
+                results[vendor] = {}
+    
+    return {
+        distinct_id: {
+            "mixpanel_request_id": results["Mixpanel"].get(distinct_id),
+            "singular_request_id": results["Singular"].get(distinct_id),
+            "max_mediation_status": (
+                results["AppLovin"].get(distinct_id, "pending") if distinct_id in applovin_advertising_ids else None
+            ),
+        }
+        for distinct_id in set(distinct_ids) | set(applovin_advertising_ids)
+    }
+
+
+def check_gdpr_statuses(
+    mixpanel_task_ids: List[str],
+    singular_request_ids: List[str]
+) -> Dict[str, Dict[str, Optional[str]]]:
+    """
+    Check the status of many deletion requests concurrently.
+    
+    Each request ID is checked once (users of one Mixpanel batch share a task_id).
+    Mixpanel and Singular are polled in parallel over the pooled session, each with
+    at most MIXPANEL_STATUS_WORKERS / SINGULAR_STATUS_WORKERS requests in flight.
+    
+    Args:
+        mixpanel_task_ids: Mixpanel task_ids to check
+        singular_request_ids: Singular subject_request_ids to check
+    
+    Returns:
+        {"mixpanel": {task_id: status}, "singular": {subject_request_id: status}}, where
+        status is "completed", "pending", or None if the check failed
+    """
+    mixpanel_task_ids = list(dict.fromkeys(mixpanel_task_ids))
+    singular_request_ids = list(dict.fromkeys(singular_request_ids))
+    if not mixpanel_task_ids and not singular_request_ids:
+        return {"mixpanel": {}, "singular": {}}
+    
+    config = get_config()
+    print(f"Checking status of {len(mixpanel_task_ids)} Mixpanel and {len(singular_request_ids)} Singular requests...")
+    
+    def poll(check, request_ids: List[str], max_workers: int, name: str) -> Dict[str, Optional[str]]:
+        if not request_ids:
+            return {}
+        
+        def check_one(request_id: str) -> Optional[str]:
+            try:
+                return check(request_id, config=config)
+            except Exception as e:
+                print(f"⚠️  Failed to check {name} status for {request_id}: {e}")
+                return None
+        
+        with ThreadPoolExecutor(max_workers=max(max_workers, 1), thread_name_prefix=f"{name.lower()}-status") as executor:
+            return dict(zip(request_ids, executor.map(check_one, request_ids)))
+    
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix="gdpr-status") as executor:
+        mixpanel_future = executor.submit(
+            poll, check_mixpanel_gdpr_status, mixpanel_task_ids, MIXPANEL_STATUS_WORKERS, "Mixpanel"
+        )
+        singular_future = executor.submit(
+            poll, check_singular_gdpr_status, singular_request_ids, SINGULAR_STATUS_WORKERS, "Singular"
+        )
+        return {"mixpanel": mixpanel_future.result(), "singular": singular_future.result()}
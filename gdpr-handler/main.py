@@ -1,32 +1,35 @@
 """GDPR Request Handler - Process Slack messages for user deletion requests."""
 import argparse
+import os
 import re
-from datetime import datetime, date, timedelta
+from datetime import datetime, date, timedelta, timezone
 from typing import Dict, List, Optional
 from shared.config import get_config
 from shared.slack_client import (
-    read_slack_channel_messages,
+    read_slack_channel_messages_incremental,
     add_reaction_to_message,
     remove_reaction,
     get_channel_id
 )
 from shared.bigquery_client import (
     insert_gdpr_requests,
-    get_gdpr_request_by_ticket_id,
     get_gdpr_requests_by_ticket_ids,
-    update_gdpr_request_status,
+    apply_gdpr_status_updates,
     get_player_dates,
     get_bigquery_client
 )
 from api_clients import (
-    create_mixpanel_gdpr_request,
-    create_singular_gdpr_request,
-    create_applovin_gdpr_request,
-    check_mixpanel_gdpr_status,
-    check_singular_gdpr_status
+    create_gdpr_deletion_requests,
+    create_applovin_gdpr_requests,
+    collect_advertising_ids,
+    check_gdpr_statuses
 )
 
 
+# Tickets whose statuses were checked more recently than this are not polled again
+GDPR_STATUS_CHECK_INTERVAL_HOURS = float(os.getenv("GDPR_STATUS_CHECK_INTERVAL_HOURS", "6"))
+
+
 def parse_date(date_str: str) -> date:
     """Parse date string in YYYY-MM-DD format."""
     try:
@@ -269,7 +272,9 @@ def parse_message(message: Dict) -> Optional[Dict]:
 def process_gdpr_requests(
     start_date: date,
     end_date: date,
-    channel_name: Optional[str] = None
+    channel_name: Optional[str] = None,
+    full_refresh: bool = False,
+    status_check_interval_hours: float = GDPR_STATUS_CHECK_INTERVAL_HOURS
 ):
     """
     Process GDPR deletion requests from Slack channel.
@@ -278,6 +283,8 @@ def process_gdpr_requests(
         start_date: Start date for message scanning
         end_date: End date for message scanning
         channel_name: Slack channel name (optional, uses config default if not provided)
+        full_refresh: Re-fetch the whole date range from Slack instead of using the local message cache
+        status_check_interval_hours: Skip status checks for tickets checked within this many hours (0 checks all)
     """
     config = get_config()
     
@@ -297,7 +304,7 @@ def process_gdpr_requests(
     
     # Fetch messages
     print(f"Fetching messages from Slack...")
-    messages = read_slack_channel_messages(channel_name, start_date, end_date)
+    messages = read_slack_channel_messages_incremental(channel_name, start_date, end_date, full_refresh=full_refresh)
     
     # Filter messages: must contain "delete", "user", and "ticket" (case-insensitive)
     print("Filtering valid GDPR deletion request messages...")
@@ -368,6 +375,44 @@ def process_gdpr_requests(
     print(f"✅ Fetched advertising IDs for {len(advertising_data)} users")
     print(f"✅ Fetched {len(existing_records)} existing records")
     
+    # Apply the 14-day rule and collect the users that need deletion requests, so that
+    # every vendor is called once for the whole backlog instead of once per user
+    print("\nApplying 14-day activity rule...")
+    deletion_ids = []
+    applovin_advertising_ids = {}
+    
+    for parsed in parsed_messages:
+        distinct_id = parsed["distinct_id"]
+        
+        # Use cached player data
+        player_info = player_data.get(distinct_id, {})
+        last_activity_date = player_info.get("last_activity_date")
+        
+        # 14-day activity check
+        days_since_activity = None
+        if last_activity_date:
+            days_since_activity = (date.today() - last_activity_date).days
+        parsed["days_since_activity"] = days_since_activity
+        
+        if days_since_activity is not None and days_since_activity < 14:
+            continue
+        deletion_ids.append(distinct_id)
+        
+        # Check if AppLovin deletion is already completed for this user (use cached data)
+        ticket_id = parsed.get("ticket_id")
+        existing_record = existing_records.get(ticket_id) if ticket_id else None
+        existing_max_status = existing_record.get("max_mediation_deletion_status") if existing_record else None
+        if existing_max_status != "completed":
+            # Use cached advertising data
+            applovin_advertising_ids[distinct_id] = collect_advertising_ids(advertising_data.get(distinct_id, {}))
+    
+    vendor_requests = {}
+    if deletion_ids:
+        try:
+            vendor_requests = create_gdpr_deletion_requests(deletion_ids, applovin_advertising_ids)
+        except Exception as e:
+            print(f"⚠️  Failed to create deletion requests: {e}")
+    
     # Now process each message using cached data
     gdpr_requests = []
     processed_count = 0
@@ -383,11 +428,8 @@ def process_gdpr_requests(
             player_info = player_data.get(distinct_id, {})
             last_activity_date = player_info.get("last_activity_date")
             install_date = player_info.get("install_date")
-            
-            # 14-day activity check
-            days_since_activity = None
+            days_since_activity = parsed["days_since_activity"]
             if last_activity_date:
-                days_since_activity = (date.today() - last_activity_date).days
                 print(f"📅 Last activity: {last_activity_date} ({days_since_activity} days ago)")
             
             mixpanel_request_id = None
@@ -397,96 +439,25 @@ def process_gdpr_requests(
             # Check if we should create deletion requests (14-day rule)
             if days_since_activity is None or days_since_activity >= 14:
                 if days_since_activity is not None:
-                    print(f"✅ {days_since_activity} days since last activity (>= 14 days) - Creating deletion requests")
+                    print(f"✅ {days_since_activity} days since last activity (>= 14 days) - Deletion requests created")
                 else:
-                    print(f"⚠️  No last_activity_date found, proceeding with deletion requests")
+                    print(f"⚠️  No last_activity_date found, deletion requests created")
                 
-                # Create Mixpanel GDPR request
-                try:
-                    print(f"Creating Mixpanel GDPR deletion request...")
-                    mixpanel_request_id = create_mixpanel_gdpr_request(distinct_id, compliance_type="gdpr")
-                except Exception as e:
-                    print(f"⚠️  Failed to create Mixpanel request: {e}")
+                requests_created = vendor_requests.get(distinct_id, {})
+                mixpanel_request_id = requests_created.get("mixpanel_request_id")
+                singular_request_id = requests_created.get("singular_request_id")
                 
-                # Create Singular GDPR request
-                try:
-                    print(f"Creating Singular GDPR deletion request...")
-                    singular_request_id = create_singular_gdpr_request(distinct_id)
-                except Exception as e:
-                    print(f"⚠️  Failed to create Singular request: {e}")
+                if distinct_id not in applovin_advertising_ids:
+                    print(f"⚠️  AppLovin deletion already completed for user {distinct_id}, skipping")
+                    max_mediation_status = "completed"
+                elif not applovin_advertising_ids[distinct_id]:
+                    print(f"✅ No advertising IDs found for user {distinct_id}, AppLovin deletion not needed (nothing to delete)")
+                    max_mediation_status = "completed"
+                else:
+                    max_mediation_status = requests_created.get("max_mediation_status") or "pending"
+                    print(f"   AppLovin deletion of {len(applovin_advertising_ids[distinct_id])} advertising IDs: {max_mediation_status}")
                 
-                # Fetch advertising IDs and create AppLovin GDPR request
-                try:
-                    # Check if AppLovin deletion is already completed for this user (use cached data)
-                    ticket_id = parsed.get("ticket_id")
-                    existing_record = existing_records.get(ticket_id) if ticket_id else None
-                    existing_max_status = existing_record.get("max_mediation_deletion_status") if existing_record else None
-                    
-                    if existing_max_status == "completed":
-                        print(f"⚠️  AppLovin deletion already completed for user {distinct_id}, skipping")
-                        max_mediation_status = "completed"
-                    elif existing_max_status is None:
-                        # Status is NULL - this is an old record, create AppLovin request
-                        print(f"📝 AppLovin status is NULL for user {distinct_id}, creating deletion request...")
-                        # Use cached advertising data
-                        ad_info = advertising_data.get(distinct_id, {})
-                        
-                        # Collect all non-null advertising IDs
-                        advertising_ids = []
-                        if ad_info.get("last_idfa"):
-                            advertising_ids.append(ad_info["last_idfa"])
-                        if ad_info.get("first_idfa") and ad_info["first_idfa"] != ad_info.get("last_idfa"):
-                            advertising_ids.append(ad_info["first_idfa"])
-                        if ad_info.get("last_gaid"):
-                            advertising_ids.append(ad_info["last_gaid"])
-                        if ad_info.get("first_gaid") and ad_info["first_gaid"] != ad_info.get("last_gaid"):
-                            advertising_ids.append(ad_info["first_gaid"])
-                        
-                        if advertising_ids:
-                            print(f"   Found {len(advertising_ids)} advertising IDs: {advertising_ids}")
-                            print(f"Creating AppLovin Max GDPR deletion request...")
-                            num_deleted = create_applovin_gdpr_request(advertising_ids)
-                            if num_deleted is not None and num_deleted > 0:
-                                max_mediation_status = "completed"
-                                print(f"✅ AppLovin deletion completed: {num_deleted} IDs deleted")
-                            else:
-                                max_mediation_status = "pending"
-                                print(f"⚠️  AppLovin deletion request created but status unclear")
-                        else:
-                            print(f"✅ No advertising IDs found for user {distinct_id}, AppLovin deletion not needed (nothing to delete)")
-                            max_mediation_status = "completed"
-                    else:
-                        # Status is "pending" or "not started" - create AppLovin request
-                        # Use cached advertising data
-                        ad_info = advertising_data.get(distinct_id, {})
-                        
-                        # Collect all non-null advertising IDs
-                        advertising_ids = []
-                        if ad_info.get("last_idfa"):
-                            advertising_ids.append(ad_info["last_idfa"])
-                        if ad_info.get("first_idfa") and ad_info["first_idfa"] != ad_info.get("last_idfa"):
-                            advertising_ids.append(ad_info["first_idfa"])
-                        if ad_info.get("last_gaid"):
-                            advertising_ids.append(ad_info["last_gaid"])
-                        if ad_info.get("first_gaid") and ad_info["first_gaid"] != ad_info.get("last_gaid"):
-                            advertising_ids.append(ad_info["first_gaid"])
-                        
-                        if advertising_ids:
-                            print(f"   Found {len(advertising_ids)} advertising IDs: {advertising_ids}")
-                            print(f"Creating AppLovin Max GDPR deletion request...")
-                            num_deleted = create_applovin_gdpr_request(advertising_ids)
-                            if num_deleted is not None and num_deleted > 0:
-                                max_mediation_status = "completed"
-                                print(f"✅ AppLovin deletion completed: {num_deleted} IDs deleted")
-                            else:
-                                max_mediation_status = "pending"
-                                print(f"⚠️  AppLovin deletion request created but status unclear")
-                        else:
-                            print(f"✅ No advertising IDs found for user {distinct_id}, AppLovin deletion not needed (nothing to delete)")
-                            max_mediation_status = "completed"
-                except Exception as e:
-                    print(f"⚠️  Failed to create AppLovin request: {e}")
-                    max_mediation_status = "pending"
+                print(f"   Mixpanel request: {mixpanel_request_id}, Singular request: {singular_request_id}")
                 
                 # Remove clock1 emoji if present, add computer emoji
                 message_ts = message.get("ts")
@@ -558,42 +529,88 @@ def process_gdpr_requests(
             raise
     
     # Process messages with computer or white_check_mark emoji (Phase 2: Status Check Processing)
+    # Status transitions are collected and applied with one MERGE at the end
     status_check_count = 0
     status_error_count = 0
+    status_updates = []
+    completed_messages = []  # Messages of requests whose deletions are all completed
     
+    status_check_tickets = []
     for message in status_check_messages:
+        parsed = parse_message(message)
+        if not parsed or not parsed.get("ticket_id"):
+            print(f"Warning: Could not parse message or missing ticket_id: {message.get('ts')}")
+            continue
+        status_check_tickets.append((message, parsed["ticket_id"]))
+    
+    # Get all records from BigQuery in one query
+    status_records = get_gdpr_requests_by_ticket_ids(
+        list({ticket_id for _, ticket_id in status_check_tickets})
+    ) if status_check_tickets else {}
+    
+    # Keep tickets that are not completed and were not checked within the interval
+    recheck_after = datetime.now(timezone.utc) - timedelta(hours=status_check_interval_hours)
+    due_checks = []
+    recently_checked_count = 0
+    for message, ticket_id in status_check_tickets:
+        record = status_records.get(ticket_id)
+        if not record:
+            print(f"⚠️  No record found in BigQuery for ticket {ticket_id}")
+            continue
+        
+        # Skip if already completed (treat white_check_mark same as computer - already processed)
+        if record.get("is_request_completed", False):
+            continue
+        
+        last_check_time = record.get("last_check_time")
+        if status_check_interval_hours > 0 and last_check_time and last_check_time > recheck_after:
+            recently_checked_count += 1
+            continue
+        due_checks.append((message, ticket_id, record))
+    
+    if recently_checked_count:
+        print(f"Skipping {recently_checked_count} tickets checked within the last {status_check_interval_hours:g} hours")
+    
+    # Poll all pending Mixpanel and Singular requests concurrently
+    vendor_statuses = check_gdpr_statuses(
+        [record["mixpanel_request_id"] for _, _, record in due_checks
+         if record.get("mixpanel_request_id") and record.get("mixpanel_deletion_status") != "completed"],
+        [record["singular_request_id"] for _, _, record in due_checks
+         if record.get("singular_request_id") and record.get("singular_deletion_status") != "completed"]
+    )
+    
+    # Create AppLovin deletion requests for all records whose status is NULL (old records) in one pass
+    applovin_distinct_ids = [
+        record.get("distinct_id") for _, _, record in due_checks
+        if record.get("max_mediation_deletion_status") is None and record.get("distinct_id")
+    ]
+    applovin_statuses = {}
+    if applovin_distinct_ids:
+        print(f"📝 AppLovin status is NULL for {len(applovin_distinct_ids)} tickets, creating deletion requests...")
+        try:
+            # Fetch advertising IDs for these users
+            advertising_data = get_advertising_ids(applovin_distinct_ids)
+            applovin_statuses = create_applovin_gdpr_requests({
+                distinct_id: collect_advertising_ids(advertising_data.get(distinct_id, {}))
+                for distinct_id in applovin_distinct_ids
+            })
+        except Exception as e:
+            print(f"⚠️  Failed to create AppLovin requests: {e}")
+    
+    for message, ticket_id, record in due_checks:
         try:
-            parsed = parse_message(message)
-            if not parsed or not parsed.get("ticket_id"):
-                print(f"Warning: Could not parse message or missing ticket_id: {message.get('ts')}")
-                continue
-            
-            ticket_id = parsed["ticket_id"]
             print(f"\nChecking status for ticket: {ticket_id}")
             
-            # Get record from BigQuery
-            record = get_gdpr_request_by_ticket_id(ticket_id)
-            if not record:
-                print(f"⚠️  No record found in BigQuery for ticket {ticket_id}")
-                continue
-            
-            # Skip if already completed (treat white_check_mark same as computer - already processed)
-            is_completed = record.get("is_request_completed", False)
-            if is_completed:
-                print(f"✅ Request already completed (is_request_completed=true), skipping status check")
-                continue
-            
             mixpanel_request_id = record.get("mixpanel_request_id")
             singular_request_id = record.get("singular_request_id")
             # Don't use default - we need to detect NULL explicitly
             current_max_mediation_status = record.get("max_mediation_deletion_status")  # Can be None
             
-            # Check Mixpanel status
+            # Mixpanel status
             mixpanel_status = None
             current_mixpanel_status = record.get("mixpanel_deletion_status")
             if mixpanel_request_id and current_mixpanel_status != "completed":
-                print(f"Checking Mixpanel status for request: {mixpanel_request_id}")
-                mixpanel_status = check_mixpanel_gdpr_status(mixpanel_request_id)
+                mixpanel_status = vendor_statuses["mixpanel"].get(mixpanel_request_id)
                 if mixpanel_status:
                     print(f"  Mixpanel status: {mixpanel_status}")
             elif current_mixpanel_status == "completed":
@@ -602,12 +619,11 @@ def process_gdpr_requests(
             else:
                 print("  No Mixpanel request ID found")
             
-            # Check Singular status
+            # Singular status
             singular_status = None
             current_singular_status = record.get("singular_deletion_status")
             if singular_request_id and current_singular_status != "completed":
-                print(f"Checking Singular status for request: {singular_request_id}")
-                singular_status = check_singular_gdpr_status(singular_request_id)
+                singular_status = vendor_statuses["singular"].get(singular_request_id)
                 if singular_status:
                     print(f"  Singular status: {singular_status}")
             elif current_singular_status == "completed":
@@ -616,45 +632,10 @@ def process_gdpr_requests(
             else:
                 print("  No Singular request ID found")
             
-            # Check and handle AppLovin status (create request if NULL)
-            distinct_id = record.get("distinct_id")
-            max_mediation_status = None
-            
-            # If status is None (NULL in database), create AppLovin deletion request
+            # AppLovin status (request created above if NULL)
             if current_max_mediation_status is None:
-                print(f"📝 AppLovin status is NULL for ticket {ticket_id}, creating deletion request...")
-                try:
-                    # Fetch advertising IDs for this user
-                    advertising_data = get_advertising_ids([distinct_id])
-                    ad_info = advertising_data.get(distinct_id, {})
-                    
-                    # Collect all non-null advertising IDs
-                    advertising_ids = []
-                    if ad_info.get("last_idfa"):
-                        advertising_ids.append(ad_info["last_idfa"])
-                    if ad_info.get("first_idfa") and ad_info["first_idfa"] != ad_info.get("last_idfa"):
-                        advertising_ids.append(ad_info["first_idfa"])
-                    if ad_info.get("last_gaid"):
-                        advertising_ids.append(ad_info["last_gaid"])
-                    if ad_info.get("first_gaid") and ad_info["first_gaid"] != ad_info.get("last_gaid"):
-                        advertising_ids.append(ad_info["first_gaid"])
-                    
-                    if advertising_ids:
-                        print(f"   Found {len(advertising_ids)} advertising IDs: {advertising_ids}")
-                        print(f"Creating AppLovin Max GDPR deletion request...")
-                        num_deleted = create_applovin_gdpr_request(advertising_ids)
-                        if num_deleted is not None and num_deleted > 0:
-                            max_mediation_status = "completed"
-                            print(f"✅ AppLovin deletion completed: {num_deleted} IDs deleted")
-                        else:
-                            max_mediation_status = "pending"
-                            print(f"⚠️  AppLovin deletion request created but status unclear")
-                    else:
-                        print(f"✅ No advertising IDs found for user {distinct_id}, AppLovin deletion not needed (nothing to delete)")
-                        max_mediation_status = "completed"
-                except Exception as e:
-                    print(f"⚠️  Failed to create AppLovin request: {e}")
-                    max_mediation_status = "pending"
+                max_mediation_status = applovin_statuses.get(record.get("distinct_id"), "pending")
+                print(f"  AppLovin status: {max_mediation_status}")
             else:
                 # Status exists, use it
                 max_mediation_status = current_max_mediation_status
@@ -669,12 +650,12 @@ def process_gdpr_requests(
             
             # Update BigQuery if we have any status changes
             if mixpanel_status or singular_status or current_max_mediation_status is None:
-                update_gdpr_request_status(
-                    ticket_id,
-                    mixpanel_status=mixpanel_status,
-                    singular_status=singular_status,
-                    max_mediation_status=final_max_mediation_status if final_max_mediation_status != "not started" else None
-                )
+                status_updates.append({
+                    "ticket_id": ticket_id,
+                    "mixpanel_status": mixpanel_status,
+                    "singular_status": singular_status,
+                    "max_mediation_status": final_max_mediation_status if final_max_mediation_status != "not started" else None,
+                })
             
             # Update emojis based on status
             message_ts = message.get("ts")
@@ -697,21 +678,10 @@ def process_gdpr_requests(
                 game_state_done = (game_state_status == "completed")
                 
                 if mixpanel_done and singular_done and max_mediation_done and bigquery_done and game_state_done:
-                    # All deletions completed - add white check mark, remove red car and computer
-                    try:
-                        remove_reaction(channel_id, message_ts, "car")
-                    except:
-                        pass
-                    try:
-                        remove_reaction(channel_id, message_ts, "computer")
-                    except:
-                        pass
-                    success = add_reaction_to_message(channel_id, message_ts, "white_check_mark")
-                    if success:
-                        print(f"✅ All deletions completed! Added white_check_mark emoji")
-                    
-                    update_gdpr_request_status(ticket_id, is_request_completed=True)
-                    print(f"✅ Updated is_request_completed to true for ticket {ticket_id}")
+                    # All deletions completed - the emojis change once the status is saved in BigQuery
+                    status_updates.append({"ticket_id": ticket_id, "is_request_completed": True})
+                    completed_messages.append(message_ts)
+                    print(f"✅ Marking is_request_completed as true for ticket {ticket_id}")
                 else:
                     pending_items = []
                     if not mixpanel_done:
@@ -733,6 +703,32 @@ def process_gdpr_requests(
             status_error_count += 1
             continue
     
+    updates_applied = True
+    if status_updates:
+        print(f"\nApplying {len(status_updates)} status updates to BigQuery...")
+        try:
+            apply_gdpr_status_updates(status_updates)
+        except Exception as e:
+            updates_applied = False
+            print(f"❌ Status updates were not saved: {e}")
+            if completed_messages:
+                print(f"   {len(completed_messages)} completed requests keep their emojis and are checked again next run")
+    
+    if updates_applied:
+        for message_ts in completed_messages:
+            # All deletions completed - add white check mark, remove red car and computer
+            try:
+                remove_reaction(channel_id, message_ts, "car")
+            except:
+                pass
+            try:
+                remove_reaction(channel_id, message_ts, "computer")
+            except:
+                pass
+            success = add_reaction_to_message(channel_id, message_ts, "white_check_mark")
+            if success:
+                print(f"✅ All deletions completed! Added white_check_mark emoji to message {message_ts}")
+    
     if status_check_count > 0:
         print(f"\n✅ Status check complete: {status_check_count} messages processed")
     
@@ -764,6 +760,17 @@ def main():
         type=str,
         help="Slack channel name (optional, uses config default if not provided)"
     )
+    parser.add_argument(
+        "--full-refresh",
+        action="store_true",
+        help="Re-fetch all messages in the date range from Slack, ignoring the local message cache"
+    )
+    parser.add_argument(
+        "--status-check-interval-hours",
+        type=float,
+        default=GDPR_STATUS_CHECK_INTERVAL_HOURS,
+        help="Skip status checks for tickets checked within this many hours (default: GDPR_STATUS_CHECK_INTERVAL_HOURS or 6, 0 checks all)"
+    )
     
     args = parser.parse_args()
     
@@ -774,7 +781,13 @@ def main():
         raise ValueError("Start date must be before or equal to end date")
     
     try:
-        process_gdpr_requests(start_date, end_date, args.channel)
+        process_gdpr_requests(
+            start_date,
+            end_date,
+            args.channel,
+            full_refresh=args.full_refresh,
+            status_check_interval_hours=args.status_check_interval_hours
+        )
     except Exception as e:
         print(f"Error: {e}")
         raise
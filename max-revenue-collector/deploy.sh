@@ -205,6 +205,7 @@ gcloud run deploy ${SERVICE_NAME} \
     --timeout 600 \
     --min-instances 0 \
     --max-instances 1 \
+    --no-cpu-throttling \
     --no-allow-unauthenticated
 
 echo "Cloud Run service deployed"
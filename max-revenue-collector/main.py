@@ -5,21 +5,32 @@ Cloud Run service that fetches user-level ad revenue data from AppLovin MAX API
 and stores it in BigQuery. Runs daily at 10 AM UTC via Cloud Scheduler.
 
 Process:
-1. Delete data from last 2 days in BigQuery
-2. Fetch iOS data for last 2 days from MAX API
-3. Fetch Android data for last 2 days from MAX API
-4. Insert all records into BigQuery
+1. Fetch iOS data for last 2 days from MAX API
+2. Fetch Android data for last 2 days from MAX API
+   (reports are streamed and transformed with pyarrow into temporary Parquet files)
+3. Load the records into a staging table and replace each day's partition
+   in BigQuery with a copy job (LOAD_MODE=delete_insert deletes the last
+   2 days first and appends instead)
 """
 
 import os
-import csv
-import io
+import json
 import logging
+import tempfile
+import threading
 import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Tuple
 
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import HTTPError as StreamError
 from flask import Flask, jsonify, request
 from google.cloud import bigquery
 from google.cloud import secretmanager
@@ -61,6 +72,103 @@ DAYS_TO_FETCH = 2
 MAX_RETRIES = 3
 RETRY_DELAY_SECONDS = 5
 
+# Concurrent fetch configuration: (platform, day) reports fetched in parallel
+# and the maximum rate of MAX API calls across all workers
+FETCH_WORKERS = int(os.environ.get("FETCH_WORKERS", "4"))
+MAX_API_REQUESTS_PER_SECOND = float(os.environ.get("MAX_API_REQUESTS_PER_SECOND", "2"))
+
+# How fetched days are written to BigQuery:
+# - "partition_swap": load into a staging table, then replace each date partition
+#   with a WRITE_TRUNCATE copy job (atomic per day, no DML)
+# - "delete_insert": DELETE the date range, then append the records
+LOAD_MODE = os.environ.get("LOAD_MODE", "partition_swap")
+
+# Report manifest: ETag and size of every (platform, date) report loaded, used
+# to skip downloading and reloading unchanged reports (partition_swap mode only)
+MANIFEST_ENABLED = os.environ.get("MANIFEST_ENABLED", "true").lower() == "true"
+MANIFEST_TABLE = os.environ.get("MANIFEST_TABLE", f"{BIGQUERY_TABLE}_manifest")
+MANIFEST_SCHEMA = [
+    bigquery.SchemaField("platform", "STRING", mode="REQUIRED"),
+    bigquery.SchemaField("date", "DATE", mode="REQUIRED"),
+    bigquery.SchemaField("etag", "STRING", mode="NULLABLE"),
+    bigquery.SchemaField("content_length", "INT64", mode="NULLABLE"),
+    bigquery.SchemaField("records", "INT64", mode="NULLABLE"),
+    bigquery.SchemaField("loaded_at", "TIMESTAMP", mode="NULLABLE"),
+]
+
+# Backfill jobs: status table, days loaded per batch, and day statuses that need no more work
+BACKFILL_JOBS_TABLE = os.environ.get("BACKFILL_JOBS_TABLE", f"{BIGQUERY_TABLE}_backfill_jobs")
+BACKFILL_BATCH_DAYS = int(os.environ.get("BACKFILL_BATCH_DAYS", "7"))
+BACKFILL_DONE_STATUSES = {"done", "unchanged", "no_data"}
+# Job statuses that need a live worker; without one the job was interrupted
+BACKFILL_ACTIVE_STATUSES = {"created", "running", "cancelling"}
+BACKFILL_JOBS_SCHEMA = [
+    bigquery.SchemaField("job_id", "STRING", mode="REQUIRED"),
+    bigquery.SchemaField("platform", "STRING", mode="NULLABLE"),
+    bigquery.SchemaField("date", "DATE", mode="NULLABLE"),
+    bigquery.SchemaField("status", "STRING", mode="REQUIRED"),
+    bigquery.SchemaField("records", "INT64", mode="NULLABLE"),
+    bigquery.SchemaField("error", "STRING", mode="NULLABLE"),
+    bigquery.SchemaField("start_date", "DATE", mode="NULLABLE"),
+    bigquery.SchemaField("end_date", "DATE", mode="NULLABLE"),
+    bigquery.SchemaField("options", "STRING", mode="NULLABLE"),
+    bigquery.SchemaField("updated_at", "TIMESTAMP", mode="REQUIRED"),
+]
+
+# Record files are gzip-compressed Parquet. Loads above LOAD_CHUNK_BYTES (compressed)
+# are split into several load jobs, LOAD_WORKERS of them uploaded in parallel
+PARQUET_COMPRESSION = "gzip"
+LOAD_CHUNK_BYTES = int(os.environ.get("LOAD_CHUNK_MB", "256")) * 1024 * 1024
+LOAD_WORKERS = int(os.environ.get("LOAD_WORKERS", "4"))
+LOAD_POLL_SECONDS = 2
+
+# MAX API CSV columns read from each report (any that are missing are read as empty)
+CSV_SOURCE_COLUMNS = [
+    "Date", "Ad Unit ID", "Ad Unit Name", "Waterfall", "Ad Format", "Placement", "Country",
+    "Device Type", "IDFA", "IDFV", "User ID", "Revenue", "Ad placement"
+]
+
+# CSV bytes read and transformed per block
+CSV_BLOCK_SIZE = 4 * 1024 * 1024
+
+# BigQuery table schema
+TABLE_SCHEMA = [
+    bigquery.SchemaField("timestamp", "TIMESTAMP", mode="REQUIRED"),
+    bigquery.SchemaField("date", "DATE", mode="REQUIRED"),
+    bigquery.SchemaField("ad_unit_id", "STRING", mode="NULLABLE"),
+    bigquery.SchemaField("ad_unit_name", "STRING", mode="NULLABLE"),
+    bigquery.SchemaField("waterfall", "STRING", mode="NULLABLE"),
+    bigquery.SchemaField("ad_format", "STRING", mode="NULLABLE"),
+    bigquery.SchemaField("placement", "STRING", mode="NULLABLE"),
+    bigquery.SchemaField("country", "STRING", mode="NULLABLE"),
+    bigquery.SchemaField("device_type", "STRING", mode="NULLABLE"),
+    bigquery.SchemaField("idfa", "STRING", mode="NULLABLE"),
+    bigquery.SchemaField("idfv", "STRING", mode="NULLABLE"),
+    bigquery.SchemaField("user_id", "STRING", mode="NULLABLE"),
+    bigquery.SchemaField("revenue", "FLOAT", mode="NULLABLE"),
+    bigquery.SchemaField("ad_placement", "STRING", mode="NULLABLE"),
+    bigquery.SchemaField("platform", "STRING", mode="NULLABLE"),
+]
+
+# Arrow schema of the transformed records (matches TABLE_SCHEMA)
+RECORD_SCHEMA = pa.schema([
+    pa.field("timestamp", pa.timestamp("us", tz="UTC"), nullable=False),
+    pa.field("date", pa.date32(), nullable=False),
+    pa.field("ad_unit_id", pa.string()),
+    pa.field("ad_unit_name", pa.string()),
+    pa.field("waterfall", pa.string()),
+    pa.field("ad_format", pa.string()),
+    pa.field("placement", pa.string()),
+    pa.field("country", pa.string()),
+    pa.field("device_type", pa.string()),
+    pa.field("idfa", pa.string()),
+    pa.field("idfv", pa.string()),
+    pa.field("user_id", pa.string()),
+    pa.field("revenue", pa.float64()),
+    pa.field("ad_placement", pa.string()),
+    pa.field("platform", pa.string()),
+])
+
 # Flask app
 app = Flask(__name__)
 
@@ -145,222 +253,477 @@ def delete_existing_data(client: bigquery.Client, start_date: str, end_date: str
         raise
 
 
-def fetch_max_api_data(
+class RateLimiter:
+    """
+    Thread-safe limiter that spaces calls to at most `rate` per second.
+    Shared by all fetch workers so concurrency never exceeds the MAX API rate.
+    """
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_allowed = 0.0
+
+    def acquire(self):
+        """Block until the next call is allowed."""
+        with self._lock:
+            now = time.monotonic()
+            wait_time = max(0.0, self._next_allowed - now)
+            self._next_allowed = max(now, self._next_allowed) + self.interval
+        if wait_time > 0:
+            time.sleep(wait_time)
+
+
+def create_http_session(pool_size: int = FETCH_WORKERS) -> requests.Session:
+    """
+    Create an HTTP session shared by all fetch workers.
+    Keeps connections to the MAX API and S3 alive across days and platforms.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def iter_dates(start_date: str, end_date: str) -> List[str]:
+    """Return every date from start_date to end_date (inclusive) in YYYY-MM-DD format."""
+    start = datetime.strptime(start_date, "%Y-%m-%d")
+    end = datetime.strptime(end_date, "%Y-%m-%d")
+    return [(start + timedelta(days=i)).strftime("%Y-%m-%d") for i in range((end - start).days + 1)]
+
+
+def fetch_max_api_day(
     api_key: str,
     platform_config: Dict,
-    start_date: str,
-    end_date: str
-) -> List[Dict]:
+    date_str: str,
+    output_path: str,
+    session: Optional[requests.Session] = None,
+    rate_limiter: Optional[RateLimiter] = None,
+    known_etag: Optional[str] = None
+) -> Dict:
     """
-    Fetch user-level ad revenue data from MAX API for a specific platform.
+    Fetch user-level ad revenue data from MAX API for one platform and one day.
     
-    The MAX User-Level API requires a single date per request, so we loop through each day.
-    The API returns a JSON with a URL to the actual CSV file.
+    The API returns a JSON with a URL to the actual CSV file. The CSV is streamed
+    from the response and transformed block by block into a Parquet file at output_path,
+    so the report is never held in memory. Only the MAX API call goes through the
+    rate limiter; the CSV download does not.
     
-    Returns a list of dictionaries, each representing a row of data.
+    If known_etag is given (from the report manifest), the CSV is requested with
+    If-None-Match and not downloaded when S3 answers 304 or returns the same ETag.
+    
+    Returns {"records", "etag", "content_length", "unchanged"}; records is the number
+    of records written (0 if the CSV was empty or the report is unchanged).
+    
+    Raises RuntimeError if the report could not be fetched (API errors, failed
+    downloads, exhausted retries), so the caller never mistakes a failure for an
+    empty day.
     """
     platform_name = platform_config["name"]
-    logger.info(f"Fetching {platform_name} data from {start_date} to {end_date}")
-    
-    all_records = []
-    
-    # Parse dates and iterate through each day
-    from datetime import datetime as dt
-    start = dt.strptime(start_date, "%Y-%m-%d")
-    end = dt.strptime(end_date, "%Y-%m-%d")
-    
-    current = start
-    while current <= end:
-        date_str = current.strftime("%Y-%m-%d")
-        logger.info(f"Fetching {platform_name} data for {date_str}")
-        
-        # Use store_id only (API doesn't allow both store_id and application)
-        params = {
-            "api_key": api_key,
-            "platform": platform_config["platform"],
-            "store_id": platform_config["store_id"],
-            "date": date_str,
-            "aggregated": "false"
-        }
-        
-        for attempt in range(MAX_RETRIES):
-            try:
-                logger.info(f"API request attempt {attempt + 1}/{MAX_RETRIES} for {platform_name} on {date_str}")
+    http = session or requests
+    logger.info(f"Fetching {platform_name} data for {date_str}")
+    
+    # Use store_id only (API doesn't allow both store_id and application)
+    params = {
+        "api_key": api_key,
+        "platform": platform_config["platform"],
+        "store_id": platform_config["store_id"],
+        "date": date_str,
+        "aggregated": "false"
+    }
+    
+    report = {"records": 0, "etag": None, "content_length": None, "unchanged": False}
+    last_error = None
+    for attempt in range(MAX_RETRIES):
+        try:
+            logger.info(f"API request attempt {attempt + 1}/{MAX_RETRIES} for {platform_name} on {date_str}")
+            
+            if rate_limiter:
+                rate_limiter.acquire()
+            response = http.get(
+                MAX_API_ENDPOINT,
+                params=params,
+                timeout=60
+            )
+            
+            if response.status_code == 200:
+                # Parse JSON response to get CSV URL
+                try:
+                    json_response = response.json()
+                except ValueError as e:
+                    logger.error(f"Response text: {response.text[:500]}")
+                    raise RuntimeError(f"Invalid JSON response for {platform_name} on {date_str}: {e}") from e
+                logger.info(f"API Response: status={json_response.get('status')}")
                 
-                response = requests.get(
-                    MAX_API_ENDPOINT,
-                    params=params,
-                    timeout=60
-                )
+                if json_response.get("status") != 200:
+                    raise RuntimeError(f"API returned status {json_response.get('status')} for {platform_name} on {date_str}")
                 
-                if response.status_code == 200:
-                    # Parse JSON response to get CSV URL
-                    try:
-                        json_response = response.json()
-                        logger.info(f"API Response: status={json_response.get('status')}")
-                        
-                        if json_response.get("status") != 200:
-                            logger.warning(f"API returned status {json_response.get('status')} for {platform_name} on {date_str}")
-                            break
-                        
-                        # Get the CSV URL (prefer ad_revenue_report_url for complete data)
-                        csv_url = json_response.get("ad_revenue_report_url") or json_response.get("url")
-                        
-                        if not csv_url:
-                            logger.warning(f"No CSV URL in response for {platform_name} on {date_str}")
-                            break
-                        
-                        # Download the CSV file
-                        logger.info(f"Downloading CSV from S3...")
-                        csv_response = requests.get(csv_url, timeout=300)
-                        
-                        if csv_response.status_code == 200:
-                            csv_content = csv_response.text
-                            if csv_content.strip():
-                                records = parse_csv_response(csv_content, platform_name)
-                                all_records.extend(records)
-                                logger.info(f"Fetched {len(records)} records for {platform_name} on {date_str}")
-                            else:
-                                logger.info(f"No data for {platform_name} on {date_str}")
-                        else:
-                            logger.error(f"Failed to download CSV: {csv_response.status_code}")
-                        
-                        break  # Success, move to next day
-                        
-                    except ValueError as e:
-                        logger.error(f"Invalid JSON response: {e}")
-                        logger.error(f"Response text: {response.text[:500]}")
-                        break
+                # Get the CSV URL (prefer ad_revenue_report_url for complete data)
+                csv_url = json_response.get("ad_revenue_report_url") or json_response.get("url")
                 
-                elif response.status_code == 429:
-                    wait_time = RETRY_DELAY_SECONDS * (attempt + 1) * 2
-                    logger.warning(f"Rate limited. Waiting {wait_time} seconds...")
-                    time.sleep(wait_time)
-                    continue
+                if not csv_url:
+                    raise RuntimeError(f"No CSV URL in response for {platform_name} on {date_str}")
                 
-                else:
-                    logger.error(f"API error for {platform_name} on {date_str}: {response.status_code} - {response.text[:500]}")
-                    if attempt < MAX_RETRIES - 1:
-                        time.sleep(RETRY_DELAY_SECONDS * (attempt + 1))
+                # Stream the CSV file into the Parquet output (conditional on the manifest ETag)
+                logger.info(f"Downloading CSV from S3 for {platform_name} on {date_str}...")
+                headers = {"If-None-Match": known_etag} if known_etag else None
+                with http.get(csv_url, timeout=300, stream=True, headers=headers) as csv_response:
+                    etag = csv_response.headers.get("ETag")
+                    if csv_response.status_code == 304 or (known_etag and etag == known_etag):
+                        logger.info(f"Report unchanged for {platform_name} on {date_str} (ETag {known_etag}), skipping download")
+                        report["unchanged"] = True
+                        return report
+                    
+                    if csv_response.status_code != 200:
+                        last_error = f"Failed to download CSV for {platform_name} on {date_str}: {csv_response.status_code}"
+                        logger.error(last_error)
+                        if attempt < MAX_RETRIES - 1:
+                            time.sleep(RETRY_DELAY_SECONDS * (attempt + 1))
                         continue
-                    break
                     
-            except requests.exceptions.Timeout:
-                logger.warning(f"Request timeout for {platform_name} on {date_str}, attempt {attempt + 1}")
-                if attempt < MAX_RETRIES - 1:
-                    time.sleep(RETRY_DELAY_SECONDS * (attempt + 1))
-                    continue
-                break
+                    report["etag"] = etag
+                    content_length = csv_response.headers.get("Content-Length")
+                    report["content_length"] = int(content_length) if content_length else None
+                    csv_response.raw.decode_content = True
+                    try:
+                        report["records"] = write_csv_as_parquet(
+                            csv_response.raw,
+                            platform_name,
+                            output_path,
+                            encoding=csv_response.encoding or "utf-8"
+                        )
+                    except pa.ArrowInvalid as e:
+                        # ArrowInvalid is a ValueError; keep it apart from invalid JSON responses
+                        raise RuntimeError(f"Could not parse CSV for {platform_name} on {date_str}: {e}") from e
+                
+                # Only a downloaded, empty CSV means there is no data for the day
+                if report["records"]:
+                    logger.info(f"Fetched {report['records']} records for {platform_name} on {date_str}")
+                else:
+                    logger.info(f"No data for {platform_name} on {date_str}")
+                return report
             
-            except requests.exceptions.RequestException as e:
-                logger.error(f"Request error for {platform_name} on {date_str}: {e}")
+            elif response.status_code == 429:
+                last_error = f"Rate limited by MAX API for {platform_name} on {date_str}"
+                wait_time = RETRY_DELAY_SECONDS * (attempt + 1) * 2
+                logger.warning(f"Rate limited. Waiting {wait_time} seconds...")
+                time.sleep(wait_time)
+                continue
+            
+            else:
+                last_error = f"API error for {platform_name} on {date_str}: {response.status_code} - {response.text[:500]}"
+                logger.error(last_error)
                 if attempt < MAX_RETRIES - 1:
                     time.sleep(RETRY_DELAY_SECONDS * (attempt + 1))
-                    continue
-                break
+                continue
+                
+        except requests.exceptions.Timeout:
+            last_error = f"Request timeout for {platform_name} on {date_str}"
+            logger.warning(f"{last_error}, attempt {attempt + 1}")
+            if attempt < MAX_RETRIES - 1:
+                time.sleep(RETRY_DELAY_SECONDS * (attempt + 1))
+            continue
+        
+        except (requests.exceptions.RequestException, StreamError) as e:
+            # StreamError: the connection failed while the CSV was being streamed
+            last_error = f"Request error for {platform_name} on {date_str}: {e}"
+            logger.error(last_error)
+            if attempt < MAX_RETRIES - 1:
+                time.sleep(RETRY_DELAY_SECONDS * (attempt + 1))
+            continue
+    
+    # Retries exhausted: fail the report so its day is kept instead of replaced without it
+    raise RuntimeError(f"{last_error} (after {MAX_RETRIES} attempts)")
+
+
+def fetch_all_platforms(
+    api_key: str,
+    start_date: str,
+    end_date: str,
+    output_dir: str,
+    manifest: Optional[Dict[Tuple[str, str], str]] = None
+) -> Tuple[List[Dict], Dict]:
+    """
+    Fetch all PLATFORMS for every day in the date range concurrently.
+    
+    Each (platform, day) pair is one task on a pool of FETCH_WORKERS threads. All
+    workers share one HTTP session and one rate limiter for the MAX API. Every
+    report is written to its own Parquet file in output_dir.
+    
+    With a report manifest ({(platform, date): etag}), unchanged reports are not
+    downloaded. A day's partition holds every platform, so if only some platforms
+    changed for a day, the unchanged ones are downloaded again in a second pass.
+    
+    Returns (record_files, platform_stats). record_files has one entry per report
+    with data ({"platform", "date", "path", "records", "etag", "content_length"}),
+    ordered by platform, then day.
+    """
+    manifest = manifest or {}
+    dates = iter_dates(start_date, end_date)
+    tasks = [(platform_config, date_str) for platform_config in PLATFORMS for date_str in dates]
+    workers = max(1, min(FETCH_WORKERS, len(tasks)))
+    logger.info(f"Fetching {len(tasks)} (platform, day) reports with {workers} workers")
+    
+    rate_limiter = RateLimiter(MAX_API_REQUESTS_PER_SECOND)
+    reports = {}
+    errors = {}
+    
+    def output_path_for(platform_name: str, date_str: str) -> str:
+        return os.path.join(output_dir, f"{platform_name}_{date_str}.parquet")
+    
+    def run_tasks(executor, session, tasks_to_run, use_manifest: bool):
+        futures = {
+            executor.submit(
+                fetch_max_api_day, api_key, platform_config, date_str,
+                output_path_for(platform_config["name"], date_str), session, rate_limiter,
+                manifest.get((platform_config["name"], date_str)) if use_manifest else None
+            ): (platform_config["name"], date_str)
+            for platform_config, date_str in tasks_to_run
+        }
+        for future in as_completed(futures):
+            key = futures[future]
+            try:
+                reports[key] = future.result()
+            except Exception as e:
+                logger.error(f"Failed to fetch {key[0]} data for {key[1]}: {e}")
+                errors[key] = str(e)
+    
+    with create_http_session(workers) as session:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="max-fetch") as executor:
+            run_tasks(executor, session, tasks, use_manifest=True)
+            
+            # Days where only some platforms are unchanged need the unchanged reports too
+            mixed_days = {
+                date_str for date_str in dates
+                if not any((p["name"], date_str) in errors for p in PLATFORMS)
+                and any(reports[(p["name"], date_str)]["unchanged"] for p in PLATFORMS)
+                and not all(reports[(p["name"], date_str)]["unchanged"] for p in PLATFORMS)
+            }
+            refetch = [
+                (platform_config, date_str) for platform_config, date_str in tasks
+                if date_str in mixed_days and reports.get((platform_config["name"], date_str), {}).get("unchanged")
+            ]
+            if refetch:
+                logger.info(f"Downloading {len(refetch)} unchanged reports again for partially changed days")
+                run_tasks(executor, session, refetch, use_manifest=False)
+    
+    record_files = []
+    platform_stats = {}
+    for platform_config in PLATFORMS:
+        platform_name = platform_config["name"]
+        platform_records = 0
+        failed_days = []
+        unchanged_days = []
+        for date_str in dates:
+            key = (platform_name, date_str)
+            if key in errors:
+                failed_days.append(date_str)
+                continue
+            report = reports[key]
+            if report["unchanged"]:
+                unchanged_days.append(date_str)
+            elif report["records"]:
+                record_files.append({
+                    "platform": platform_name,
+                    "date": date_str,
+                    "path": output_path_for(platform_name, date_str),
+                    "records": report["records"],
+                    "etag": report["etag"],
+                    "content_length": report["content_length"]
+                })
+                platform_records += report["records"]
         
-        # Move to next day
-        current += timedelta(days=1)
+        platform_stats[platform_name] = {
+            "records_fetched": platform_records,
+            "status": "error" if failed_days else "success"
+        }
+        if unchanged_days:
+            platform_stats[platform_name]["unchanged_days"] = unchanged_days
+        if failed_days:
+            platform_stats[platform_name]["failed_days"] = failed_days
+            platform_stats[platform_name]["error"] = errors[(platform_name, failed_days[0])]
+        logger.info(f"Total records fetched for {platform_name}: {platform_records}")
+    
+    return record_files, platform_stats
+
+
+def load_report_manifest(client: bigquery.Client, start_date: str, end_date: str) -> Dict[Tuple[str, str], str]:
+    """
+    Read the latest ETag of every (platform, date) report loaded for the date range.
+    
+    Returns {(platform, date): etag}. An empty manifest (everything is downloaded) is
+    returned if the manifest table does not exist yet or cannot be read.
+    """
+    query = f"""
+    SELECT platform, CAST(date AS STRING) AS date, etag
+    FROM `{MANIFEST_TABLE}`
+    WHERE date BETWEEN @start_date AND @end_date
+      AND etag IS NOT NULL
+    QUALIFY ROW_NUMBER() OVER (PARTITION BY platform, date ORDER BY loaded_at DESC) = 1
+    """
+    job_config = bigquery.QueryJobConfig(
+        query_parameters=[
+            bigquery.ScalarQueryParameter("start_date", "DATE", start_date),
+            bigquery.ScalarQueryParameter("end_date", "DATE", end_date),
+        ]
+    )
+    try:
+        rows = client.query(query, job_config=job_config).result()
+        manifest = {(row.platform, row.date): row.etag for row in rows}
+        logger.info(f"Loaded report manifest with {len(manifest)} entries")
+        return manifest
+    except NotFound:
+        logger.info(f"Manifest table {MANIFEST_TABLE} not found. All reports will be downloaded.")
+        return {}
+    except Exception as e:
+        logger.warning(f"Failed to read report manifest, all reports will be downloaded: {e}")
+        return {}
+
+
+def record_report_manifest(client: bigquery.Client, record_files: List[Dict], dates: List[str]):
+    """
+    Append the ETag and size of every report loaded for the given dates to the
+    manifest table (a load job, no DML). Failures are logged and ignored; the
+    reports are simply downloaded again next run.
+    """
+    loaded_at = datetime.utcnow().isoformat()
+    rows = [
+        {
+            "platform": record_file["platform"],
+            "date": record_file["date"],
+            "etag": record_file["etag"],
+            "content_length": record_file["content_length"],
+            "records": record_file["records"],
+            "loaded_at": loaded_at
+        }
+        for record_file in record_files
+        if record_file["date"] in dates and record_file.get("etag")
+    ]
+    if not rows:
+        return
     
-    logger.info(f"Total records fetched for {platform_name}: {len(all_records)}")
-    return all_records
+    job_config = bigquery.LoadJobConfig(
+        schema=MANIFEST_SCHEMA,
+        write_disposition=bigquery.WriteDisposition.WRITE_APPEND,
+        source_format=bigquery.SourceFormat.NEWLINE_DELIMITED_JSON
+    )
+    try:
+        client.load_table_from_json(rows, MANIFEST_TABLE, job_config=job_config).result()
+        logger.info(f"Recorded {len(rows)} reports in manifest {MANIFEST_TABLE}")
+    except Exception as e:
+        logger.warning(f"Failed to record report manifest: {e}")
 
 
-def parse_csv_response(csv_content: str, platform_name: str) -> List[Dict]:
+def transform_csv_batch(batch: pa.RecordBatch, platform_name: str) -> Tuple[pa.Table, int]:
     """
-    Parse CSV response from MAX API into list of dictionaries.
-    Maps CSV columns to BigQuery schema.
+    Map a block of MAX API CSV rows to the BigQuery schema with vectorized column operations.
     
     Expected MAX API columns (non-aggregated):
     - Date, Ad Unit ID, Ad Unit Name, Placement, IDFA, IDFV, User Id, Revenue
     - Ad Format, Ad Placement, Country, Device Type, Network, Waterfall, Custom Data
+    
+    Rows without a valid date are dropped. Returns (table, rows_dropped).
     """
-    records = []
+    columns = {name: pc.fill_null(batch.column(name), "") for name in batch.schema.names}
     
-    # Log first 500 chars of response to see column names
-    logger.info(f"CSV Response preview: {csv_content[:500]}")
+    # Handle the date/timestamp field
+    # MAX API uses "Date" column with format like "2019-07-29 15:53:07.39":
+    # parse up to the seconds, then add the fraction padded/truncated to microseconds
+    date_str = columns["Date"]
+    has_time = pc.match_substring_regex(date_str, r"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}(\.\d*)?$")
+    seconds = pc.strptime(
+        pc.utf8_slice_codeunits(date_str, 0, 19), format="%Y-%m-%d %H:%M:%S", unit="us", error_is_null=True
+    )
+    fraction = pc.utf8_slice_codeunits(
+        pc.binary_join_element_wise(pc.utf8_slice_codeunits(date_str, 20, 26), "000000", ""), 0, 6
+    )
+    microseconds = pc.cast(pc.cast(pc.if_else(has_time, fraction, "0"), pa.int64()), pa.duration("us"))
+    with_time = pc.if_else(has_time, pc.add(seconds, microseconds), pa.scalar(None, pa.timestamp("us")))
+    # Fall back to the date only (midnight)
+    date_only = pc.strptime(pc.utf8_slice_codeunits(date_str, 0, 10), format="%Y-%m-%d", unit="us", error_is_null=True)
+    timestamp = pc.cast(pc.coalesce(with_time, date_only), pa.timestamp("us", tz="UTC"))
+    valid = pc.is_valid(timestamp)
     
-    # Use StringIO to read CSV from string
-    csv_file = io.StringIO(csv_content)
-    reader = csv.DictReader(csv_file)
+    # Parse revenue as float (empty or invalid -> 0.0)
+    revenue_str = pc.utf8_trim_whitespace(columns["Revenue"])
+    is_number = pc.match_substring_regex(revenue_str, r"^[+-]?(\d+(\.\d*)?|\.\d+)([eE][+-]?\d+)?$")
+    revenue = pc.cast(pc.if_else(is_number, revenue_str, "0"), pa.float64())
     
-    # Log available columns
-    if reader.fieldnames:
-        logger.info(f"Available columns: {reader.fieldnames}")
+    # Map platform name: ios -> Apple, android -> Android
+    platform_display = "Apple" if platform_name.lower() == "ios" else "Android"
     
-    for row in reader:
-        try:
-            # Handle the date/timestamp field
-            # MAX API uses "Date" column with format like "2019-07-29 15:53:07.39"
-            date_str = row.get("Date", "")
-            timestamp_value = None
-            date_value = None
-            
-            if date_str:
-                try:
-                    # Try parsing with milliseconds: "2019-07-29 15:53:07.39"
-                    base_str = date_str.split(".")[0]
-                    dt = datetime.strptime(base_str, "%Y-%m-%d %H:%M:%S")
-                    if "." in date_str:
-                        ms_part = date_str.split(".")[1]
-                        ms_part = ms_part.ljust(6, '0')[:6]
-                        dt = dt.replace(microsecond=int(ms_part))
-                    timestamp_value = dt.isoformat()
-                    date_value = dt.strftime("%Y-%m-%d")  # YYYY-MM-DD format
-                except ValueError:
-                    try:
-                        # Try date only format
-                        dt = datetime.strptime(date_str[:10], "%Y-%m-%d")
-                        timestamp_value = dt.isoformat()
-                        date_value = dt.strftime("%Y-%m-%d")
-                    except ValueError:
-                        logger.warning(f"Could not parse date: {date_str}")
-                        timestamp_value = None
-                        date_value = None
-            
-            # Parse revenue as float
-            revenue_str = row.get("Revenue", "0")
-            try:
-                revenue = float(revenue_str) if revenue_str else 0.0
-            except ValueError:
-                revenue = 0.0
-            
-            # Map platform name: ios -> Apple, android -> Android
-            platform_display = "Apple" if platform_name.lower() == "ios" else "Android"
-            
-            # Get country and uppercase it
-            country_value = row.get("Country", "")
-            country_upper = country_value.upper() if country_value else ""
-            
-            record = {
-                "timestamp": timestamp_value,
-                "date": date_value,
-                "ad_unit_id": row.get("Ad Unit ID", ""),
-                "ad_unit_name": row.get("Ad Unit Name", ""),
-                "waterfall": row.get("Waterfall", ""),
-                "ad_format": row.get("Ad Format", ""),
-                "placement": row.get("Placement", ""),
-                "country": country_upper,
-                "device_type": row.get("Device Type", ""),
-                "idfa": row.get("IDFA", ""),
-                "idfv": row.get("IDFV", ""),
-                "user_id": row.get("User ID", ""),  # Note: uppercase "ID"
-                "revenue": revenue,
-                "ad_placement": row.get("Ad placement", ""),  # Note: lowercase "placement"
-                "platform": platform_display
-            }
-            
-            # Only add records with valid dates
-            if timestamp_value and date_value:
-                records.append(record)
-            else:
-                logger.warning(f"Skipping record with invalid/missing date: {row}")
-                
-        except Exception as e:
-            logger.warning(f"Error parsing row: {e}. Row: {row}")
-            continue
+    table = pa.Table.from_arrays(
+        [
+            timestamp,
+            pc.cast(timestamp, pa.date32()),
+            columns["Ad Unit ID"],
+            columns["Ad Unit Name"],
+            columns["Waterfall"],
+            columns["Ad Format"],
+            columns["Placement"],
+            pc.utf8_upper(columns["Country"]),
+            columns["Device Type"],
+            columns["IDFA"],
+            columns["IDFV"],
+            columns["User ID"],  # Note: uppercase "ID"
+            revenue,
+            columns["Ad placement"],  # Note: lowercase "placement"
+            pa.repeat(platform_display, len(batch)),
+        ],
+        schema=RECORD_SCHEMA
+    )
     
-    return records
+    # Only keep records with valid dates
+    table = table.filter(valid)
+    return table, len(batch) - table.num_rows
+
+
+def write_csv_as_parquet(csv_stream, platform_name: str, output_path: str, encoding: str = "utf-8") -> int:
+    """
+    Read a CSV byte stream block by block with pyarrow, transform each block and
+    append it to a Parquet file at output_path.
+    
+    Only one block (CSV_BLOCK_SIZE bytes) is held in memory at a time, so memory
+    does not grow with the report size. No file is written if there are no records.
+    
+    Returns the number of records written.
+    """
+    try:
+        reader = pa_csv.open_csv(
+            csv_stream,
+            read_options=pa_csv.ReadOptions(block_size=CSV_BLOCK_SIZE, encoding=encoding),
+            convert_options=pa_csv.ConvertOptions(
+                column_types={column: pa.string() for column in CSV_SOURCE_COLUMNS},
+                include_columns=CSV_SOURCE_COLUMNS,
+                include_missing_columns=True,
+                strings_can_be_null=False
+            )
+        )
+    except pa.ArrowInvalid as e:
+        if "Empty CSV file" in str(e):
+            return 0
+        raise
+    
+    records_written = 0
+    rows_dropped = 0
+    writer = None
+    try:
+        for batch in reader:
+            table, dropped = transform_csv_batch(batch, platform_name)
+            rows_dropped += dropped
+            if table.num_rows:
+                if writer is None:
+                    writer = pq.ParquetWriter(output_path, RECORD_SCHEMA, compression=PARQUET_COMPRESSION)
+                writer.write_table(table)
+                records_written += table.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+    
+    if rows_dropped:
+        logger.warning(f"Skipped {rows_dropped} {platform_name} records with invalid/missing date")
+    return records_written
 
 
 def ensure_table_exists(client: bigquery.Client):
@@ -394,25 +757,7 @@ def ensure_table_exists(client: bigquery.Client):
         pass
     
     # Create table with schema and partitioning
-    schema = [
-        bigquery.SchemaField("timestamp", "TIMESTAMP", mode="REQUIRED"),
-        bigquery.SchemaField("date", "DATE", mode="REQUIRED"),
-        bigquery.SchemaField("ad_unit_id", "STRING", mode="NULLABLE"),
-        bigquery.SchemaField("ad_unit_name", "STRING", mode="NULLABLE"),
-        bigquery.SchemaField("waterfall", "STRING", mode="NULLABLE"),
-        bigquery.SchemaField("ad_format", "STRING", mode="NULLABLE"),
-        bigquery.SchemaField("placement", "STRING", mode="NULLABLE"),
-        bigquery.SchemaField("country", "STRING", mode="NULLABLE"),
-        bigquery.SchemaField("device_type", "STRING", mode="NULLABLE"),
-        bigquery.SchemaField("idfa", "STRING", mode="NULLABLE"),
-        bigquery.SchemaField("idfv", "STRING", mode="NULLABLE"),
-        bigquery.SchemaField("user_id", "STRING", mode="NULLABLE"),
-        bigquery.SchemaField("revenue", "FLOAT", mode="NULLABLE"),
-        bigquery.SchemaField("ad_placement", "STRING", mode="NULLABLE"),
-        bigquery.SchemaField("platform", "STRING", mode="NULLABLE"),
-    ]
-    
-    table = bigquery.Table(table_ref, schema=schema)
+    table = bigquery.Table(table_ref, schema=TABLE_SCHEMA)
     
     # Configure day partitioning on date column (DATE type)
     table.time_partitioning = bigquery.TimePartitioning(
@@ -424,74 +769,331 @@ def ensure_table_exists(client: bigquery.Client):
     logger.info(f"Created table {BIGQUERY_TABLE} with day partitioning on 'date' column")
 
 
-def insert_records(client: bigquery.Client, records: List[Dict]) -> int:
+def plan_load_chunks(record_files: List[Dict], max_chunk_bytes: int) -> List[List[Dict]]:
+    """
+    Group record files into load chunks of at most max_chunk_bytes (by compressed file size).
+    A single file larger than the limit is a chunk of its own.
+    """
+    chunks = []
+    current, current_bytes = [], 0
+    for record_file in record_files:
+        size = os.path.getsize(record_file["path"])
+        if current and current_bytes + size > max_chunk_bytes:
+            chunks.append(current)
+            current, current_bytes = [], 0
+        current.append(record_file)
+        current_bytes += size
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def build_chunk_file(chunk: List[Dict], upload_path: str) -> str:
     """
-    Insert records into BigQuery using batch load jobs (not streaming).
+    Combine the record files of a chunk into one Parquet upload file, row group by
+    row group (each record file is removed once copied). A chunk of a single file
+    is uploaded as is. Returns the path to upload.
+    """
+    if len(chunk) == 1:
+        return chunk[0]["path"]
+    
+    with pq.ParquetWriter(upload_path, RECORD_SCHEMA, compression=PARQUET_COMPRESSION) as writer:
+        for record_file in chunk:
+            part = pq.ParquetFile(record_file["path"])
+            for row_group in range(part.num_row_groups):
+                writer.write_table(part.read_row_group(row_group))
+            os.remove(record_file["path"])
+    return upload_path
+
+
+def load_record_files(
+    client: bigquery.Client,
+    record_files: List[Dict],
+    destination: str,
+    job_config: bigquery.LoadJobConfig
+) -> List[Dict]:
+    """
+    Load the compressed Parquet record files written by fetch_all_platforms into a
+    BigQuery table using batch load jobs (not streaming).
     
-    Benefits over streaming inserts:
+    Files are grouped into chunks of at most LOAD_CHUNK_BYTES. Each chunk is uploaded
+    from disk as its own load job, LOAD_WORKERS uploads at a time, so records are
+    never held in memory and large backfills upload in parallel. All jobs are then
+    polled together.
+    
+    Returns per-chunk stats ({"chunk", "files", "bytes", "records", "rows_loaded", "job_id"}).
+    Raises if any load job failed (the other chunks are still loaded).
+    """
+    chunks = plan_load_chunks(record_files, LOAD_CHUNK_BYTES)
+    total_records = sum(record_file["records"] for record_file in record_files)
+    logger.info(
+        f"Loading {total_records} records from {len(record_files)} files into {destination} "
+        f"in {len(chunks)} load job(s)..."
+    )
+    
+    job_config.source_format = bigquery.SourceFormat.PARQUET
+    output_dir = os.path.dirname(record_files[0]["path"])
+    
+    def upload_chunk(chunk_index: int, chunk: List[Dict]) -> Dict:
+        upload_path = build_chunk_file(chunk, os.path.join(output_dir, f"upload_{chunk_index}.parquet"))
+        chunk_stats = {
+            "chunk": chunk_index,
+            "files": len(chunk),
+            "bytes": os.path.getsize(upload_path),
+            "records": sum(record_file["records"] for record_file in chunk),
+        }
+        with open(upload_path, "rb") as upload_file:
+            load_job = client.load_table_from_file(
+                upload_file,
+                destination,
+                job_config=job_config
+            )
+        os.remove(upload_path)
+        chunk_stats["job_id"] = load_job.job_id
+        logger.info(f"Load job started for chunk {chunk_index} ({chunk_stats['bytes']} bytes): {load_job.job_id}")
+        return {"stats": chunk_stats, "job": load_job}
+    
+    # Upload chunks in parallel; each upload returns once its load job is created
+    workers = max(1, min(LOAD_WORKERS, len(chunks)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="max-load") as executor:
+        uploads = list(executor.map(lambda item: upload_chunk(*item), enumerate(chunks)))
+    
+    # Poll all load jobs together until every one has finished
+    pending = list(uploads)
+    while pending:
+        for upload in list(pending):
+            if upload["job"].done():
+                pending.remove(upload)
+        if pending:
+            time.sleep(LOAD_POLL_SECONDS)
+    
+    failures = []
+    for upload in uploads:
+        load_job, chunk_stats = upload["job"], upload["stats"]
+        if load_job.error_result or load_job.errors:
+            logger.error(f"Load job for chunk {chunk_stats['chunk']} failed: {load_job.errors or load_job.error_result}")
+            failures.append(f"chunk {chunk_stats['chunk']} ({load_job.job_id}): {load_job.error_result}")
+            chunk_stats["rows_loaded"] = 0
+            continue
+        chunk_stats["rows_loaded"] = load_job.output_rows or chunk_stats["records"]
+        logger.info(f"Chunk {chunk_stats['chunk']}: loaded {chunk_stats['rows_loaded']} records")
+    
+    if failures:
+        raise Exception(f"Load job failed: {'; '.join(failures)}")
+    
+    logger.info(f"Successfully loaded {sum(upload['stats']['rows_loaded'] for upload in uploads)} records")
+    return [upload["stats"] for upload in uploads]
+
+
+def insert_records(client: bigquery.Client, record_files: List[Dict]) -> Dict:
+    """
+    Append the fetched records to the BigQuery table (used with delete_existing_data).
+    
+    Benefits of batch loads over streaming inserts:
     - No streaming buffer (DELETE works immediately)
     - Free (no insertion costs)
-    - Atomic (all or nothing)
+    - Atomic per load chunk (a single chunk unless the data exceeds LOAD_CHUNK_BYTES)
     
-    Returns the number of records inserted.
+    Returns {"rows_inserted", "load_chunks"}.
     """
-    import json as json_module
-    
-    if not records:
+    if not any(record_file["records"] for record_file in record_files):
         logger.info("No records to insert")
-        return 0
+        return {"rows_inserted": 0, "load_chunks": []}
     
     # Ensure table exists
     ensure_table_exists(client)
     
-    # Prepare rows for insertion
-    rows_to_insert = list(records)
+    job_config = bigquery.LoadJobConfig(
+        write_disposition=bigquery.WriteDisposition.WRITE_APPEND,
+    )
+    load_chunks = load_record_files(client, record_files, BIGQUERY_TABLE, job_config)
+    return {
+        "rows_inserted": sum(chunk["rows_loaded"] for chunk in load_chunks),
+        "load_chunks": load_chunks
+    }
+
+
+def replace_partitions(
+    client: bigquery.Client,
+    record_files: List[Dict],
+    platform_stats: Dict,
+    start_date: str,
+    end_date: str
+) -> Dict:
+    """
+    Replace the date partitions of the fetched days without DML.
     
-    logger.info(f"Loading {len(rows_to_insert)} records using batch load job...")
+    All records are loaded into a temporary staging table partitioned like the
+    main table. Each day is then swapped in with a WRITE_TRUNCATE copy job from
+    staging$YYYYMMDD to table$YYYYMMDD, which replaces that partition atomically.
+    The swap is atomic per day, not per run: the table never misses data for a day,
+    a failed load leaves it unchanged, and if some copy jobs fail the other days
+    stay replaced (and are recorded in the manifest) before the error is raised.
     
-    # Convert records to newline-delimited JSON
-    ndjson_data = "\n".join(json_module.dumps(row) for row in rows_to_insert)
+    A day is only replaced if every platform fetched it successfully and it has
+    records; otherwise its existing partition is kept (as are days whose reports
+    are all unchanged according to the report manifest). The ETags of the reports
+    of replaced days are recorded in the manifest.
     
-    # Create a file-like object from the JSON data
-    json_bytes = ndjson_data.encode("utf-8")
-    json_file = io.BytesIO(json_bytes)
+    Returns {"rows_inserted", "partitions_replaced", "partitions_skipped", "load_chunks"}.
+    """
+    failed_days = {day for stats in platform_stats.values() for day in stats.get("failed_days", [])}
+    unchanged_days = set.intersection(*(set(stats.get("unchanged_days", [])) for stats in platform_stats.values()))
+    records_per_day = {}
+    for record_file in record_files:
+        records_per_day[record_file["date"]] = records_per_day.get(record_file["date"], 0) + record_file["records"]
     
-    # Configure the load job
-    table_parts = BIGQUERY_TABLE.split(".")
-    table_ref = client.dataset(table_parts[1], project=table_parts[0]).table(table_parts[2])
+    days_to_replace = []
+    partitions_skipped = {}
+    for date_str in iter_dates(start_date, end_date):
+        if date_str in failed_days:
+            partitions_skipped[date_str] = "fetch failed"
+        elif date_str in unchanged_days:
+            partitions_skipped[date_str] = "unchanged"
+        elif not records_per_day.get(date_str):
+            partitions_skipped[date_str] = "no records"
+        else:
+            days_to_replace.append(date_str)
     
-    job_config = bigquery.LoadJobConfig(
-        source_format=bigquery.SourceFormat.NEWLINE_DELIMITED_JSON,
-        write_disposition=bigquery.WriteDisposition.WRITE_APPEND,
-    )
+    for date_str, reason in partitions_skipped.items():
+        logger.warning(f"Keeping existing partition for {date_str} ({reason})")
     
-    # Load data from the in-memory file
-    load_job = client.load_table_from_file(
-        json_file,
-        table_ref,
-        job_config=job_config
+    result = {"rows_inserted": 0, "partitions_replaced": [], "partitions_skipped": partitions_skipped, "load_chunks": []}
+    if not days_to_replace:
+        logger.info("No partitions to replace")
+        return result
+    
+    # Ensure table exists (partitioned on date, required for partition decorators)
+    ensure_table_exists(client)
+    
+    # Create the staging table up front so load chunks can append to it in parallel
+    staging_table = bigquery.Table(
+        f"{BIGQUERY_TABLE}_staging_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}_{os.getpid()}",
+        schema=TABLE_SCHEMA
+    )
+    staging_table.time_partitioning = bigquery.TimePartitioning(
+        type_=bigquery.TimePartitioningType.DAY,
+        field="date"
     )
+    # Expires on its own if the run dies before deleting it
+    staging_table.expires = datetime.utcnow() + timedelta(days=1)
+    staging_table = client.create_table(staging_table)
+    staging_table_id = f"{staging_table.project}.{staging_table.dataset_id}.{staging_table.table_id}"
+    
+    try:
+        result["load_chunks"] = load_record_files(
+            client,
+            [record_file for record_file in record_files if record_file["date"] in days_to_replace],
+            staging_table_id,
+            bigquery.LoadJobConfig(write_disposition=bigquery.WriteDisposition.WRITE_APPEND)
+        )
+        
+        # Swap each day in; the copy jobs run concurrently in BigQuery
+        copy_config = bigquery.CopyJobConfig(write_disposition=bigquery.WriteDisposition.WRITE_TRUNCATE)
+        copy_jobs = {}
+        for date_str in days_to_replace:
+            partition = date_str.replace("-", "")
+            copy_jobs[date_str] = client.copy_table(
+                f"{staging_table_id}${partition}",
+                f"{BIGQUERY_TABLE}${partition}",
+                job_config=copy_config
+            )
+        
+        # Wait for every copy job: days already swapped in stay replaced even if others fail
+        copy_errors = {}
+        for date_str, copy_job in copy_jobs.items():
+            try:
+                copy_job.result()
+            except Exception as e:
+                logger.error(f"Failed to replace partition {date_str} (job_id: {copy_job.job_id}): {e}")
+                copy_errors[date_str] = str(e)
+                continue
+            logger.info(f"Replaced partition {date_str} ({records_per_day[date_str]} records, job_id: {copy_job.job_id})")
+            result["partitions_replaced"].append(date_str)
+            result["rows_inserted"] += records_per_day[date_str]
+    finally:
+        client.delete_table(staging_table_id, not_found_ok=True)
+    
+    if MANIFEST_ENABLED:
+        record_report_manifest(client, record_files, result["partitions_replaced"])
+    
+    if copy_errors:
+        raise RuntimeError(
+            f"Failed to replace {len(copy_errors)} of {len(copy_jobs)} partitions "
+            f"({', '.join(sorted(copy_errors))}); the other days were replaced: {next(iter(copy_errors.values()))}"
+        )
+    
+    return result
+
+
+def collect_range(
+    api_key: str,
+    bq_client: bigquery.Client,
+    start_date: str,
+    end_date: str,
+    skip_delete: bool = False,
+    force: bool = False
+) -> Dict:
+    """
+    Fetch and load a custom date range (used by /backfill and backfill jobs).
     
-    # Wait for the job to complete
-    logger.info(f"Load job started: {load_job.job_id}")
-    load_job.result()  # Waits for job to complete
+    With skip_delete the records are appended; otherwise the range is replaced
+    according to LOAD_MODE.
     
-    # Check for errors
-    if load_job.errors:
-        logger.error(f"Load job completed with errors: {load_job.errors}")
-        raise Exception(f"Load job failed: {load_job.errors}")
+    Returns the load summary, including "reports" ({"platform", "date", "records"}
+    for every report with data).
+    """
+    # Ensure table exists
+    ensure_table_exists(bq_client)
     
-    logger.info(f"Successfully loaded {load_job.output_rows} records")
-    return load_job.output_rows or len(rows_to_insert)
+    # Delete existing data (unless skipped, or replaced by partition swap after fetching)
+    rows_deleted = 0
+    if skip_delete:
+        logger.info("Skipping delete (skip_delete=true), records are appended")
+    elif LOAD_MODE == "delete_insert":
+        logger.info(f"Deleting existing data for {start_date} to {end_date}")
+        rows_deleted = delete_existing_data(bq_client, start_date, end_date)
+    
+    # Fetch data from MAX API for both platforms, all days concurrently
+    logger.info(f"Fetching {', '.join(p['name'].upper() for p in PLATFORMS)} data for {start_date} to {end_date}")
+    manifest = {}
+    if MANIFEST_ENABLED and LOAD_MODE != "delete_insert" and not (force or skip_delete):
+        manifest = load_report_manifest(bq_client, start_date, end_date)
+    with tempfile.TemporaryDirectory(prefix="max-revenue-") as output_dir:
+        record_files, platform_stats = fetch_all_platforms(api_key, start_date, end_date, output_dir, manifest)
+        
+        # Insert records into BigQuery
+        if skip_delete or LOAD_MODE == "delete_insert":
+            load_result = insert_records(bq_client, record_files)
+        else:
+            load_result = replace_partitions(bq_client, record_files, platform_stats, start_date, end_date)
+    
+    return {
+        "load_mode": "append" if skip_delete else LOAD_MODE,
+        "rows_deleted": rows_deleted,
+        "rows_inserted": load_result["rows_inserted"],
+        "partitions_replaced": load_result.get("partitions_replaced"),
+        "partitions_skipped": load_result.get("partitions_skipped"),
+        "load_chunks": load_result["load_chunks"],
+        "total_records_fetched": sum(record_file["records"] for record_file in record_files),
+        "platform_stats": platform_stats,
+        "reports": [
+            {"platform": record_file["platform"], "date": record_file["date"], "records": record_file["records"]}
+            for record_file in record_files
+        ]
+    }
 
 
-def run_collection() -> Dict:
+def run_collection(force: bool = False) -> Dict:
     """
     Main collection process:
-    1. Delete data from last 2 days
+    1. Delete data from last 2 days (LOAD_MODE=delete_insert only)
     2. Fetch iOS data for last 2 days
     3. Fetch Android data for last 2 days
-    4. Insert all records into BigQuery
+    4. Replace the fetched days' partitions (or append, with delete_insert)
+    
+    With partition_swap, reports unchanged since the last load (per the report
+    manifest) are skipped unless force is True.
     
     Returns a summary of the operation.
     """
@@ -511,47 +1113,35 @@ def run_collection() -> Dict:
         start_date, end_date = get_date_range()
         logger.info(f"Date range: {start_date} to {end_date}")
         
-        # Step 1: Delete existing data for the date range
-        logger.info("-" * 40)
-        logger.info("Step 1: Deleting existing data")
-        logger.info("-" * 40)
-        rows_deleted = delete_existing_data(bq_client, start_date, end_date)
-        
-        # Step 2 & 3: Fetch data from MAX API for both platforms
-        all_records = []
-        platform_stats = {}
-        
-        for platform_config in PLATFORMS:
-            platform_name = platform_config["name"]
+        # Step 1: Delete existing data for the date range (partition_swap replaces
+        # the partitions after fetching instead)
+        rows_deleted = 0
+        if LOAD_MODE == "delete_insert":
             logger.info("-" * 40)
-            logger.info(f"Step: Fetching {platform_name.upper()} data")
+            logger.info("Step 1: Deleting existing data")
             logger.info("-" * 40)
-            
-            try:
-                records = fetch_max_api_data(
-                    api_key=api_key,
-                    platform_config=platform_config,
-                    start_date=start_date,
-                    end_date=end_date
-                )
-                all_records.extend(records)
-                platform_stats[platform_name] = {
-                    "records_fetched": len(records),
-                    "status": "success"
-                }
-            except Exception as e:
-                logger.error(f"Failed to fetch {platform_name} data: {e}")
-                platform_stats[platform_name] = {
-                    "records_fetched": 0,
-                    "status": "error",
-                    "error": str(e)
-                }
-        
-        # Step 4: Insert records into BigQuery
+            rows_deleted = delete_existing_data(bq_client, start_date, end_date)
+        
+        # Step 2 & 3: Fetch data from MAX API for both platforms, all days concurrently
         logger.info("-" * 40)
-        logger.info("Step 4: Inserting records into BigQuery")
+        logger.info("Step 2 & 3: Fetching IOS and ANDROID data")
         logger.info("-" * 40)
-        rows_inserted = insert_records(bq_client, all_records)
+        manifest = {}
+        if MANIFEST_ENABLED and LOAD_MODE != "delete_insert" and not force:
+            manifest = load_report_manifest(bq_client, start_date, end_date)
+        with tempfile.TemporaryDirectory(prefix="max-revenue-") as output_dir:
+            record_files, platform_stats = fetch_all_platforms(api_key, start_date, end_date, output_dir, manifest)
+            total_records_fetched = sum(record_file["records"] for record_file in record_files)
+            
+            # Step 4: Insert records into BigQuery
+            logger.info("-" * 40)
+            logger.info(f"Step 4: Inserting records into BigQuery ({LOAD_MODE})")
+            logger.info("-" * 40)
+            if LOAD_MODE == "delete_insert":
+                load_result = insert_records(bq_client, record_files)
+            else:
+                load_result = replace_partitions(bq_client, record_files, platform_stats, start_date, end_date)
+            rows_inserted = load_result["rows_inserted"]
         
         # Calculate duration
         end_time = datetime.utcnow()
@@ -565,9 +1155,13 @@ def run_collection() -> Dict:
                 "start": start_date,
                 "end": end_date
             },
+            "load_mode": LOAD_MODE,
             "rows_deleted": rows_deleted,
             "rows_inserted": rows_inserted,
-            "total_records_fetched": len(all_records),
+            "partitions_replaced": load_result.get("partitions_replaced"),
+            "partitions_skipped": load_result.get("partitions_skipped"),
+            "load_chunks": load_result["load_chunks"],
+            "total_records_fetched": total_records_fetched,
             "platform_stats": platform_stats,
             "duration_seconds": duration_seconds
         }
@@ -600,6 +1194,255 @@ def run_collection() -> Dict:
         return error_result
 
 
+# Backfill jobs
+#
+# A backfill job covers a date range. Its status is persisted in BACKFILL_JOBS_TABLE
+# as append-only rows (one job-level row per status change, with platform and date
+# NULL, and one row per (platform, day) whenever that day's status changes); the
+# latest row wins. A background worker loads the days that are not done yet in
+# batches of BACKFILL_BATCH_DAYS, so a restarted or cancelled job resumes where it
+# stopped without reloading days that are already loaded.
+
+# Cancel flags of the backfill workers running in this instance, by job_id
+_backfill_workers: Dict[str, threading.Event] = {}
+_backfill_workers_lock = threading.Lock()
+
+
+def write_backfill_status(client: bigquery.Client, job_id: str, rows: List[Dict]):
+    """
+    Append status rows for a backfill job (a load job, no DML). Rows without
+    platform/date are job-level statuses.
+    """
+    updated_at = datetime.utcnow().isoformat()
+    rows = [{"job_id": job_id, "updated_at": updated_at, **row} for row in rows]
+    job_config = bigquery.LoadJobConfig(
+        schema=BACKFILL_JOBS_SCHEMA,
+        write_disposition=bigquery.WriteDisposition.WRITE_APPEND,
+        source_format=bigquery.SourceFormat.NEWLINE_DELIMITED_JSON
+    )
+    client.load_table_from_json(rows, BACKFILL_JOBS_TABLE, job_config=job_config).result()
+
+
+def read_backfill_job(client: bigquery.Client, job_id: str) -> Optional[Dict]:
+    """
+    Read the latest status of a backfill job and of each of its (platform, day) reports.
+    
+    Returns {"job": job row, "days": {(platform, date): row}}, or None if the job does not exist.
+    """
+    query = f"""
+    SELECT job_id, platform, CAST(date AS STRING) AS date, status, records, error,
+           CAST(start_date AS STRING) AS start_date, CAST(end_date AS STRING) AS end_date,
+           options, updated_at
+    FROM `{BACKFILL_JOBS_TABLE}`
+    WHERE job_id = @job_id
+    QUALIFY ROW_NUMBER() OVER (PARTITION BY platform, date ORDER BY updated_at DESC) = 1
+    """
+    job_config = bigquery.QueryJobConfig(
+        query_parameters=[bigquery.ScalarQueryParameter("job_id", "STRING", job_id)]
+    )
+    try:
+        rows = [dict(row.items()) for row in client.query(query, job_config=job_config).result()]
+    except NotFound:
+        return None
+    
+    job = next((row for row in rows if row["platform"] is None), None)
+    if job is None:
+        return None
+    
+    # Range and options are only set on the row that created the job
+    created = client.query(
+        f"SELECT CAST(start_date AS STRING) AS start_date, CAST(end_date AS STRING) AS end_date, options "
+        f"FROM `{BACKFILL_JOBS_TABLE}` WHERE job_id = @job_id AND status = 'created' LIMIT 1",
+        job_config=job_config
+    ).result()
+    for row in created:
+        job.update(start_date=row.start_date, end_date=row.end_date, options=json.loads(row.options or "{}"))
+    
+    days = {(row["platform"], row["date"]): row for row in rows if row["platform"] is not None}
+    return {"job": job, "days": days}
+
+
+def create_backfill_job(
+    client: bigquery.Client,
+    start_date: str,
+    end_date: str,
+    skip_delete: bool = False,
+    force: bool = False
+) -> str:
+    """Persist a new backfill job with every (platform, day) pending. Returns the job_id."""
+    job_id = uuid.uuid4().hex[:16]
+    rows = [{
+        "status": "created",
+        "start_date": start_date,
+        "end_date": end_date,
+        "options": json.dumps({"skip_delete": skip_delete, "force": force})
+    }]
+    rows.extend(
+        {"platform": platform_config["name"], "date": date_str, "status": "pending"}
+        for date_str in iter_dates(start_date, end_date)
+        for platform_config in PLATFORMS
+    )
+    write_backfill_status(client, job_id, rows)
+    logger.info(f"Created backfill job {job_id} for {start_date} to {end_date}")
+    return job_id
+
+
+def group_backfill_batches(dates: List[str], batch_days: int) -> List[List[str]]:
+    """Split sorted dates into runs of consecutive days, each at most batch_days long."""
+    batches = []
+    for date_str in dates:
+        if batches and len(batches[-1]) < batch_days:
+            previous = datetime.strptime(batches[-1][-1], "%Y-%m-%d")
+            if datetime.strptime(date_str, "%Y-%m-%d") - previous == timedelta(days=1):
+                batches[-1].append(date_str)
+                continue
+        batches.append([date_str])
+    return batches
+
+
+def backfill_day_statuses(collect_result: Dict, dates: List[str]) -> List[Dict]:
+    """Derive the status of every (platform, day) of a loaded batch from its collect_range result."""
+    records = {(report["platform"], report["date"]): report["records"] for report in collect_result["reports"]}
+    replaced = set(collect_result["partitions_replaced"] or [])
+    skipped = collect_result["partitions_skipped"] or {}
+    partition_swap = collect_result["partitions_replaced"] is not None
+    
+    rows = []
+    for date_str in dates:
+        for platform_config in PLATFORMS:
+            platform_name = platform_config["name"]
+            stats = collect_result["platform_stats"][platform_name]
+            row = {"platform": platform_name, "date": date_str, "records": records.get((platform_name, date_str), 0)}
+            if date_str in stats.get("failed_days", []):
+                row.update(status="failed", error=stats.get("error"))
+            elif not partition_swap or date_str in replaced:
+                row["status"] = "done" if row["records"] else "no_data"
+            elif skipped.get(date_str) == "unchanged":
+                row["status"] = "unchanged"
+            elif skipped.get(date_str) == "no records":
+                row["status"] = "no_data"
+            else:
+                row.update(status="failed", error=f"Partition not replaced: {skipped.get(date_str, 'unknown')}")
+            rows.append(row)
+    return rows
+
+
+def run_backfill_job(job_id: str, cancel_event: threading.Event):
+    """
+    Background worker: load every day of the job that is not done yet, batch by batch,
+    persisting each day's status after its batch. Stops between batches when cancelled.
+    """
+    bq_client = get_bigquery_client()
+    try:
+        state = read_backfill_job(bq_client, job_id)
+        options = state["job"]["options"]
+        pending_dates = sorted({
+            date_str for (platform_name, date_str), row in state["days"].items()
+            if row["status"] not in BACKFILL_DONE_STATUSES
+        })
+        batches = group_backfill_batches(pending_dates, BACKFILL_BATCH_DAYS)
+        logger.info(f"Backfill job {job_id}: {len(pending_dates)} days to load in {len(batches)} batches")
+        write_backfill_status(bq_client, job_id, [{"status": "running"}])
+        
+        api_key = get_api_key()
+        failed_days = 0
+        for batch in batches:
+            if cancel_event.is_set():
+                logger.info(f"Backfill job {job_id} cancelled")
+                write_backfill_status(bq_client, job_id, [{"status": "cancelled"}])
+                return
+            
+            logger.info(f"Backfill job {job_id}: loading {batch[0]} to {batch[-1]}")
+            try:
+                collect_result = collect_range(
+                    api_key, bq_client, batch[0], batch[-1],
+                    skip_delete=options.get("skip_delete", False),
+                    force=options.get("force", False)
+                )
+                rows = backfill_day_statuses(collect_result, batch)
+            except Exception as e:
+                logger.exception(f"Backfill job {job_id}: batch {batch[0]} to {batch[-1]} failed: {e}")
+                rows = [
+                    {"platform": platform_config["name"], "date": date_str, "status": "failed", "error": str(e)}
+                    for date_str in batch
+                    for platform_config in PLATFORMS
+                ]
+            failed_days += len({row["date"] for row in rows if row["status"] == "failed"})
+            write_backfill_status(bq_client, job_id, rows)
+        
+        status = "failed" if failed_days else "completed"
+        logger.info(f"Backfill job {job_id} {status} ({failed_days} days failed)")
+        write_backfill_status(bq_client, job_id, [{"status": status}])
+        
+    except Exception as e:
+        logger.exception(f"Backfill job {job_id} failed: {e}")
+        try:
+            write_backfill_status(bq_client, job_id, [{"status": "failed", "error": str(e)}])
+        except Exception:
+            logger.exception(f"Failed to record failure of backfill job {job_id}")
+    finally:
+        with _backfill_workers_lock:
+            _backfill_workers.pop(job_id, None)
+
+
+def start_backfill_worker(job_id: str) -> bool:
+    """Start a background worker for the job. Returns False if one is already running in this instance."""
+    with _backfill_workers_lock:
+        if job_id in _backfill_workers:
+            return False
+        cancel_event = threading.Event()
+        _backfill_workers[job_id] = cancel_event
+    
+    threading.Thread(
+        target=run_backfill_job,
+        args=(job_id, cancel_event),
+        name=f"backfill-{job_id}",
+        daemon=True
+    ).start()
+    return True
+
+
+def summarize_backfill_job(job_id: str, state: Dict) -> Dict:
+    """Build the status response of a backfill job."""
+    job = state["job"]
+    days = state["days"]
+    status_counts = {}
+    for row in days.values():
+        status_counts[row["status"]] = status_counts.get(row["status"], 0) + 1
+    
+    with _backfill_workers_lock:
+        running_here = job_id in _backfill_workers
+    
+    # Workers are threads of the single service instance: an active job without one
+    # lost its worker when the instance was replaced and only continues when resumed
+    status = job["status"]
+    error = job.get("error")
+    if status in BACKFILL_ACTIVE_STATUSES and not running_here:
+        status = "interrupted"
+        error = error or f"No worker is running for this job (last status: {job['status']}); resume it to continue"
+    
+    return {
+        "job_id": job_id,
+        "status": status,
+        "error": error,
+        "updated_at": job["updated_at"].isoformat() if job.get("updated_at") else None,
+        "date_range": {
+            "start": job.get("start_date"),
+            "end": job.get("end_date")
+        },
+        "options": job.get("options"),
+        "worker_running": running_here,
+        "reports": len(days),
+        "status_counts": status_counts,
+        "records_loaded": sum(row["records"] or 0 for row in days.values()),
+        "failed": [
+            {"platform": platform_name, "date": date_str, "error": row["error"]}
+            for (platform_name, date_str), row in sorted(days.items())
+            if row["status"] == "failed"
+        ]
+    }
+
+
 # Flask routes
 
 @app.route("/", methods=["GET", "POST"])
@@ -607,11 +1450,14 @@ def handle_request():
     """
     Main endpoint for Cloud Scheduler.
     Accepts both GET (for testing) and POST (from Cloud Scheduler).
+    
+    Query parameters:
+    - force: If 'true', reload every report even if unchanged (optional, default: false)
     """
     logger.info(f"Received {request.method} request")
     
     try:
-        result = run_collection()
+        result = run_collection(force=request.args.get('force', 'false').lower() == 'true')
         
         if result.get("status") == "success":
             return jsonify(result), 200
@@ -634,31 +1480,16 @@ def health_check():
     return jsonify({"status": "healthy"}), 200
 
 
-@app.route("/backfill", methods=["GET", "POST"])
-def backfill():
+def validate_date_range(start_date: Optional[str], end_date: Optional[str], usage: str):
     """
-    Backfill endpoint for running collection on custom date ranges.
-    
-    Query parameters:
-    - start_date: Start date in YYYY-MM-DD format (required)
-    - end_date: End date in YYYY-MM-DD format (required)
-    - skip_delete: If 'true', skip deleting existing data (optional, default: false)
-    
-    Example: /backfill?start_date=2026-01-05&end_date=2026-01-10
+    Validate the start_date/end_date query parameters of a backfill request.
+    Returns a (response, status) error tuple, or None if the range is valid.
     """
-    logger.info(f"Received backfill request: {request.method}")
-    
-    # Get date parameters
-    start_date = request.args.get('start_date')
-    end_date = request.args.get('end_date')
-    skip_delete = request.args.get('skip_delete', 'false').lower() == 'true'
-    
-    # Validate parameters
     if not start_date or not end_date:
         return jsonify({
             "status": "error",
             "error": "Missing required parameters: start_date and end_date",
-            "usage": "/backfill?start_date=YYYY-MM-DD&end_date=YYYY-MM-DD"
+            "usage": f"{usage}?start_date=YYYY-MM-DD&end_date=YYYY-MM-DD"
         }), 400
     
     # Validate date format
@@ -680,6 +1511,36 @@ def backfill():
             "error": "start_date must be before or equal to end_date"
         }), 400
     
+    return None
+
+
+@app.route("/backfill", methods=["GET", "POST"])
+def backfill():
+    """
+    Backfill endpoint for running collection on custom date ranges.
+    Runs the whole range inside the request; use /backfill/jobs for long ranges.
+    
+    Query parameters:
+    - start_date: Start date in YYYY-MM-DD format (required)
+    - end_date: End date in YYYY-MM-DD format (required)
+    - skip_delete: If 'true', append without deleting or replacing existing data (optional, default: false)
+    - force: If 'true', reload every report even if unchanged (optional, default: false)
+    
+    Example: /backfill?start_date=2026-01-05&end_date=2026-01-10
+    """
+    logger.info(f"Received backfill request: {request.method}")
+    
+    # Get date parameters
+    start_date = request.args.get('start_date')
+    end_date = request.args.get('end_date')
+    skip_delete = request.args.get('skip_delete', 'false').lower() == 'true'
+    force = request.args.get('force', 'false').lower() == 'true'
+    
+    # Validate parameters
+    error_response = validate_date_range(start_date, end_date, "/backfill")
+    if error_response:
+        return error_response
+    
     logger.info(f"Backfill date range: {start_date} to {end_date}")
     
     start_time = datetime.utcnow()
@@ -691,47 +1552,8 @@ def backfill():
         # Get BigQuery client
         bq_client = get_bigquery_client()
         
-        # Ensure table exists
-        ensure_table_exists(bq_client)
-        
-        # Delete existing data (unless skipped)
-        rows_deleted = 0
-        if not skip_delete:
-            logger.info(f"Deleting existing data for {start_date} to {end_date}")
-            rows_deleted = delete_existing_data(bq_client, start_date, end_date)
-        else:
-            logger.info("Skipping delete (skip_delete=true)")
-        
-        # Fetch data from MAX API for both platforms
-        all_records = []
-        platform_stats = {}
-        
-        for platform_config in PLATFORMS:
-            platform_name = platform_config["name"]
-            logger.info(f"Fetching {platform_name.upper()} data for backfill")
-            
-            try:
-                records = fetch_max_api_data(
-                    api_key=api_key,
-                    platform_config=platform_config,
-                    start_date=start_date,
-                    end_date=end_date
-                )
-                all_records.extend(records)
-                platform_stats[platform_name] = {
-                    "records_fetched": len(records),
-                    "status": "success"
-                }
-            except Exception as e:
-                logger.error(f"Failed to fetch {platform_name} data: {e}")
-                platform_stats[platform_name] = {
-                    "records_fetched": 0,
-                    "status": "error",
-                    "error": str(e)
-                }
-        
-        # Insert records into BigQuery
-        rows_inserted = insert_records(bq_client, all_records)
+        collect_result = collect_range(api_key, bq_client, start_date, end_date, skip_delete=skip_delete, force=force)
+        collect_result.pop("reports")
         
         # Calculate duration
         end_time = datetime.utcnow()
@@ -745,14 +1567,11 @@ def backfill():
                 "start": start_date,
                 "end": end_date
             },
-            "rows_deleted": rows_deleted,
-            "rows_inserted": rows_inserted,
-            "total_records_fetched": len(all_records),
-            "platform_stats": platform_stats,
+            **collect_result,
             "duration_seconds": duration_seconds
         }
         
-        logger.info(f"Backfill completed: {rows_inserted} rows inserted")
+        logger.info(f"Backfill completed: {collect_result['rows_inserted']} rows inserted")
         return jsonify(result), 200
         
     except Exception as e:
@@ -769,6 +1588,118 @@ def backfill():
         }), 500
 
 
+@app.route("/backfill/jobs", methods=["POST"])
+def start_backfill_job():
+    """
+    Start a resumable backfill job that runs in a background worker.
+    
+    Query parameters: start_date, end_date and force, as for /backfill. skip_delete is
+    rejected: appended batches are loaded again on resume, so they could be duplicated.
+    
+    Returns 202 with the job_id. Progress is persisted per (platform, day) in
+    BACKFILL_JOBS_TABLE; poll GET /backfill/jobs/<job_id>.
+    
+    Example: POST /backfill/jobs?start_date=2025-10-01&end_date=2025-12-31
+    """
+    start_date = request.args.get('start_date')
+    end_date = request.args.get('end_date')
+    skip_delete = request.args.get('skip_delete', 'false').lower() == 'true'
+    force = request.args.get('force', 'false').lower() == 'true'
+    
+    error_response = validate_date_range(start_date, end_date, "/backfill/jobs")
+    if error_response:
+        return error_response
+    if skip_delete:
+        # A day's status is saved after its batch loads, so a batch appended just before the
+        # instance dies would be appended again on resume
+        return jsonify({
+            "status": "error",
+            "error": "skip_delete is not supported for backfill jobs, use /backfill?skip_delete=true"
+        }), 400
+    
+    try:
+        bq_client = get_bigquery_client()
+        job_id = create_backfill_job(bq_client, start_date, end_date, force=force)
+        start_backfill_worker(job_id)
+        return jsonify({
+            "status": "accepted",
+            "job_id": job_id,
+            "date_range": {
+                "start": start_date,
+                "end": end_date
+            },
+            "days": len(iter_dates(start_date, end_date)),
+            "status_url": f"/backfill/jobs/{job_id}"
+        }), 202
+    except Exception as e:
+        logger.exception(f"Failed to start backfill job: {e}")
+        return jsonify({
+            "status": "error",
+            "error": str(e),
+            "error_type": type(e).__name__
+        }), 500
+
+
+@app.route("/backfill/jobs/<job_id>", methods=["GET"])
+def backfill_job_status(job_id: str):
+    """Report the status of a backfill job and of each of its (platform, day) reports."""
+    try:
+        state = read_backfill_job(get_bigquery_client(), job_id)
+    except Exception as e:
+        logger.exception(f"Failed to read backfill job {job_id}: {e}")
+        return jsonify({"status": "error", "error": str(e), "error_type": type(e).__name__}), 500
+    
+    if state is None:
+        return jsonify({"status": "error", "error": f"Backfill job {job_id} not found"}), 404
+    return jsonify(summarize_backfill_job(job_id, state)), 200
+
+
+@app.route("/backfill/jobs/<job_id>/cancel", methods=["POST"])
+def cancel_backfill_job(job_id: str):
+    """
+    Cancel a backfill job. The worker stops after the batch it is loading;
+    days already loaded stay loaded and the job can be resumed later.
+    """
+    try:
+        bq_client = get_bigquery_client()
+        if read_backfill_job(bq_client, job_id) is None:
+            return jsonify({"status": "error", "error": f"Backfill job {job_id} not found"}), 404
+        
+        with _backfill_workers_lock:
+            cancel_event = _backfill_workers.get(job_id)
+        if cancel_event is not None:
+            cancel_event.set()
+            write_backfill_status(bq_client, job_id, [{"status": "cancelling"}])
+            return jsonify({"status": "cancelling", "job_id": job_id}), 202
+        
+        write_backfill_status(bq_client, job_id, [{"status": "cancelled"}])
+        return jsonify({"status": "cancelled", "job_id": job_id}), 200
+    except Exception as e:
+        logger.exception(f"Failed to cancel backfill job {job_id}: {e}")
+        return jsonify({"status": "error", "error": str(e), "error_type": type(e).__name__}), 500
+
+
+@app.route("/backfill/jobs/<job_id>/resume", methods=["POST"])
+def resume_backfill_job(job_id: str):
+    """
+    Resume a backfill job (after a restart, failure or cancel). Only days that are
+    not done yet are fetched and loaded again.
+    """
+    try:
+        state = read_backfill_job(get_bigquery_client(), job_id)
+        if state is None:
+            return jsonify({"status": "error", "error": f"Backfill job {job_id} not found"}), 404
+        if (state["job"].get("options") or {}).get("skip_delete"):
+            # Jobs created with skip_delete appended their batches: resuming could duplicate rows
+            return jsonify({"status": "error", "error": f"Backfill job {job_id} appends records (skip_delete) and cannot be resumed"}), 400
+        if not start_backfill_worker(job_id):
+            return jsonify({"status": "error", "error": f"Backfill job {job_id} is already running"}), 409
+        return jsonify({"status": "accepted", "job_id": job_id, "status_url": f"/backfill/jobs/{job_id}"}), 202
+    except Exception as e:
+        logger.exception(f"Failed to resume backfill job {job_id}: {e}")
+        return jsonify({"status": "error", "error": str(e), "error_type": type(e).__name__}), 500
+
+
 @app.route("/test", methods=["GET"])
 def test_endpoint():
     """
@@ -796,7 +1727,13 @@ def test_endpoint():
                     "start": start_date,
                     "end": end_date
                 },
-                "platforms": [p["name"] for p in PLATFORMS]
+                "platforms": [p["name"] for p in PLATFORMS],
+                "fetch_workers": FETCH_WORKERS,
+                "load_mode": LOAD_MODE,
+                "manifest_table": MANIFEST_TABLE if MANIFEST_ENABLED else None,
+                "backfill_jobs_table": BACKFILL_JOBS_TABLE,
+                "backfill_batch_days": BACKFILL_BATCH_DAYS,
+                "max_api_requests_per_second": MAX_API_REQUESTS_PER_SECOND
             }
         }), 200
         
@@ -5,7 +5,7 @@ import requests
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 from shared.config import get_config, load_events_config
-from shared.slack_client import send_slack_alert
+from shared.slack_client import send_slack_alert, SlackDeliveryQueue
 
 
 # In-memory cache for last alert time per event
@@ -20,6 +20,7 @@ def rt_alerts_tool(request):
     Monitors events from the last 1-2 minutes using Mixpanel Query API
     and sends immediate alerts when thresholds are exceeded.
     """
+    delivery_queue = None
     try:
         config = get_config()
         
@@ -43,6 +44,9 @@ def rt_alerts_tool(request):
         
         alerts_sent = 0
         
+        # Alerts are delivered in the background and merged per channel
+        delivery_queue = SlackDeliveryQueue()
+        
         # Check each event
         for event_config in enabled_events:
             event_name = event_config["name"]
@@ -107,7 +111,8 @@ def rt_alerts_tool(request):
                                 event_name=event_name,
                                 alert_data=alert_data,
                                 channel=channel,
-                                webhook_url=config.get("slack_webhook_url")
+                                webhook_url=config.get("slack_webhook_url"),
+                                delivery_queue=delivery_queue
                             )
                             
                             # Update alert cache
@@ -126,16 +131,24 @@ def rt_alerts_tool(request):
                 # Continue with other events
                 continue
         
+        # Wait for queued alerts to be delivered before the function returns
+        delivery_stats = delivery_queue.close()
+        
         return {
             "status": "success",
             "events_checked": len(enabled_events),
             "alerts_sent": alerts_sent,
+            "alerts_failed": delivery_stats["failed"],
             "timestamp": datetime.utcnow().isoformat()
         }
         
     except Exception as e:
         print(f"Error in rt_alerts_tool: {e}")
         raise
+    finally:
+        # Deliver alerts queued before a failure as well (close() is a no-op when already closed)
+        if delivery_queue is not None:
+            delivery_queue.close()
 
 
 def query_mixpanel_recent_events(
@@ -5,10 +5,25 @@ from google.cloud.exceptions import NotFound
 import google.auth
 from google.auth.transport.requests import Request
 import json
+import uuid
 from datetime import datetime, timedelta, date
 from shared.config import get_config
 
 
+# GDPR deletion tracking table, and the prefix of the per-run staging tables used to apply status updates
+GDPR_TABLE = "yotam-395120.peerplay.personal_data_deletion_tool"
+GDPR_STATUS_STAGING_TABLE_PREFIX = "yotam-395120.peerplay.personal_data_deletion_tool_status_updates"
+
+GDPR_STATUS_UPDATE_SCHEMA = [
+    bigquery.SchemaField("ticket_id", "STRING", mode="REQUIRED"),
+    bigquery.SchemaField("mixpanel_deletion_status", "STRING", mode="NULLABLE"),
+    bigquery.SchemaField("singular_deletion_status", "STRING", mode="NULLABLE"),
+    bigquery.SchemaField("max_mediation_deletion_status", "STRING", mode="NULLABLE"),
+    bigquery.SchemaField("is_request_completed", "BOOLEAN", mode="NULLABLE"),
+    bigquery.SchemaField("last_check_time", "TIMESTAMP", mode="REQUIRED"),
+]
+
+
 def get_bigquery_client():
     """
     Get BigQuery client instance with Drive readonly scope for external tables.
@@ -436,7 +451,7 @@ def ensure_gdpr_table_exists():
         
         # Check if new columns need to be added
         existing_fields = {field.name for field in existing_table.schema}
-        required_fields = {"install_date", "last_activity_date", "max_mediation_deletion_status"}
+        required_fields = {"install_date", "last_activity_date", "max_mediation_deletion_status", "last_check_time"}
         missing_fields = required_fields - existing_fields
         
         if missing_fields:
@@ -449,6 +464,8 @@ def ensure_gdpr_table_exists():
                 new_schema.append(bigquery.SchemaField("last_activity_date", "DATE", mode="NULLABLE"))
             if "max_mediation_deletion_status" not in existing_fields:
                 new_schema.append(bigquery.SchemaField("max_mediation_deletion_status", "STRING", mode="NULLABLE"))
+            if "last_check_time" not in existing_fields:
+                new_schema.append(bigquery.SchemaField("last_check_time", "TIMESTAMP", mode="NULLABLE"))
             
             existing_table.schema = new_schema
             client.update_table(existing_table, ["schema"])
@@ -470,6 +487,7 @@ def ensure_gdpr_table_exists():
             bigquery.SchemaField("install_date", "DATE", mode="NULLABLE"),
             bigquery.SchemaField("last_activity_date", "DATE", mode="NULLABLE"),
             bigquery.SchemaField("inserted_at", "TIMESTAMP", mode="REQUIRED"),
+            bigquery.SchemaField("last_check_time", "TIMESTAMP", mode="NULLABLE"),
         ]
         table = bigquery.Table(table_ref, schema=schema)
         table = client.create_table(table)
@@ -592,6 +610,10 @@ def insert_gdpr_requests(requests: List[Dict]):
     """
     Insert GDPR deletion requests into BigQuery.
     
+    Rows are written with a load job rather than streamed, so they can be
+    updated by DML (status updates) right away instead of after the streaming
+    buffer is flushed.
+    
     Args:
         requests: List of request dictionaries with keys:
             - distinct_id: Game user ID
@@ -686,10 +708,16 @@ def insert_gdpr_requests(requests: List[Dict]):
         rows_to_insert.append(row)
     
     table_ref = client.dataset(dataset_id, project=project_id).table(table_id)
-    errors = client.insert_rows_json(table_ref, rows_to_insert)
-    
-    if errors:
-        raise Exception(f"Error inserting rows: {errors}")
+    job_config = bigquery.LoadJobConfig(
+        schema=client.get_table(table_ref).schema,
+        write_disposition=bigquery.WriteDisposition.WRITE_APPEND,
+        source_format=bigquery.SourceFormat.NEWLINE_DELIMITED_JSON
+    )
+    load_job = client.load_table_from_json(rows_to_insert, table_ref, job_config=job_config)
+    try:
+        load_job.result()
+    except Exception as e:
+        raise Exception(f"Error inserting rows: {load_job.errors or e}")
     
     print(f"Successfully inserted {len(rows_to_insert)} GDPR deletion requests into {project_id}.{dataset_id}.{table_id}")
 
@@ -718,7 +746,8 @@ def get_gdpr_request_by_ticket_id(ticket_id: str) -> Optional[Dict]:
         bigquery_deletion_status,
         game_state_status,
         is_request_completed,
-        slack_message_ts
+        slack_message_ts,
+        last_check_time
     FROM `yotam-395120.peerplay.personal_data_deletion_tool`
     WHERE ticket_id = '{ticket_id}'
     ORDER BY inserted_at DESC
@@ -740,6 +769,7 @@ def get_gdpr_request_by_ticket_id(ticket_id: str) -> Optional[Dict]:
                 "game_state_status": row.game_state_status,
                 "is_request_completed": row.is_request_completed,
                 "slack_message_ts": row.slack_message_ts,
+                "last_check_time": row.last_check_time,
             }
         return None
     except Exception as e:
@@ -777,7 +807,8 @@ def get_gdpr_requests_by_ticket_ids(ticket_ids: List[str]) -> Dict[str, Dict]:
         bigquery_deletion_status,
         game_state_status,
         is_request_completed,
-        slack_message_ts
+        slack_message_ts,
+        last_check_time
     FROM (
         SELECT 
             distinct_id,
@@ -791,6 +822,7 @@ def get_gdpr_requests_by_ticket_ids(ticket_ids: List[str]) -> Dict[str, Dict]:
             game_state_status,
             is_request_completed,
             slack_message_ts,
+            last_check_time,
             ROW_NUMBER() OVER (PARTITION BY ticket_id ORDER BY inserted_at DESC) as rn
         FROM `yotam-395120.peerplay.personal_data_deletion_tool`
         WHERE ticket_id IN ('{ticket_ids_str}')
@@ -814,6 +846,7 @@ def get_gdpr_requests_by_ticket_ids(ticket_ids: List[str]) -> Dict[str, Dict]:
                 "game_state_status": row.game_state_status,
                 "is_request_completed": row.is_request_completed,
                 "slack_message_ts": row.slack_message_ts,
+                "last_check_time": row.last_check_time,
             }
         return records
     except Exception as e:
@@ -831,6 +864,9 @@ def update_gdpr_request_status(
     """
     Update GDPR request status in BigQuery.
     
+    Runs one UPDATE for a single ticket; use apply_gdpr_status_updates to
+    update many tickets at once.
+    
     Args:
         ticket_id: Ticket ID to identify the record
         mixpanel_status: New mixpanel_deletion_status (optional)
@@ -885,3 +921,89 @@ def update_gdpr_request_status(
             print(f"❌ Error updating BigQuery record for ticket {ticket_id}: {e}")
         return False
 
+
+def apply_gdpr_status_updates(updates: List[Dict]) -> int:
+    """
+    Apply many GDPR status updates with a single MERGE.
+    
+    The updates are loaded into a per-run staging table with a load job and
+    merged into the tracking table by ticket_id, instead of running one UPDATE
+    per ticket. Fields that are None keep their current value; last_check_time
+    is set for every updated ticket.
+    
+    Args:
+        updates: List of dictionaries with keys:
+            - ticket_id: Ticket ID to identify the record
+            - mixpanel_status: New mixpanel_deletion_status (optional)
+            - singular_status: New singular_deletion_status (optional)
+            - max_mediation_status: New max_mediation_deletion_status (optional)
+            - is_request_completed: New is_request_completed value (optional)
+            Several updates for the same ticket are combined, later values winning.
+    
+    Returns:
+        Number of tracking table rows updated (0 if nothing to update)
+    
+    Raises:
+        Exception: If the updates could not be loaded or merged (nothing is applied)
+    """
+    # Combine transitions per ticket so that the MERGE source has one row per ticket
+    current_timestamp = datetime.utcnow().isoformat()
+    rows_by_ticket = {}
+    for update in updates:
+        ticket_id = update.get("ticket_id")
+        if not ticket_id:
+            continue
+        row = rows_by_ticket.setdefault(ticket_id, {"ticket_id": ticket_id, "last_check_time": current_timestamp})
+        for field, column in [
+            ("mixpanel_status", "mixpanel_deletion_status"),
+            ("singular_status", "singular_deletion_status"),
+            ("max_mediation_status", "max_mediation_deletion_status"),
+            ("is_request_completed", "is_request_completed"),
+        ]:
+            if update.get(field) is not None:
+                row[column] = update[field]
+    
+    if not rows_by_ticket:
+        return 0
+    
+    client = get_bigquery_client()
+    staging_table = f"{GDPR_STATUS_STAGING_TABLE_PREFIX}_{uuid.uuid4().hex[:12]}"
+    
+    merge_query = f"""
+    MERGE `{GDPR_TABLE}` T
+    USING `{staging_table}` S
+    ON T.ticket_id = S.ticket_id
+    WHEN MATCHED THEN UPDATE SET
+        mixpanel_deletion_status = COALESCE(S.mixpanel_deletion_status, T.mixpanel_deletion_status),
+        singular_deletion_status = COALESCE(S.singular_deletion_status, T.singular_deletion_status),
+        max_mediation_deletion_status = COALESCE(S.max_mediation_deletion_status, T.max_mediation_deletion_status),
+        is_request_completed = COALESCE(S.is_request_completed, T.is_request_completed),
+        last_check_time = S.last_check_time
+    """
+    
+    try:
+        # Expires on its own if the process dies before deleting it
+        table = bigquery.Table(staging_table, schema=GDPR_STATUS_UPDATE_SCHEMA)
+        table.expires = datetime.utcnow() + timedelta(days=1)
+        client.create_table(table)
+        
+        job_config = bigquery.LoadJobConfig(
+            schema=GDPR_STATUS_UPDATE_SCHEMA,
+            write_disposition=bigquery.WriteDisposition.WRITE_APPEND,
+            source_format=bigquery.SourceFormat.NEWLINE_DELIMITED_JSON
+        )
+        client.load_table_from_json(list(rows_by_ticket.values()), staging_table, job_config=job_config).result()
+        
+        query_job = client.query(merge_query)
+        query_job.result()  # Wait for completion
+        rows_updated = query_job.num_dml_affected_rows or 0
+        print(f"✅ Applied status updates for {len(rows_by_ticket)} tickets ({rows_updated} rows updated)")
+        return rows_updated
+    except Exception as e:
+        print(f"❌ Error applying status updates for {len(rows_by_ticket)} tickets: {e}")
+        raise
+    finally:
+        try:
+            client.delete_table(staging_table, not_found_ok=True)
+        except Exception as e:
+            print(f"⚠️  Could not delete staging table {staging_table}: {e}")
@@ -1,17 +1,368 @@
 """Slack webhook client for sending alerts."""
 import os
 import json
+import time
+import threading
 import requests
-from typing import Dict, List, Optional
+from requests.adapters import HTTPAdapter
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime, date
 from shared.config import get_config
 
 
+# Slack rejects messages with more than 50 blocks
+SLACK_MAX_BLOCKS_PER_MESSAGE = 50
+
+# Incoming webhooks are limited to roughly one message per second per channel
+SLACK_WEBHOOK_MIN_INTERVAL_SECONDS = float(os.getenv("SLACK_WEBHOOK_MIN_INTERVAL_SECONDS", "1.0"))
+
+# How long the delivery queue holds the first message for a channel so that
+# other alerts raised in the same run can be merged into one digest
+SLACK_DIGEST_LINGER_SECONDS = float(os.getenv("SLACK_DIGEST_LINGER_SECONDS", "5.0"))
+
+# Local state (channel directory, history cursors) shared across runs of the Slack tools
+SLACK_CACHE_DIR = os.getenv("SLACK_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "slack_client"))
+
+# Channel name -> ID mappings are refreshed after this many seconds
+SLACK_CHANNEL_CACHE_TTL_SECONDS = int(os.getenv("SLACK_CHANNEL_CACHE_TTL_SECONDS", str(24 * 3600)))
+
+_http_session: Optional[requests.Session] = None
+_http_session_lock = threading.Lock()
+
+# Messages newer than (last covered time - lookback) are re-fetched on every
+# incremental read so that reaction changes on recent messages are picked up
+SLACK_HISTORY_LOOKBACK_HOURS = float(os.getenv("SLACK_HISTORY_LOOKBACK_HOURS", "72"))
+
+SLACK_HISTORY_PAGE_SIZE = 200
+
+# In-process copy of the channel directory: {"fetched_at": epoch seconds, "channels": {name: id}}
+_channel_directory: Optional[Dict] = None
+
+# In-process copies of per-channel history caches, keyed by channel ID
+_history_caches: Dict[str, Dict] = {}
+
+
+def get_http_session() -> requests.Session:
+    """
+    Get the process-wide HTTP session used for Slack webhook calls.
+    
+    Reusing one session keeps the TLS connection to hooks.slack.com open
+    between alerts instead of opening a new connection per request.
+    
+    Returns:
+        Shared requests.Session with a pooled HTTPS adapter
+    """
+    global _http_session
+    if _http_session is None:
+        with _http_session_lock:
+            if _http_session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+                session.mount("https://", adapter)
+                _http_session = session
+    return _http_session
+
+
+def _parse_retry_after(value: Optional[str], default: float = 1.0) -> float:
+    """Parse a Retry-After header (seconds) into a sleep duration."""
+    if not value:
+        return default
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        return default
+
+
+def post_webhook_message(
+    webhook: str,
+    message: Dict,
+    timeout: int = 10,
+    max_retries: int = 3
+) -> requests.Response:
+    """
+    POST a message to a Slack incoming webhook over the pooled session.
+    
+    Slack answers 429 with a Retry-After header when a channel is rate
+    limited; the request is retried after the advertised delay.
+    
+    Args:
+        webhook: Slack incoming webhook URL
+        message: Slack message payload
+        timeout: Per-request timeout in seconds
+        max_retries: Number of retries after a 429 response
+    
+    Returns:
+        The successful response
+    
+    Raises:
+        requests.exceptions.RequestException: If the request ultimately fails
+    """
+    session = get_http_session()
+    
+    for attempt in range(max_retries + 1):
+        response = session.post(webhook, json=message, timeout=timeout)
+        if response.status_code == 429 and attempt < max_retries:
+            retry_after = _parse_retry_after(response.headers.get("Retry-After"))
+            print(f"Slack rate limited the webhook, retrying in {retry_after:.1f}s (attempt {attempt + 1}/{max_retries})")
+            time.sleep(retry_after)
+            continue
+        response.raise_for_status()
+        return response
+    
+    # Unreachable: the last attempt either returns or raises
+    response.raise_for_status()
+    return response
+
+
+def merge_slack_messages(messages: List[Dict]) -> List[Dict]:
+    """
+    Merge several Slack messages for the same channel into digest messages.
+    
+    Each message keeps its own blocks, separated by dividers. The digest is
+    split into several messages if it would exceed Slack's block limit.
+    
+    Args:
+        messages: Slack message payloads destined for the same channel
+    
+    Returns:
+        List of one or more digest message payloads
+    """
+    if len(messages) <= 1:
+        return list(messages)
+    
+    header = {
+        "type": "header",
+        "text": {
+            "type": "plain_text",
+            "text": f"📬 Alert digest: {len(messages)} alerts"
+        }
+    }
+    
+    digests = []
+    blocks = [header]
+    texts = []
+    for message in messages:
+        message_blocks = list(message.get("blocks", []))
+        if not message_blocks and message.get("text"):
+            message_blocks = [{"type": "section", "text": {"type": "mrkdwn", "text": message["text"]}}]
+        if message_blocks and message_blocks[-1].get("type") != "divider":
+            message_blocks.append({"type": "divider"})
+        message_blocks = message_blocks[:SLACK_MAX_BLOCKS_PER_MESSAGE]
+        
+        if len(blocks) + len(message_blocks) > SLACK_MAX_BLOCKS_PER_MESSAGE:
+            digests.append({"blocks": blocks, "text": "\n".join(texts)})
+            blocks = []
+            texts = []
+        blocks.extend(message_blocks)
+        if message.get("text"):
+            texts.append(message["text"])
+    
+    if blocks:
+        digests.append({"blocks": blocks, "text": "\n".join(texts)})
+    
+    # Slack requires a non-empty fallback text when it is sent at all
+    for digest in digests:
+        if not digest["text"]:
+            digest["text"] = f"Alert digest: {len(messages)} alerts"
+        if messages[0].get("channel"):
+            digest["channel"] = messages[0]["channel"]
+    
+    return digests
+
+
+class SlackDeliveryQueue:
+    """
+    Asynchronous, per-webhook rate-limited queue for Slack webhook messages.
+    
+    Messages are handed to a background thread so the caller does not wait
+    on Slack. Messages for the same webhook and channel that are queued close
+    together (within the linger window, or before a flush) are merged into a
+    single digest message. Slack rate-limits each webhook URL, so posts through
+    one webhook are at least min_interval_seconds apart whatever their channel. Use as a context manager, or call close() at the end of
+    a run so pending messages are delivered before the process exits.
+    """
+    
+    def __init__(
+        self,
+        min_interval_seconds: float = SLACK_WEBHOOK_MIN_INTERVAL_SECONDS,
+        linger_seconds: float = SLACK_DIGEST_LINGER_SECONDS,
+        timeout: int = 10,
+        max_retries: int = 3
+    ):
+        self.min_interval_seconds = min_interval_seconds
+        self.linger_seconds = linger_seconds
+        self.timeout = timeout
+        self.max_retries = max_retries
+        
+        # Digests are keyed by (webhook, channel): one webhook can post to several channels
+        self._pending: Dict[Tuple[str, Optional[str]], List[Dict]] = {}
+        self._first_queued_at: Dict[Tuple[str, Optional[str]], float] = {}
+        # Pacing is per webhook URL, shared by all of its channels
+        self._next_send_at: Dict[str, float] = {}
+        self._in_flight = 0
+        self._flushing = False
+        self._closed = False
+        self._condition = threading.Condition()
+        
+        self.sent: List[str] = []
+        self.failed: List[str] = []
+        self.errors: List[str] = []
+        
+        self._worker = threading.Thread(target=self._run, name="slack-delivery", daemon=True)
+        self._worker.start()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+    
+    def enqueue(self, webhook: str, message: Dict, label: Optional[str] = None) -> None:
+        """
+        Queue a message for delivery and return immediately.
+        
+        Args:
+            webhook: Slack incoming webhook URL
+            message: Slack message payload
+            label: Name used in delivery stats and logs (e.g., the event name)
+        """
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("SlackDeliveryQueue is closed")
+            key = (webhook, message.get("channel"))
+            if key not in self._pending:
+                self._pending[key] = []
+                self._first_queued_at[key] = time.monotonic()
+            self._pending[key].append({"message": message, "label": label or "slack message"})
+            self._condition.notify_all()
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Deliver everything queued so far without waiting for the linger window.
+        
+        Args:
+            timeout: Maximum seconds to wait (None waits until done)
+        
+        Returns:
+            True if the queue drained, False if the timeout expired first
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            self._flushing = True
+            self._condition.notify_all()
+            try:
+                while self._pending or self._in_flight:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    self._condition.wait(remaining)
+                return True
+            finally:
+                self._flushing = False
+    
+    def close(self, timeout: Optional[float] = None) -> Dict:
+        """
+        Flush pending messages and stop the delivery thread.
+        
+        Args:
+            timeout: Maximum seconds to wait for pending deliveries
+        
+        Returns:
+            Dict with keys: sent, failed, errors
+        """
+        self.flush(timeout)
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._worker.join(timeout)
+        return self.stats()
+    
+    def stats(self) -> Dict:
+        """Return delivery counts for the messages handled so far."""
+        with self._condition:
+            return {
+                "sent": len(self.sent),
+                "failed": len(self.failed),
+                "errors": list(self.errors)
+            }
+    
+    def _ready_key(self, now: float) -> Optional[Tuple[str, Optional[str]]]:
+        for key, first_queued_at in self._first_queued_at.items():
+            if now < self._next_send_at.get(key[0], 0.0):
+                continue
+            if self._flushing or self._closed or now - first_queued_at >= self.linger_seconds:
+                return key
+        return None
+    
+    def _seconds_until_next_ready(self, now: float) -> Optional[float]:
+        wake_times = []
+        for key, first_queued_at in self._first_queued_at.items():
+            ready_at = self._next_send_at.get(key[0], 0.0)
+            if not (self._flushing or self._closed):
+                ready_at = max(ready_at, first_queued_at + self.linger_seconds)
+            wake_times.append(ready_at)
+        if not wake_times:
+            return None
+        return max(min(wake_times) - now, 0.0)
+    
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while True:
+                    now = time.monotonic()
+                    key = self._ready_key(now)
+                    if key:
+                        break
+                    if self._closed and not self._pending:
+                        return
+                    self._condition.wait(self._seconds_until_next_ready(now))
+                
+                entries = self._pending.pop(key)
+                del self._first_queued_at[key]
+                self._in_flight += 1
+            
+            try:
+                self._deliver(key, entries)
+            finally:
+                with self._condition:
+                    self._in_flight -= 1
+                    self._next_send_at[key[0]] = time.monotonic() + self.min_interval_seconds
+                    self._condition.notify_all()
+    
+    def _deliver(self, key: Tuple[str, Optional[str]], entries: List[Dict]) -> None:
+        webhook, channel = key
+        labels = [entry["label"] for entry in entries]
+        digests = merge_slack_messages([entry["message"] for entry in entries])
+        for digest in digests:
+            if channel:
+                digest["channel"] = channel
+        
+        try:
+            for i, digest in enumerate(digests):
+                if i > 0:
+                    time.sleep(self.min_interval_seconds)
+                post_webhook_message(webhook, digest, timeout=self.timeout, max_retries=self.max_retries)
+            
+            with self._condition:
+                self.sent.extend(labels)
+            if len(entries) > 1:
+                print(f"Successfully sent Slack digest with {len(entries)} alerts: {', '.join(labels)}")
+            else:
+                print(f"Successfully sent Slack alert for {labels[0]}")
+        except Exception as e:
+            with self._condition:
+                self.failed.extend(labels)
+                self.errors.append(f"{', '.join(labels)}: {e}")
+            print(f"Error sending Slack alert for {', '.join(labels)}: {e}")
+
+
 def send_slack_alert(
     event_name: str,
     alert_data: List[Dict],
     channel: Optional[str] = None,
-    webhook_url: Optional[str] = None
+    webhook_url: Optional[str] = None,
+    delivery_queue: Optional[SlackDeliveryQueue] = None
 ):
     """
     Send alert to Slack channel.
@@ -21,6 +372,7 @@ def send_slack_alert(
         alert_data: List of dicts with keys: minute_timestamp, event_count, sample_events
         channel: Slack channel to send to (overrides default webhook channel)
         webhook_url: Custom webhook URL (overrides default)
+        delivery_queue: Queue the alert for asynchronous digest delivery instead of posting inline
     """
     config = get_config()
     webhook = webhook_url or config.get("slack_webhook_url")
@@ -32,14 +384,13 @@ def send_slack_alert(
     # Format message
     message = format_slack_message(event_name, alert_data, channel)
     
+    if delivery_queue is not None:
+        delivery_queue.enqueue(webhook, message, label=event_name)
+        return
+    
     # Send to Slack
     try:
-        response = requests.post(
-            webhook,
-            json=message,
-            timeout=10
-        )
-        response.raise_for_status()
+        post_webhook_message(webhook, message)
         print(f"Successfully sent Slack alert for {event_name}")
     except requests.exceptions.RequestException as e:
         print(f"Error sending Slack alert: {e}")
@@ -199,7 +550,8 @@ def send_rt_alert(
     end_time: Optional[datetime] = None,
     aggregation_type: str = "count distinct users",
     total_active_users: Optional[int] = None,
-    percentage: Optional[float] = None
+    percentage: Optional[float] = None,
+    delivery_queue: Optional[SlackDeliveryQueue] = None
 ):
     """
     Send RT alert to Slack channel with custom format.
@@ -216,6 +568,7 @@ def send_rt_alert(
         aggregation_type: Type of aggregation - "count distinct users" or "percentage" (default: "count distinct users")
         total_active_users: Total active users (required for percentage type)
         percentage: Calculated percentage (required for percentage type)
+        delivery_queue: Queue the alert for asynchronous digest delivery instead of posting inline
     """
     # Use provided webhook_url or get channel-specific webhook
     if webhook_url:
@@ -239,14 +592,13 @@ def send_rt_alert(
         percentage=percentage
     )
     
+    if delivery_queue is not None:
+        delivery_queue.enqueue(webhook, message, label=event_name)
+        return
+    
     # Send to Slack
     try:
-        response = requests.post(
-            webhook,
-            json=message,
-            timeout=10
-        )
-        response.raise_for_status()
+        post_webhook_message(webhook, message)
         print(f"Successfully sent RT Slack alert for {event_name} to {channel or 'custom webhook'}")
     except requests.exceptions.RequestException as e:
         print(f"Error sending RT Slack alert: {e}")
@@ -564,37 +916,9 @@ def read_slack_channel_messages(
     # Clean channel name (remove # if present)
     channel_clean = channel_name.lstrip('#')
     
-    # Get channel ID (with pagination support)
+    # Get channel ID from the cached channel directory
     try:
-        channel_id = None
-        cursor = None
-        
-        while True:
-            params = {
-                "types": "public_channel,private_channel",
-                "limit": 1000
-            }
-            if cursor:
-                params["cursor"] = cursor
-            
-            channels_response = client.conversations_list(**params)
-            
-            if not channels_response.get("ok"):
-                error = channels_response.get("error")
-                raise Exception(f"Slack API error: {error}")
-            
-            for channel in channels_response.get("channels", []):
-                if channel.get("name") == channel_clean:
-                    channel_id = channel.get("id")
-                    break
-            
-            if channel_id:
-                break
-            
-            # Check for more pages
-            cursor = channels_response.get("response_metadata", {}).get("next_cursor")
-            if not cursor:
-                break
+        channel_id = resolve_channel_id(channel_clean, client=client)
         
         if not channel_id:
             raise ValueError(f"Channel '{channel_name}' not found. Make sure the bot is invited to the channel.")
@@ -605,6 +929,25 @@ def read_slack_channel_messages(
     start_timestamp = datetime.combine(start_date, datetime.min.time()).timestamp()
     end_timestamp = datetime.combine(end_date, datetime.max.time()).timestamp()
     
+    all_messages = _fetch_channel_history(client, channel_id, start_timestamp, end_timestamp)
+    
+    print(f"Fetched {len(all_messages)} messages from channel {channel_name}")
+    return all_messages
+
+
+def _fetch_channel_history(client, channel_id: str, oldest: float, latest: float) -> List[Dict]:
+    """
+    Fetch all messages in [oldest, latest] from conversations.history.
+    
+    Args:
+        client: slack_sdk WebClient
+        channel_id: Slack channel ID
+        oldest: Start of the window (epoch seconds)
+        latest: End of the window (epoch seconds)
+    
+    Returns:
+        List of message dictionaries, newest first
+    """
     all_messages = []
     cursor = None
     
@@ -613,9 +956,9 @@ def read_slack_channel_messages(
         try:
             params = {
                 "channel": channel_id,
-                "oldest": str(int(start_timestamp)),
-                "latest": str(int(end_timestamp)),
-                "limit": 200
+                "oldest": str(int(oldest)),
+                "latest": str(int(latest)),
+                "limit": SLACK_HISTORY_PAGE_SIZE
             }
             if cursor:
                 params["cursor"] = cursor
@@ -634,7 +977,176 @@ def read_slack_channel_messages(
             print(f"Error fetching messages: {e}")
             raise
     
-    print(f"Fetched {len(all_messages)} messages from channel {channel_name}")
+    return all_messages
+
+
+def _history_cache_path(channel_id: str) -> str:
+    return os.path.join(SLACK_CACHE_DIR, f"history_{channel_id}.json")
+
+
+def _load_history_cache(channel_id: str) -> Dict:
+    """
+    Load the local history cache for a channel.
+    
+    The cache holds the time window already fetched ("oldest_ts",
+    "covered_until") and the message bodies keyed by ts.
+    """
+    if channel_id in _history_caches:
+        return _history_caches[channel_id]
+    
+    cache = {"oldest_ts": None, "covered_until": None, "messages": {}}
+    path = _history_cache_path(channel_id)
+    if os.path.exists(path):
+        try:
+            with open(path, "r") as f:
+                stored = json.load(f)
+            if isinstance(stored.get("messages"), dict):
+                cache = stored
+        except Exception as e:
+            print(f"Warning: Could not read Slack history cache {path}: {e}")
+    
+    _history_caches[channel_id] = cache
+    return cache
+
+
+def _save_history_cache(channel_id: str) -> None:
+    """Persist the history cache for a channel to the local cache file."""
+    cache = _history_caches.get(channel_id)
+    if cache is None:
+        return
+    
+    path = _history_cache_path(channel_id)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        print(f"Warning: Could not write Slack history cache {path}: {e}")
+
+
+def _merge_history_window(cache: Dict, messages: List[Dict], oldest: float, latest: float) -> None:
+    """Replace the cached messages in [oldest, latest] with a fresh fetch."""
+    cached = cache["messages"]
+    for ts in [ts for ts in cached if oldest <= float(ts) <= latest]:
+        del cached[ts]
+    for message in messages:
+        if message.get("ts"):
+            cached[message["ts"]] = message
+
+
+def _update_cached_reaction(channel_id: str, message_timestamp: str, emoji: str, added: bool) -> None:
+    """
+    Mirror a reaction the bot added or removed into the local history cache.
+    
+    Incremental reads only re-fetch recent messages, so reactions changed by
+    this process on older messages must be reflected in the cache directly.
+    """
+    cache = _history_caches.get(channel_id)
+    if cache is None:
+        if not os.path.exists(_history_cache_path(channel_id)):
+            return
+        cache = _load_history_cache(channel_id)
+    
+    message = cache["messages"].get(message_timestamp)
+    if message is None:
+        return
+    
+    reactions = message.setdefault("reactions", [])
+    existing = next((r for r in reactions if r.get("name") == emoji), None)
+    if added and existing is None:
+        reactions.append({"name": emoji, "count": 1})
+    elif not added and existing is not None:
+        reactions.remove(existing)
+    
+    _save_history_cache(channel_id)
+
+
+def read_slack_channel_messages_incremental(
+    channel_name: str,
+    start_date: date,
+    end_date: date,
+    lookback_hours: float = SLACK_HISTORY_LOOKBACK_HOURS,
+    full_refresh: bool = False
+) -> List[Dict]:
+    """
+    Read messages from a Slack channel, fetching only what is not cached yet.
+    
+    Message bodies are cached locally per channel together with the time
+    window already covered. Each call fetches the part of
+    [start_date, end_date] older than the cache, plus everything newer than
+    the last covered time minus lookback_hours, so recent reaction changes
+    and deletions are picked up. Older cached messages are served from disk.
+    
+    Args:
+        channel_name: Name of the channel (with or without #)
+        start_date: Start date for filtering messages (inclusive)
+        end_date: End date for filtering messages (inclusive)
+        lookback_hours: How far before the last covered time to re-fetch
+        full_refresh: Ignore the cache and re-fetch the whole window
+    
+    Returns:
+        List of message dictionaries with keys: text, ts, user, reactions, etc.
+    """
+    try:
+        from slack_sdk import WebClient
+    except ImportError:
+        raise ImportError("slack-sdk is required. Install it with: pip install slack-sdk")
+    
+    bot_token = get_slack_bot_token()
+    if not bot_token:
+        raise ValueError("SLACK_BOT_TOKEN or SLACK_BOT_TOKEN_NAME must be configured")
+    
+    client = WebClient(token=bot_token)
+    
+    try:
+        channel_id = resolve_channel_id(channel_name, client=client)
+        
+        if not channel_id:
+            raise ValueError(f"Channel '{channel_name}' not found. Make sure the bot is invited to the channel.")
+    except Exception as e:
+        raise ValueError(f"Error finding channel '{channel_name}': {e}")
+    
+    start_timestamp = datetime.combine(start_date, datetime.min.time()).timestamp()
+    end_timestamp = min(datetime.combine(end_date, datetime.max.time()).timestamp(), time.time())
+    
+    if full_refresh:
+        _history_caches[channel_id] = {"oldest_ts": None, "covered_until": None, "messages": {}}
+    cache = _load_history_cache(channel_id)
+    
+    # Work out which windows are missing from the cache
+    windows = []
+    if cache["oldest_ts"] is None or cache["covered_until"] is None:
+        windows.append((start_timestamp, end_timestamp))
+    else:
+        if start_timestamp < cache["oldest_ts"]:
+            windows.append((start_timestamp, cache["oldest_ts"]))
+        # Always continue from the covered time (not start_date) so the cached range stays contiguous
+        refresh_from = cache["covered_until"] - lookback_hours * 3600
+        if end_timestamp > refresh_from:
+            windows.append((refresh_from, end_timestamp))
+    
+    fetched_count = 0
+    for oldest, latest in windows:
+        messages = _fetch_channel_history(client, channel_id, oldest, latest)
+        _merge_history_window(cache, messages, oldest, latest)
+        fetched_count += len(messages)
+    
+    if windows:
+        if cache["oldest_ts"] is None or start_timestamp < cache["oldest_ts"]:
+            cache["oldest_ts"] = start_timestamp
+        if cache["covered_until"] is None or end_timestamp > cache["covered_until"]:
+            cache["covered_until"] = end_timestamp
+        _save_history_cache(channel_id)
+    
+    all_messages = [
+        message for ts, message in cache["messages"].items()
+        if start_timestamp <= float(ts) <= end_timestamp
+    ]
+    all_messages.sort(key=lambda m: float(m["ts"]), reverse=True)
+    
+    print(f"Fetched {fetched_count} messages from Slack, {len(all_messages)} messages in range for channel {channel_name}")
     return all_messages
 
 
@@ -674,6 +1186,8 @@ def add_reaction_to_message(
             timestamp=message_timestamp,
             name=emoji_clean
         )
+        if response.get("ok", False):
+            _update_cached_reaction(channel_id, message_timestamp, emoji_clean, added=True)
         return response.get("ok", False)
     except Exception as e:
         print(f"Error adding reaction {emoji} to message: {e}")
@@ -716,47 +1230,151 @@ def remove_reaction(
             timestamp=message_timestamp,
             name=emoji_clean
         )
+        if response.get("ok", False):
+            _update_cached_reaction(channel_id, message_timestamp, emoji_clean, added=False)
         return response.get("ok", False)
     except Exception as e:
         print(f"Error removing reaction {emoji} from message: {e}")
         return False
 
 
-def get_channel_id(channel_name: str) -> Optional[str]:
+def _channel_directory_path() -> str:
+    return os.path.join(SLACK_CACHE_DIR, "channel_directory.json")
+
+
+def _load_channel_directory() -> Dict:
+    """Load the channel directory from memory or the local cache file."""
+    global _channel_directory
+    if _channel_directory is not None:
+        return _channel_directory
+    
+    path = _channel_directory_path()
+    if os.path.exists(path):
+        try:
+            with open(path, "r") as f:
+                directory = json.load(f)
+            if isinstance(directory.get("channels"), dict):
+                _channel_directory = directory
+                return _channel_directory
+        except Exception as e:
+            print(f"Warning: Could not read Slack channel cache {path}: {e}")
+    
+    _channel_directory = {"fetched_at": 0, "channels": {}}
+    return _channel_directory
+
+
+def _save_channel_directory(directory: Dict) -> None:
+    """Persist the channel directory to the local cache file."""
+    path = _channel_directory_path()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(directory, f)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        print(f"Warning: Could not write Slack channel cache {path}: {e}")
+
+
+def _scan_channel_directory(client) -> Dict[str, str]:
     """
-    Get Slack channel ID from channel name.
+    Page through conversations.list once and map every channel name to its ID.
+    
+    Args:
+        client: slack_sdk WebClient
+    
+    Returns:
+        Dictionary mapping channel name to channel ID
+    """
+    channels = {}
+    cursor = None
+    
+    while True:
+        params = {
+            "types": "public_channel,private_channel",
+            "limit": 1000
+        }
+        if cursor:
+            params["cursor"] = cursor
+        
+        channels_response = client.conversations_list(**params)
+        
+        if not channels_response.get("ok"):
+            error = channels_response.get("error")
+            raise Exception(f"Slack API error: {error}")
+        
+        for channel in channels_response.get("channels", []):
+            if channel.get("name") and channel.get("id"):
+                channels[channel["name"]] = channel["id"]
+        
+        # Check for more pages
+        cursor = channels_response.get("response_metadata", {}).get("next_cursor")
+        if not cursor:
+            break
+    
+    return channels
+
+
+def resolve_channel_id(channel_name: str, client=None, refresh: bool = False) -> Optional[str]:
+    """
+    Resolve a Slack channel name to its ID using the cached channel directory.
+    
+    The directory is kept in memory and in a local file for
+    SLACK_CHANNEL_CACHE_TTL_SECONDS. The full channel list is only paginated
+    when the name is missing from the cache, the cache has expired, or
+    refresh is requested.
     
     Args:
         channel_name: Name of the channel (with or without #)
+        client: Optional slack_sdk WebClient to reuse
+        refresh: Ignore the cache and rescan the channel list
     
     Returns:
         Channel ID or None if not found
     """
-    try:
-        from slack_sdk import WebClient
-    except ImportError:
-        raise ImportError("slack-sdk is required. Install it with: pip install slack-sdk")
+    global _channel_directory
+    channel_clean = channel_name.lstrip('#')
     
-    bot_token = get_slack_bot_token()
-    if not bot_token:
-        raise ValueError("SLACK_BOT_TOKEN or SLACK_BOT_TOKEN_NAME must be configured")
+    directory = _load_channel_directory()
+    is_fresh = time.time() - directory.get("fetched_at", 0) < SLACK_CHANNEL_CACHE_TTL_SECONDS
     
-    client = WebClient(token=bot_token)
+    if is_fresh and not refresh:
+        channel_id = directory["channels"].get(channel_clean)
+        if channel_id:
+            return channel_id
     
-    # Clean channel name (remove # if present)
-    channel_clean = channel_name.lstrip('#')
+    if client is None:
+        try:
+            from slack_sdk import WebClient
+        except ImportError:
+            raise ImportError("slack-sdk is required. Install it with: pip install slack-sdk")
+        
+        bot_token = get_slack_bot_token()
+        if not bot_token:
+            raise ValueError("SLACK_BOT_TOKEN or SLACK_BOT_TOKEN_NAME must be configured")
+        
+        client = WebClient(token=bot_token)
+    
+    print(f"Channel '{channel_clean}' not in cache, scanning Slack channel list...")
+    channels = _scan_channel_directory(client)
+    _channel_directory = {"fetched_at": time.time(), "channels": channels}
+    _save_channel_directory(_channel_directory)
     
+    return channels.get(channel_clean)
+
+
+def get_channel_id(channel_name: str) -> Optional[str]:
+    """
+    Get Slack channel ID from channel name.
+    
+    Args:
+        channel_name: Name of the channel (with or without #)
+    
+    Returns:
+        Channel ID or None if not found
+    """
     try:
-        channels_response = client.conversations_list(types="public_channel,private_channel", limit=1000)
-        if not channels_response.get("ok"):
-            error = channels_response.get("error")
-            raise Exception(f"Slack API error: {error}")
-        
-        for channel in channels_response.get("channels", []):
-            if channel.get("name") == channel_clean:
-                return channel.get("id")
-        return None
+        return resolve_channel_id(channel_name)
     except Exception as e:
         print(f"Error finding channel '{channel_name}': {e}")
         raise
-